@@ -1,80 +1,116 @@
-import uvicorn
-from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+from fastapi import FastAPI, Request, Form, Body
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from src.pipline.prediction_pipeline import PredictionPipeline
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.io as pio
+from src.pipline.model_registry import ModelRegistry
+from src.pipline.micro_batcher import MicroBatcher
+from src.pipline.executors import BoundedExecutor, ExecutorSaturatedError
+from src.pipline.dashboard import DashboardCache
+from src.utils.metrics import Histogram, enable_metrics, metrics_enabled, render_metrics
+from src.constants import (
+    CLUSTER_LABELS,
+    INFERENCE_THREAD_WORKERS,
+    DASHBOARD_PROCESS_WORKERS,
+    EXECUTOR_MAX_QUEUE,
+    METRICS_ENABLED
+)
+from src.logger import logging
 import os
 
-app = FastAPI(title="User Segmentation App")
+if METRICS_ENABLED:
+    enable_metrics()
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Latency of HTTP requests by route", ("method", "route", "status"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+# Scrapes and static files are not worth a series of their own
+_UNTIMED_ROUTES = ("/metrics", "/static")
+
+
+class RequestLatencyMiddleware:
+    """
+    Pure ASGI middleware observing REQUEST_SECONDS per matched route template
+    (unmatched paths are not recorded, so scanners can't grow the series set).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None and not route.startswith(_UNTIMED_ROUTES):
+                REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                        method=scope["method"], route=route, status=status_code)
+
+# sklearn releases the GIL in its hot loops, so threads are enough for inference;
+# pandas + Plotly rendering holds it, so the dashboard gets its own processes
+inference_executor = BoundedExecutor("inference", kind="thread",
+                                     max_workers=INFERENCE_THREAD_WORKERS, max_queue=EXECUTOR_MAX_QUEUE)
+dashboard_executor = BoundedExecutor("dashboard", kind="process",
+                                     max_workers=DASHBOARD_PROCESS_WORKERS, max_queue=EXECUTOR_MAX_QUEUE)
+
+model_registry = ModelRegistry()
+micro_batcher = MicroBatcher(model_registry, executor=inference_executor)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        model_registry.start()
+    except Exception as e:
+        # Serve the dashboard anyway; /predict retries the load on first use
+        logging.info(f"⚠️ Model registry could not load at startup: {e}")
+    await micro_batcher.start()
+    yield
+    await micro_batcher.stop()
+    model_registry.stop()
+    inference_executor.shutdown()
+    dashboard_executor.shutdown()
+
+
+app = FastAPI(title="User Segmentation App", lifespan=lifespan)
+app.add_middleware(RequestLatencyMiddleware)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
 DATA_PATH = "data/data_with_clusters.csv"
-CLUSTER_LABELS = {
-    0: "Weekend Warriors",
-    1: "Engaged Professionals",
-    2: "Low-Key Users",
-    3: "Active Explorers",
-    4: "Budget Browsers"
-}
+dashboard_cache = DashboardCache(DATA_PATH)
 
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
     if not os.path.exists(DATA_PATH):
         return HTMLResponse("<h2>Data file not found.</h2>", status_code=404)
 
-    df = pd.read_csv(DATA_PATH)
-    df["Cluster Label"] = df["cluster"].map(CLUSTER_LABELS)
-
-    total_users = len(df)
-    avg_ctr = round(df['Click-Through Rates (CTR)'].mean(), 2)
-    avg_weekday = round(df['Time Spent Online (hrs/weekday)'].mean(), 2)
-    avg_conversion = round(df['Conversion Rates'].mean(), 2)
-
-    cluster_data = df["Cluster Label"].value_counts().reset_index()
-    cluster_data.columns = ["Segment", "Users"]
-    bar_fig = px.bar(cluster_data, x="Segment", y="Users", text="Users", title="Users per Segment")
-    bar_html = pio.to_html(bar_fig, full_html=False)
-
-    features = ["Time Spent Online (hrs/weekday)", "Time Spent Online (hrs/weekend)", "Likes and Reactions", "Click-Through Rates (CTR)"]
-    radar_df = df.groupby("Cluster Label")[features].mean()
-    radar_df_norm = (radar_df - radar_df.min()) / (radar_df.max() - radar_df.min())
-    radar_df_norm = radar_df_norm.reset_index()
-    radar_fig = go.Figure()
-    for i, label in enumerate(radar_df_norm["Cluster Label"]):
-        vals = radar_df_norm.iloc[i][features].tolist()
-        radar_fig.add_trace(go.Scatterpolar(r=vals + [vals[0]], theta=features + [features[0]], fill='toself', name=label))
-    radar_fig.update_layout(title="Segment Profiles", polar=dict(radialaxis=dict(visible=True, range=[0, 1])))
-    radar_html = pio.to_html(radar_fig, full_html=False)
-
-    gender_fig = px.histogram(df, x="Gender", color="Cluster Label", barmode="group", title="Gender by Segment")
-    gender_html = pio.to_html(gender_fig, full_html=False)
-
-    income_fig = px.histogram(df, x="Income Level", color="Cluster Label", barmode="group", title="Income vs Segment")
-    income_html = pio.to_html(income_fig, full_html=False)
-
-    top_interests = df["Top Interests"].dropna().str.split(", ").explode().value_counts().nlargest(10)
-    interest_fig = px.bar(top_interests, x=top_interests.index, y=top_interests.values,
-                          labels={"x": "Interest", "y": "Users"}, title="Top 10 Interests")
-    interest_html = pio.to_html(interest_fig, full_html=False)
+    try:
+        context = await dashboard_cache.get(dashboard_executor)
+    except ExecutorSaturatedError:
+        return HTMLResponse("<h2>Server is busy, please retry shortly.</h2>", status_code=503)
 
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
-        "total_users": total_users,
-        "avg_ctr": avg_ctr,
-        "avg_weekday": avg_weekday,
-        "avg_conversion": avg_conversion,
-        "bar_html": bar_html,
-        "radar_html": radar_html,
-        "gender_html": gender_html,
-        "income_html": income_html,
-        "interest_html": interest_html
+        "model_version": model_registry.model_version,
+        **context
     })
 
 @app.get("/predict", response_class=HTMLResponse)
@@ -100,8 +136,7 @@ async def predict_cluster(request: Request,
             "Gender": Gender,
             "Income Level": Income_Level
         }
-        pipeline = PredictionPipeline()
-        cluster = pipeline.predict(input_data)
+        cluster = await micro_batcher.submit(input_data)
         label = CLUSTER_LABELS.get(cluster, "Unknown")
 
         return templates.TemplateResponse("results.html", {
@@ -110,6 +145,13 @@ async def predict_cluster(request: Request,
             "label": label
         })
 
+    except ExecutorSaturatedError:
+        return templates.TemplateResponse("results.html", {
+            "request": request,
+            "cluster": "Error",
+            "label": "Server is busy, please retry shortly."
+        }, status_code=503)
+
     except Exception as e:
         return templates.TemplateResponse("results.html", {
             "request": request,
@@ -117,7 +159,37 @@ async def predict_cluster(request: Request,
             "label": str(e)
         })
     
+@app.post("/predict/batch")
+async def predict_cluster_batch(records: List[Dict[str, Any]] = Body(..., embed=True)):
+    try:
+        pipeline = await inference_executor.run(model_registry.get)
+        clusters = (await inference_executor.run(pipeline.predict_batch, records)).tolist()
+
+        return JSONResponse({
+            "model_version": pipeline.model_version,
+            "clusters": clusters,
+            "labels": [CLUSTER_LABELS.get(cluster, "Unknown") for cluster in clusters]
+        })
+
+    except ExecutorSaturatedError as e:
+        return JSONResponse({"error": str(e)}, status_code=503)
+
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+@app.get("/predict/stats")
+async def predict_stats():
+    stats = micro_batcher.stats.snapshot()
+    if model_registry.prediction_cache is not None:
+        stats["prediction_cache"] = model_registry.prediction_cache.snapshot()
+    return JSONResponse(stats)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
 
 
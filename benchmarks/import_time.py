@@ -0,0 +1,100 @@
+"""
+Import-time budget for the serving entry point.
+
+Each target is imported in a fresh interpreter (``python -X importtime``)
+several times; the median cumulative import time of the target module is
+compared against its budget, and the modules it pulled in are checked
+against a deny-list of training- and plotting-only dependencies. Exits
+non-zero when either check fails, so it can gate CI.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 9 --budget-ms 800
+    python benchmarks/import_time.py --json import_time.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (module, budget in ms, modules that must not be loaded by importing it)
+TARGETS = [
+    ("app", float(os.getenv("IMPORT_TIME_BUDGET_MS", 1000)),
+     ["mlflow", "dagshub", "dotenv", "plotly", "sklearn", "pandas", "scipy", "dill", "uvicorn"]),
+    ("src.pipline.prediction_pipeline", float(os.getenv("PREDICTION_IMPORT_TIME_BUDGET_MS", 400)),
+     ["mlflow", "dagshub", "dotenv", "plotly", "sklearn", "pandas", "scipy", "dill"]),
+    ("src.components.model_trainer", float(os.getenv("TRAINER_IMPORT_TIME_BUDGET_MS", 3000)),
+     ["mlflow", "dagshub", "dotenv"]),
+]
+
+_PROBE = "import json, sys, {module}; print(json.dumps(sorted({{name.split('.')[0] for name in sys.modules}})))"
+
+
+def measure_import(module: str) -> tuple:
+    """(cumulative import time of ``module`` in ms, top-level packages loaded) in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative_us = None
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == module:
+            cumulative_us = int(cumulative)
+    if cumulative_us is None:
+        raise RuntimeError(f"No import-time line for {module}:\n{completed.stderr[-2000:]}")
+    return cumulative_us / 1000.0, json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(runs: int, budget_override: float = None) -> list:
+    results = []
+    for module, budget_ms, forbidden in TARGETS:
+        if budget_override is not None and module == "app":
+            budget_ms = budget_override
+        timings, loaded = [], set()
+        for _ in range(runs):
+            elapsed_ms, modules = measure_import(module)
+            timings.append(elapsed_ms)
+            loaded.update(modules)
+        median_ms = statistics.median(timings)
+        unexpected = sorted(set(forbidden) & loaded)
+        results.append({
+            "module": module,
+            "median_ms": round(median_ms, 1),
+            "min_ms": round(min(timings), 1),
+            "budget_ms": budget_ms,
+            "forbidden_loaded": unexpected,
+            "passed": median_ms <= budget_ms and not unexpected
+        })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--budget-ms", type=float, default=None, help="override the budget for app")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.runs, args.budget_ms)
+    for result in results:
+        status = "ok" if result["passed"] else "FAIL"
+        line = (f"{status:4}  {result['module']:<36} median {result['median_ms']:8.1f} ms "
+                f"(min {result['min_ms']:.1f}, budget {result['budget_ms']:.0f})")
+        if result["forbidden_loaded"]:
+            line += f"  loads: {', '.join(result['forbidden_loaded'])}"
+        print(line)
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+    return 0 if all(result["passed"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
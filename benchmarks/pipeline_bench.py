@@ -0,0 +1,359 @@
+"""
+Benchmark harness for the training pipeline and the serving paths.
+
+For each size, synthetic user profiles matching config/schema.yaml are
+generated and run through every pipeline stage (ingestion, validation,
+transformation, training, evaluation, export, push), then single and batch
+prediction (NumPy fast path and sklearn) and the dashboard render are
+timed. Nothing touches the network: Mongo is replaced by an in-memory
+mongomock client (``pip install mongomock``; without it ingestion is
+skipped) and MLflow by a no-op stand-in.
+
+Each size runs in its own interpreter and scratch directory, so peak RSS is
+per size and runs don't share caches. Per step the result records wall and
+CPU seconds (CPU includes child processes, e.g. the model search) and the
+process's peak RSS after the step.
+
+    python benchmarks/pipeline_bench.py --sizes 1000,100000,1000000 --output benchmarks/baseline.json
+    python benchmarks/pipeline_bench.py --sizes 1000,100000 --compare benchmarks/baseline.json
+
+With --compare, steps slower than the baseline by more than --tolerance
+(and by more than --min-seconds, to ignore noise on tiny steps), or whose
+peak RSS grew by more than --memory-tolerance, are reported and the exit
+status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = "1000,100000,1000000"
+
+# Category vocabularies and numeric ranges of the production data
+CATEGORIES = {
+    "Age": ["18-24", "25-34", "35-44", "45-54", "55-64", "65+"],
+    "Gender": ["Female", "Male"],
+    "Location": ["Rural", "Suburban", "Urban"],
+    "Language": ["English", "Hindi", "Mandarin", "Spanish"],
+    "Education Level": ["Bachelor", "High School", "Master", "PhD", "Technical"],
+    "Device Usage": ["Desktop Only", "Mobile + Desktop", "Mobile Only", "Tablet"],
+    "Income Level": ["0-20k", "100k+", "20k-40k", "40k-60k", "60k-80k", "80k-100k"]
+}
+INTERESTS = [
+    "DIY Crafts", "Data Science", "Digital Marketing", "Eco-Friendly Living", "Fashion Modelling",
+    "Fitness and Wellness", "Gaming", "Gardening", "Gourmet Cooking", "Investing and Finance",
+    "Music Production", "Pet Care", "Photography", "Reading and Literature", "Software Engineering",
+    "Travel and Adventure"
+]
+NUMERIC_RANGES = {
+    "Likes and Reactions": (100, 10000),
+    "Followed Accounts": (10, 500),
+    "Time Spent Online (hrs/weekday)": (0.5, 5.0),
+    "Time Spent Online (hrs/weekend)": (1.0, 8.0),
+    "Click-Through Rates (CTR)": (0.0, 0.25),
+    "Conversion Rates": (0.0, 0.1),
+    "Ad Interaction Time (sec)": (5, 180)
+}
+
+
+def generate_profiles(n_rows: int, random_state: int = 42):
+    """Synthetic feature frame with the columns and types of config/schema.yaml."""
+    import numpy as np
+    import pandas as pd
+    from src.constants import SCHEMA_FILE_PATH
+    from src.utils.main_utils import read_yaml_file, get_schema_column_types
+
+    rng = np.random.default_rng(random_state)
+    columns = {}
+    for name, column_type in get_schema_column_types(read_yaml_file(SCHEMA_FILE_PATH)).items():
+        if name == "User ID":
+            columns[name] = np.arange(1, n_rows + 1)
+        elif name == "Top Interests":
+            counts = rng.integers(1, 5, size=n_rows)
+            picks = rng.integers(0, len(INTERESTS), size=(n_rows, 4))
+            columns[name] = [", ".join(INTERESTS[i] for i in row[:count]) for row, count in zip(picks, counts)]
+        elif column_type == "category":
+            vocabulary = CATEGORIES.get(name, [f"{name} {i}" for i in range(5)])
+            columns[name] = np.asarray(vocabulary, dtype=object)[rng.integers(0, len(vocabulary), size=n_rows)]
+        else:
+            low, high = NUMERIC_RANGES.get(name, (0, 100))
+            if column_type == "int":
+                columns[name] = rng.integers(low, high, size=n_rows)
+            else:
+                columns[name] = np.round(rng.uniform(low, high, size=n_rows), 3)
+    return pd.DataFrame(columns)
+
+
+class _NullRun:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullMlflow:
+    """Accepts every mlflow call the trainer makes and records nothing."""
+
+    def start_run(self, *args, **kwargs):
+        return _NullRun()
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def _usage():
+    if resource is None:
+        return time.process_time(), None
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = self_usage.ru_utime + self_usage.ru_stime + child_usage.ru_utime + child_usage.ru_stime
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak_mb = self_usage.ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else self_usage.ru_maxrss / 1024
+    return cpu, peak_mb
+
+
+class StepRecorder:
+    def __init__(self):
+        self.results = {}
+
+    @contextmanager
+    def step(self, name: str, **extra):
+        cpu_before, _ = _usage()
+        started = time.perf_counter()
+        yield
+        wall = time.perf_counter() - started
+        cpu_after, peak_mb = _usage()
+        record = dict(extra)
+        record.update({
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu_after - cpu_before, 4),
+            "peak_rss_mb": round(peak_mb, 1) if peak_mb is not None else None
+        })
+        self.results[name] = record
+        print(f"  {name:<28} {wall:9.3f}s", file=sys.__stdout__, flush=True)
+
+    def skip(self, name: str, reason: str):
+        self.results[name] = {"skipped": reason}
+
+
+def run_worker(n_rows: int, max_ingest_rows: int, predict_calls: int, batch_rows: int) -> dict:
+    """Run every step for one size inside the current (scratch) directory."""
+    import src.components.model_trainer as model_trainer
+    from src.constants import DATABASE_NAME, SCHEMA_FILE_PATH
+    from src.configuration.mongo_db_connection import MongoDBClient
+    from src.data_access.data_exe import USvisaData
+    from src.entity.artifact_entity import DataIngestionArtifact
+    from src.pipline.training_pipeline import TrainPipeline
+    from src.pipline.prediction_pipeline import PredictionPipeline
+    from src.pipline.dashboard import build_dashboard_context
+    from src.utils.artifact_format import save_dataframe
+    from src.utils.main_utils import read_yaml_file, get_schema_column_types
+
+    model_trainer._mlflow = NullMlflow()
+    recorder = StepRecorder()
+
+    with recorder.step("generate_data", rows=n_rows):
+        profiles = generate_profiles(n_rows)
+
+    try:
+        import mongomock
+    except ImportError:
+        mongomock = None
+
+    pipeline = TrainPipeline(use_stage_cache=False)
+    if mongomock is not None and n_rows <= max_ingest_rows:
+        client = mongomock.MongoClient()
+        client[DATABASE_NAME][pipeline.data_ingestion_config.collection_name].insert_many(profiles.to_dict("records"))
+        pipeline.usvisa_data = USvisaData(MongoDBClient(client=client))
+        with recorder.step("data_ingestion"):
+            ingestion_artifact = pipeline.start_data_ingestion()
+    else:
+        # Loading a million documents into mongomock would measure mongomock; seed the feature store instead
+        recorder.skip("data_ingestion", "mongomock is not installed" if mongomock is None
+                      else f"more than --max-ingest-rows={max_ingest_rows} rows")
+        feature_store_file_path = pipeline.data_ingestion_config.feature_store_file_path
+        os.makedirs(os.path.dirname(feature_store_file_path), exist_ok=True)
+        save_dataframe(feature_store_file_path, profiles,
+                       get_schema_column_types(read_yaml_file(SCHEMA_FILE_PATH)))
+        ingestion_artifact = DataIngestionArtifact(feature_store_file_path=feature_store_file_path)
+
+    with recorder.step("data_validation"):
+        validation_artifact = pipeline.start_data_validation(ingestion_artifact)
+    if not validation_artifact.validation_status:
+        raise RuntimeError(f"Synthetic data failed validation: {validation_artifact.message}")
+    with recorder.step("data_transformation"):
+        transformation_artifact = pipeline.start_data_transformation(ingestion_artifact, validation_artifact)
+    with recorder.step("model_trainer"):
+        trainer_artifact = pipeline.start_model_trainer(transformation_artifact)
+    with recorder.step("model_evaluation"):
+        evaluation_artifact = pipeline.start_model_evaluation(
+            transformation_artifact, trainer_artifact, ingestion_artifact
+        )
+    with recorder.step("model_exporter"):
+        exporter_artifact = pipeline.start_model_exporter(
+            transformation_artifact, trainer_artifact, ingestion_artifact
+        )
+    with recorder.step("model_pusher"):
+        pipeline.start_model_pusher(evaluation_artifact, {"model_exporter": exporter_artifact})
+
+    run_dir = pipeline.training_pipeline_config.artifact_dir
+    features = profiles.drop(columns=["User ID"])
+    records = features.head(batch_rows).to_dict("records")
+    for path_name, use_compact in (("compact", True), ("sklearn", False)):
+        if use_compact and not exporter_artifact.is_exported:
+            recorder.skip(f"predict_single_{path_name}", exporter_artifact.message)
+            recorder.skip(f"predict_batch_{path_name}", exporter_artifact.message)
+            continue
+        prediction_pipeline = PredictionPipeline(artifact_run_dir=run_dir, use_compact_predictor=use_compact)
+        prediction_pipeline.predict(records[0])  # warm-up: lazy loads and buffers
+        with recorder.step(f"predict_single_{path_name}", calls=predict_calls):
+            for index in range(predict_calls):
+                prediction_pipeline.predict(records[index % len(records)])
+        with recorder.step(f"predict_batch_{path_name}", rows=len(records)):
+            prediction_pipeline.predict_batch(records)
+
+    for path_name in ("compact", "sklearn"):
+        result = recorder.results.get(f"predict_single_{path_name}", {})
+        if "wall_seconds" in result:
+            result["us_per_call"] = round(1e6 * result["wall_seconds"] / predict_calls, 1)
+        result = recorder.results.get(f"predict_batch_{path_name}", {})
+        if "wall_seconds" in result:
+            result["rows_per_second"] = round(len(records) / max(result["wall_seconds"], 1e-9))
+
+    dashboard_path = os.path.abspath("dashboard_data.csv")
+    labelled = profiles.assign(cluster=PredictionPipeline(artifact_run_dir=run_dir).predict_batch(features))
+    labelled.to_csv(dashboard_path, index=False)
+    with recorder.step("dashboard_render"):
+        build_dashboard_context(dashboard_path)
+
+    return recorder.results
+
+
+def run_size(n_rows: int, args) -> dict:
+    """Run the worker for one size in a fresh interpreter and scratch directory."""
+    workdir = tempfile.mkdtemp(prefix=f"bench_{n_rows}_")
+    try:
+        os.symlink(os.path.join(REPO_ROOT, "config"), os.path.join(workdir, "config"))
+        result_path = os.path.join(workdir, "result.json")
+        log_path = os.path.join(workdir, "worker.log")
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        print(f"▶ {n_rows} rows (scratch: {workdir})", flush=True)
+        with open(log_path, "w") as log_file:
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", "--rows", str(n_rows),
+                 "--result", result_path, "--max-ingest-rows", str(args.max_ingest_rows),
+                 "--predict-calls", str(args.predict_calls), "--batch-rows", str(args.batch_rows)],
+                cwd=workdir, env=env, stdout=sys.stdout, stderr=log_file
+            )
+        if completed.returncode != 0:
+            with open(log_path) as log_file:
+                tail = log_file.read()[-3000:]
+            raise RuntimeError(f"Benchmark worker for {n_rows} rows failed:\n{tail}")
+        with open(result_path) as result_file:
+            return json.load(result_file)
+    finally:
+        if not args.keep_workdirs:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare_results(current: dict, baseline: dict, tolerance: float, memory_tolerance: float,
+                    min_seconds: float) -> list:
+    """Regression messages for steps present in both result sets."""
+    regressions = []
+    for size, steps in current["results"].items():
+        baseline_steps = baseline.get("results", {}).get(size, {})
+        for name, step in steps.items():
+            before = baseline_steps.get(name, {})
+            if "wall_seconds" not in step or "wall_seconds" not in before:
+                continue
+            wall, wall_before = step["wall_seconds"], before["wall_seconds"]
+            if wall > wall_before * (1 + tolerance) and wall - wall_before > min_seconds:
+                regressions.append(f"{size} rows / {name}: {wall_before:.3f}s -> {wall:.3f}s "
+                                   f"(+{100 * (wall / wall_before - 1):.0f}%)")
+            rss, rss_before = step.get("peak_rss_mb"), before.get("peak_rss_mb")
+            if rss and rss_before and rss > rss_before * (1 + memory_tolerance):
+                regressions.append(f"{size} rows / {name}: peak RSS {rss_before:.0f} MB -> {rss:.0f} MB")
+    return regressions
+
+
+def environment_info() -> dict:
+    import numpy
+    import pandas
+    import sklearn
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "sklearn": sklearn.__version__
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated row counts")
+    parser.add_argument("--output", default=os.path.join(REPO_ROOT, "benchmarks", "results.json"),
+                        help="where to write the results (use benchmarks/baseline.json to record a baseline)")
+    parser.add_argument("--compare", default=None, help="baseline JSON to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown per step")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed relative peak RSS growth")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    parser.add_argument("--max-ingest-rows", type=int, default=100000,
+                        help="largest size ingested through the Mongo stub; above it the feature store is seeded")
+    parser.add_argument("--predict-calls", type=int, default=500, help="single-record predictions per path")
+    parser.add_argument("--batch-rows", type=int, default=100000, help="rows per batch prediction (capped by size)")
+    parser.add_argument("--keep-workdirs", action="store_true", help="keep each size's scratch directory")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--rows", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # Pipeline logging goes to stderr (the worker log); step timings go to stdout
+        sys.stdout = sys.stderr
+        results = run_worker(args.rows, args.max_ingest_rows, args.predict_calls, args.batch_rows)
+        with open(args.result, "w") as result_file:
+            json.dump(results, result_file)
+        return 0
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment_info(),
+        "results": {str(size): run_size(size, args) for size in sizes}
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"📝 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_results(report, baseline, args.tolerance, args.memory_tolerance, args.min_seconds)
+        if regressions:
+            print("❌ Regressions against", args.compare)
+            for regression in regressions:
+                print("  " + regression)
+            return 1
+        print(f"✅ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
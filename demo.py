@@ -10,10 +10,33 @@ dagshub.init(
     mlflow=True
 )
 
+import argparse
+import os
 import mlflow
 from src.pipline.training_pipeline import TrainPipeline  # Corrected spelling if needed
 
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the user profile segmentation training pipeline")
+    parser.add_argument("--resume", metavar="RUN_DIR",
+                        help="resume an earlier run, e.g. artifact/<run timestamp>")
+    parser.add_argument("--incremental", action="store_true",
+                        help="update the latest model with new data instead of retraining")
+    args = parser.parse_args()
+    if args.resume is not None and not os.path.isdir(args.resume):
+        parser.error(f"--resume: run directory not found: {args.resume}")
+    return args
+
+
 if __name__ == "__main__":
+    args = parse_args()
     with mlflow.start_run():
-        obj = TrainPipeline()
-        obj.run_pipeline()
+        resume = args.resume is not None
+        if resume:
+            obj = TrainPipeline(artifact_dir=args.resume)
+        else:
+            obj = TrainPipeline()
+        if args.incremental:
+            obj.run_incremental_pipeline()
+        else:
+            obj.run_pipeline(resume=resume)
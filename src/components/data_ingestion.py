@@ -6,18 +6,32 @@ from src.entity.artifact_entity import DataIngestionArtifact
 from src.exception import USvisaException
 from src.logger import logging
 from src.data_access.data_exe import USvisaData
+from src.utils.main_utils import read_yaml_file, write_yaml_file, get_schema_column_types
+from src.utils.artifact_format import save_dataframe
+from src.constants import SCHEMA_FILE_PATH
 
 class DataIngestion:
-    def __init__(self, data_ingestion_config: DataIngestionConfig = DataIngestionConfig()):
+    def __init__(self, data_ingestion_config: DataIngestionConfig = DataIngestionConfig(),
+                 usvisa_data: USvisaData = None):
+        """
+        :param usvisa_data: optional data access object, e.g. one wrapping a
+                            mongomock client; defaults to the shared MongoDB
+        """
         try:
             self.data_ingestion_config = data_ingestion_config
+            self.usvisa_data = usvisa_data
         except Exception as e:
             raise USvisaException(e, sys)
 
+    def _get_usvisa_data(self) -> USvisaData:
+        if self.usvisa_data is None:
+            self.usvisa_data = USvisaData()
+        return self.usvisa_data
+
     def export_data_into_feature_store(self) -> DataFrame:
         try:
             logging.info("📥 Exporting data from MongoDB to feature store")
-            usvisa_data = USvisaData()
+            usvisa_data = self._get_usvisa_data()
             dataframe = usvisa_data.export_collection_as_dataframe(
                 collection_name=self.data_ingestion_config.collection_name
             )
@@ -26,18 +40,61 @@ class DataIngestion:
             dir_path = os.path.dirname(feature_store_file_path)
             os.makedirs(dir_path, exist_ok=True)
 
-            dataframe.to_csv(feature_store_file_path, index=False, header=True)
+            column_types = get_schema_column_types(read_yaml_file(SCHEMA_FILE_PATH))
+            dataframe = usvisa_data.coerce_chunk(dataframe, column_types)
+            save_dataframe(feature_store_file_path, dataframe, column_types)
             logging.info(f"✅ Data saved to: {feature_store_file_path}")
             return dataframe
         except Exception as e:
             raise USvisaException(e, sys)
 
+    def stream_data_into_feature_store(self) -> int:
+        try:
+            logging.info("📥 Streaming data from MongoDB to feature store")
+            schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            column_types = get_schema_column_types(schema_config)
+
+            rows_written = self._get_usvisa_data().export_collection_to_file(
+                collection_name=self.data_ingestion_config.collection_name,
+                file_path=self.data_ingestion_config.feature_store_file_path,
+                columns=list(column_types.keys()),
+                column_types=column_types,
+                batch_size=self.data_ingestion_config.export_batch_size
+            )
+            logging.info(f"✅ Data saved to: {self.data_ingestion_config.feature_store_file_path}")
+            return rows_written
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def save_watermark(self, watermark) -> None:
+        """
+        Record how far this export reached so incremental runs only pull
+        documents past it.
+        """
+        try:
+            write_yaml_file(self.data_ingestion_config.watermark_file_path, content={
+                "watermark_field": self.data_ingestion_config.watermark_field,
+                "watermark": USvisaData.encode_watermark(watermark)
+            })
+            logging.info(f"🔖 Ingestion watermark saved: {watermark}")
+        except Exception as e:
+            raise USvisaException(e, sys)
+
     def initiate_data_ingestion(self) -> DataIngestionArtifact:
         try:
-            dataframe = self.export_data_into_feature_store()
+            # Read the watermark before exporting: documents landing mid-export
+            # are picked up again by the next increment rather than skipped
+            watermark = self._get_usvisa_data().get_max_watermark(
+                self.data_ingestion_config.collection_name, self.data_ingestion_config.watermark_field
+            )
+            if self.data_ingestion_config.streaming_export:
+                self.stream_data_into_feature_store()
+            else:
+                self.export_data_into_feature_store()
+            self.save_watermark(watermark)
             return DataIngestionArtifact(
-                feature_store_file_path=self.data_ingestion_config.feature_store_file_path
+                feature_store_file_path=self.data_ingestion_config.feature_store_file_path,
+                watermark_file_path=self.data_ingestion_config.watermark_file_path
             )
         except Exception as e:
             raise USvisaException(e, sys)
-
@@ -2,20 +2,31 @@ import os
 import sys
 import pandas as pd
 import numpy as np
+import scipy.sparse
+from typing import Dict, Optional
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from src.logger import logging
 from src.exception import USvisaException
 from src.entity.config_entity import DataTransformationConfig
-from src.entity.artifact_entity import DataIngestionArtifact, DataTransformationArtifact
-from src.utils.main_utils import save_object, read_yaml_file
+from src.entity.artifact_entity import DataIngestionArtifact, DataTransformationArtifact, DataValidationArtifact
+from src.utils.main_utils import save_object, read_yaml_file, save_numpy_array_data, save_numpy_array_chunks
+from src.utils.artifact_format import load_dataframe, iter_dataframe_chunks
+from src.utils.column_stats import ColumnStatistics
 from src.constants import SCHEMA_FILE_PATH
 
 class DataTransformation:
-    def __init__(self, data_ingestion_artifact: DataIngestionArtifact, data_transformation_config: DataTransformationConfig):
+    def __init__(self, data_ingestion_artifact: DataIngestionArtifact, data_transformation_config: DataTransformationConfig,
+                 data_validation_artifact: DataValidationArtifact = None):
+        """
+        :param data_validation_artifact: when its report carries the column
+                                         statistics, the transformer is built
+                                         from them instead of being fitted
+        """
         try:
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_transformation_config = data_transformation_config
+            self.data_validation_artifact = data_validation_artifact
             self.schema_config = read_yaml_file(SCHEMA_FILE_PATH)
         except Exception as e:
             raise USvisaException(e, sys)
@@ -34,35 +45,150 @@ class DataTransformation:
         except Exception as e:
             raise USvisaException(e, sys)
 
-    def initiate_data_transformation(self) -> DataTransformationArtifact:
+    def load_column_statistics(self) -> Optional[Dict[str, ColumnStatistics]]:
+        """
+        Statistics of the transformer's input columns from the validation
+        report, or None when there is no report or it lacks something the
+        transformer needs (moments of a numeric column, or the categories
+        of a column with too many to be listed).
+        """
         try:
-            # Load data
-            df = pd.read_csv(self.data_ingestion_artifact.feature_store_file_path)
+            report_file_path = getattr(self.data_validation_artifact, "report_file_path", None)
+            if not report_file_path or not os.path.exists(report_file_path):
+                return None
+            columns = (read_yaml_file(report_file_path) or {}).get("columns") or {}
 
-            # Drop unwanted columns
-            df.drop(columns=self.schema_config["drop_columns"], inplace=True)
+            statistics = {}
+            for column in self.schema_config["num_features"]:
+                if columns.get(column, {}).get("mean") is None:
+                    return None
+                statistics[column] = ColumnStatistics.from_dict(column, columns[column])
+            for column in self.schema_config["oh_columns"]:
+                if "categories" not in columns.get(column, {}):
+                    return None
+                statistics[column] = ColumnStatistics.from_dict(column, columns[column])
+            return statistics
+        except Exception as e:
+            raise USvisaException(e, sys)
 
-            # Separate input features
-            input_features = self.schema_config["transform_columns"] + self.schema_config["oh_columns"]
+    def build_transformer_from_statistics(self, statistics: Dict[str, ColumnStatistics]) -> ColumnTransformer:
+        """
+        A fitted transformer equivalent to fitting get_data_transformer_object
+        on the profiled data, without another pass over it.
+
+        The ColumnTransformer is fitted on a skeleton frame holding every
+        known category once (so column bookkeeping, feature names and the
+        encoder's categories_ are set exactly as a real fit would), then the
+        scaler's moments are replaced by the streamed ones.
+        """
+        try:
+            num_features = self.schema_config["num_features"]
+            oh_columns = self.schema_config["oh_columns"]
 
-            input_df = df[input_features]
+            categories = {}
+            for column in oh_columns:
+                # OneHotEncoder sorts the categories and puts a missing value last
+                values = sorted(statistics[column].category_counts)
+                if statistics[column].null_count:
+                    values.append(np.nan)
+                categories[column] = values
 
-            # Fit-transform
+            # Same columns, in the same order, as initiate_data_transformation loads
+            input_features = self.schema_config["transform_columns"] + oh_columns
+            n_rows = max([2] + [len(values) for values in categories.values()])
+            skeleton = {column: np.arange(n_rows, dtype=np.float64) for column in input_features}
+            for column, values in categories.items():
+                skeleton[column] = pd.Categorical([values[index % len(values)] for index in range(n_rows)])
             transformer = self.get_data_transformer_object()
-            transformed_array = transformer.fit_transform(input_df)
+            transformer.fit(pd.DataFrame(skeleton, columns=input_features))
+
+            scaler = transformer.named_transformers_["num"]
+            counts = np.array([statistics[column].count for column in num_features], dtype=np.int64)
+            scaler.mean_ = np.array([statistics[column].mean for column in num_features], dtype=np.float64)
+            scaler.var_ = np.array([statistics[column].variance for column in num_features], dtype=np.float64)
+            # An int when no value was missing, per-feature counts otherwise (as StandardScaler.fit does)
+            scaler.n_samples_seen_ = int(counts[0]) if (counts == counts[0]).all() else counts
+            # Constant features keep a scale of 1, as StandardScaler.fit leaves them; a variance
+            # within the rounding error of the float64 moments counts as zero
+            eps = np.finfo(np.float64).eps
+            constant = scaler.var_ <= counts * eps * scaler.var_ + (counts * scaler.mean_ * eps) ** 2
+            scaler.scale_ = np.where(constant, 1.0, np.sqrt(scaler.var_))
+            return transformer
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def transform_in_chunks(self, transformer: ColumnTransformer, n_rows: int) -> tuple:
+        """
+        Transform the feature store ``chunk_size`` rows at a time, appending
+        each block to the dense .npy output; memory is bounded by the chunk
+        size, not the data size. Returns the (path, shape) written.
+        """
+        try:
+            input_features = self.schema_config["transform_columns"] + self.schema_config["oh_columns"]
+            chunks = iter_dataframe_chunks(
+                self.data_ingestion_artifact.feature_store_file_path,
+                columns=input_features,
+                chunk_size=self.data_transformation_config.chunk_size
+            )
+            transformed_data_path = self.data_transformation_config.transformed_data_path
+            shape = save_numpy_array_chunks(
+                transformed_data_path,
+                (transformer.transform(chunk) for chunk in chunks),
+                (n_rows, len(transformer.get_feature_names_out()))
+            )
+            return transformed_data_path, shape
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def initiate_data_transformation(self) -> DataTransformationArtifact:
+        try:
+            statistics = self.load_column_statistics()
+            if statistics is not None:
+                # The validation pass already computed everything fitting would
+                logging.info("♻️ Building transformer from validation statistics")
+                transformer = self.build_transformer_from_statistics(statistics)
+            else:
+                transformer = None
+
+            # Every column counts each row once: as a value, a null or a type error
+            n_rows = next(iter(statistics.values())).rows if statistics else None
+            chunk_size = self.data_transformation_config.chunk_size
+            if transformer is not None and 0 < chunk_size < n_rows:
+                logging.info(f"📦 Transforming {n_rows} rows out of core in chunks of {chunk_size}")
+                transformed_data_path, transformed_shape = self.transform_in_chunks(transformer, n_rows)
+            else:
+                # Load only the input features; drop_columns are never read from disk
+                input_features = self.schema_config["transform_columns"] + self.schema_config["oh_columns"]
+
+                input_df = load_dataframe(
+                    self.data_ingestion_artifact.feature_store_file_path,
+                    columns=input_features,
+                    categorical_columns=self.schema_config["oh_columns"]
+                )
+
+                if transformer is not None:
+                    transformed_array = transformer.transform(input_df)
+                else:
+                    # Fit-transform
+                    transformer = self.get_data_transformer_object()
+                    transformed_array = transformer.fit_transform(input_df)
+
+                # Save transformed data in native binary form, keeping sparse output sparse
+                if scipy.sparse.issparse(transformed_array):
+                    transformed_data_path = self.data_transformation_config.transformed_sparse_data_path
+                else:
+                    transformed_data_path = self.data_transformation_config.transformed_data_path
+                save_numpy_array_data(transformed_data_path, transformed_array)
+                transformed_shape = transformed_array.shape
 
             # Save transformer
             os.makedirs(os.path.dirname(self.data_transformation_config.transformer_object_path), exist_ok=True)
             save_object(self.data_transformation_config.transformer_object_path, transformer)
 
-            # Save transformed data
-            transformed_df = pd.DataFrame(transformed_array.toarray() if hasattr(transformed_array, "toarray") else transformed_array)
-            transformed_df.to_csv(self.data_transformation_config.transformed_data_path, index=False)
-
-            logging.info("✅ Data Transformation completed.")
+            logging.info(f"✅ Data Transformation completed. Saved {transformed_shape} matrix to {transformed_data_path}")
 
             return DataTransformationArtifact(
-                transformed_data_path=self.data_transformation_config.transformed_data_path,
+                transformed_data_path=transformed_data_path,
                 transformer_object_path=self.data_transformation_config.transformer_object_path
             )
 
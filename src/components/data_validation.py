@@ -3,11 +3,14 @@ import sys
 import pandas as pd
 from pandas import DataFrame
 from dataclasses import dataclass
+from typing import Dict, List, Tuple
 
 from src.exception import USvisaException
 from src.logger import logging
-from src.utils.main_utils import read_yaml_file
-from src.constants import SCHEMA_FILE_PATH
+from src.utils.main_utils import read_yaml_file, write_yaml_file, get_schema_column_types
+from src.utils.artifact_format import load_dataframe, read_column_names, iter_dataframe_chunks
+from src.utils.column_stats import ColumnStatistics
+from src.constants import SCHEMA_FILE_PATH, DATA_VALIDATION_MAX_REPORTED_CATEGORIES
 from src.entity.config_entity import DataValidationConfig
 from src.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 
@@ -26,7 +29,7 @@ class DataValidation:
     @staticmethod
     def read_data(file_path: str) -> DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return load_dataframe(file_path)
         except Exception as e:
             raise USvisaException(e, sys)
 
@@ -60,10 +63,112 @@ class DataValidation:
         except Exception as e:
             raise USvisaException(e, sys)
 
+    def profile_data(self, file_path: str, columns: List[str]) -> Tuple[int, Dict[str, ColumnStatistics]]:
+        """
+        One streaming pass over ``file_path``: every chunk updates the
+        statistics of each schema column, so memory is bounded by the chunk
+        size rather than the file. Returns (rows, statistics per column).
+        """
+        try:
+            column_types = get_schema_column_types(self._schema_config)
+            constraints = self._schema_config.get("constraints") or {}
+            statistics = {
+                column: ColumnStatistics(
+                    column, column_types[column],
+                    min_value=(constraints.get(column) or {}).get("min"),
+                    max_value=(constraints.get(column) or {}).get("max")
+                )
+                for column in columns
+            }
+
+            rows = 0
+            for chunk in iter_dataframe_chunks(file_path, columns=columns,
+                                               chunk_size=self.data_validation_config.chunk_size):
+                rows += len(chunk)
+                for column, column_statistics in statistics.items():
+                    column_statistics.update(chunk[column])
+
+            logging.info(f"📏 Profiled {rows} rows x {len(columns)} columns")
+            return rows, statistics
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def check_data_quality(self, statistics: Dict[str, ColumnStatistics]) -> Tuple[List[str], Dict[str, dict]]:
+        """
+        Compare the profile with schema.yaml: types, null rates, numeric
+        bounds and categorical domains. Returns (error messages, unseen
+        category counts per column).
+        """
+        try:
+            constraints = self._schema_config.get("constraints") or {}
+            model_columns = set(self._schema_config["numerical_columns"] + self._schema_config["categorical_columns"])
+            default_max_null_rate = self._schema_config.get("max_null_rate")
+
+            error_messages, unseen_categories = [], {}
+            for column, column_statistics in statistics.items():
+                column_constraints = constraints.get(column) or {}
+
+                if column_statistics.type_errors:
+                    error_messages.append(
+                        f"❌ {column}: {column_statistics.type_errors} values are not {column_statistics.column_type}."
+                    )
+
+                max_null_rate = column_constraints.get(
+                    "max_null_rate", default_max_null_rate if column in model_columns else None
+                )
+                if max_null_rate is not None and column_statistics.null_rate > max_null_rate:
+                    error_messages.append(
+                        f"❌ {column}: null rate {column_statistics.null_rate:.4f} exceeds {max_null_rate}."
+                    )
+
+                if column_statistics.out_of_range:
+                    error_messages.append(
+                        f"❌ {column}: {column_statistics.out_of_range} values outside "
+                        f"[{column_constraints.get('min')}, {column_constraints.get('max')}]."
+                    )
+
+                allowed = column_constraints.get("allowed")
+                if allowed is not None and not column_statistics.is_numeric:
+                    allowed = set(allowed)
+                    unseen = {value: count for value, count in column_statistics.category_counts.items()
+                              if value not in allowed}
+                    if unseen:
+                        unseen_categories[column] = unseen
+                        error_messages.append(
+                            f"❌ {column}: {sum(unseen.values())} values in unseen categories {sorted(unseen)[:10]}."
+                        )
+
+            return error_messages, unseen_categories
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def write_report(self, validation_status: bool, error_messages: List[str], rows: int,
+                     statistics: Dict[str, ColumnStatistics], unseen_categories: Dict[str, dict]) -> str:
+        """Write the per-column profile, reusable by later stages, next to the validation status."""
+        try:
+            columns = {}
+            for column, column_statistics in statistics.items():
+                columns[column] = column_statistics.to_dict(DATA_VALIDATION_MAX_REPORTED_CATEGORIES)
+                if column in unseen_categories:
+                    columns[column]["unseen_categories"] = dict(sorted(unseen_categories[column].items()))
+
+            report_file_path = self.data_validation_config.report_file_path
+            write_yaml_file(report_file_path, content={
+                "validation_status": validation_status,
+                "errors": error_messages,
+                "rows": rows,
+                "columns": columns
+            }, replace=True)
+            return report_file_path
+        except Exception as e:
+            raise USvisaException(e, sys)
+
     def initiate_data_validation(self) -> DataValidationArtifact:
         try:
             logging.info("🚀 Starting data validation")
-            df = self.read_data(self.data_ingestion_artifact.feature_store_file_path)
+            feature_store_file_path = self.data_ingestion_artifact.feature_store_file_path
+            # Column checks only need the header; columnar formats read it from metadata
+            df = DataFrame(columns=read_column_names(feature_store_file_path))
 
             error_messages = []
 
@@ -73,12 +178,20 @@ class DataValidation:
             if not self.validate_required_columns_exist(df):
                 error_messages.append("❌ Some required columns are missing.")
 
+            # Profile whichever schema columns are present; missing ones are already reported
+            schema_columns = [column for column in get_schema_column_types(self._schema_config) if column in df.columns]
+            rows, statistics = self.profile_data(feature_store_file_path, schema_columns)
+            quality_errors, unseen_categories = self.check_data_quality(statistics)
+            error_messages.extend(quality_errors)
+
             validation_status = len(error_messages) == 0
             message = "✅ Data validation successful." if validation_status else " | ".join(error_messages)
+            report_file_path = self.write_report(validation_status, error_messages, rows, statistics, unseen_categories)
 
             artifact = DataValidationArtifact(
                 validation_status=validation_status,
-                message=message
+                message=message,
+                report_file_path=report_file_path
             )
 
             logging.info(f"🧾 Data Validation Artifact: {artifact}")
@@ -0,0 +1,284 @@
+import copy
+import os
+import shutil
+import sys
+import warnings
+from typing import Optional
+
+import numpy as np
+
+from src.exception import USvisaException
+from src.logger import logging
+from src.data_access.data_exe import USvisaData
+from src.components.data_validation import DataValidation
+from src.utils.main_utils import (
+    load_object,
+    save_object,
+    read_yaml_file,
+    write_yaml_file,
+    load_numpy_array_data,
+    save_numpy_array_data,
+    get_schema_column_types
+)
+from src.utils.artifact_format import load_dataframe
+from src.data_access.artifact_registry import get_latest_artifact_run
+from src.constants import (
+    MODEL_CONFIG_FILE_PATH,
+    SCHEMA_FILE_PATH,
+    DATA_INGESTION_DIR_NAME,
+    DATA_INGESTION_WATERMARK_FIELD,
+    DATA_INGESTION_WATERMARK_FILE_NAME,
+    DATA_TRANSFORMATION_DIR_NAME,
+    TRANSFORM_OBJECT_FILE_NAME,
+    MODEL_TRAINER_DIR_NAME,
+    MODEL_OBJECT_FILE_NAME,
+    MODEL_TRAINER_LABELS_FILE_NAME,
+    INCREMENTAL_TRAINER_DIR_NAME,
+    INCREMENTAL_STATE_FILE_NAME
+)
+from src.entity.config_entity import DataValidationConfig, IncrementalTrainerConfig
+from src.entity.artifact_entity import DataIngestionArtifact, IncrementalTrainerArtifact
+
+DEFAULT_INCREMENTAL_CONFIG = {
+    "watermark_field": DATA_INGESTION_WATERMARK_FIELD,
+    "batch_size": 10000,
+    "drift_threshold": 0.25
+}
+
+
+def min_squared_distances(data, centers: np.ndarray):
+    """Nearest-centre index and squared distance for every row (dense or CSR)."""
+    data_sq = np.asarray(data.multiply(data).sum(axis=1)).ravel() if hasattr(data, "multiply") \
+        else np.einsum("ij,ij->i", data, data)
+    distances = data_sq[:, None] - 2 * np.asarray(data @ centers.T) + np.einsum("ij,ij->i", centers, centers)[None, :]
+    labels = distances.argmin(axis=1)
+    return labels, np.maximum(distances[np.arange(len(labels)), labels], 0.0)
+
+
+class IncrementalModelTrainer:
+    """
+    Folds documents added since the previous run into that run's centroids
+    instead of re-ingesting and refitting everything.
+
+    Only an append-only watermark (``_id``) is supported: a document edited
+    in place would come back past an update-timestamp watermark and be
+    counted twice, with its old values still inside the centres. Edits are
+    picked up by the next full retrain.
+
+    Each centre moves to the running mean of every row ever assigned to it,
+    c_k <- (n_k * c_k + sum of new rows in k) / (n_k + m_k), which is the
+    update MiniBatchKMeans.partial_fit applies with per-centre learning rates,
+    carried over from the full fit's cluster sizes. The previous transformer
+    is reused as-is so old and new rows live in the same feature space.
+    Each increment goes through the same validation as a full run's feature
+    store, and the updated model is promoted only if model evaluation
+    accepts it against the serving one.
+
+    A full retrain is requested instead when there is no previous run or
+    watermark, or when the new rows sit noticeably further from the centres
+    than the training data did (mean squared distance to the nearest centre
+    relative to the previous run's, minus one, above ``drift_threshold``).
+    """
+
+    def __init__(self, incremental_trainer_config: IncrementalTrainerConfig, usvisa_data: USvisaData = None):
+        try:
+            self.incremental_trainer_config = incremental_trainer_config
+            self.usvisa_data = usvisa_data
+            self.schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            self.model_config = read_yaml_file(MODEL_CONFIG_FILE_PATH)
+            self.incremental_config = dict(DEFAULT_INCREMENTAL_CONFIG)
+            self.incremental_config.update(self.model_config.get("incremental") or {})
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def _get_usvisa_data(self) -> USvisaData:
+        if self.usvisa_data is None:
+            self.usvisa_data = USvisaData()
+        return self.usvisa_data
+
+    def load_previous_state(self, previous_run_dir: str, model) -> Optional[dict]:
+        """
+        State left by an earlier incremental run, or rebuilt from a full run's
+        ingestion watermark and training labels. None if neither exists.
+        """
+        state_path = os.path.join(previous_run_dir, INCREMENTAL_TRAINER_DIR_NAME, INCREMENTAL_STATE_FILE_NAME)
+        if os.path.exists(state_path):
+            return read_yaml_file(state_path)
+
+        watermark_path = os.path.join(previous_run_dir, DATA_INGESTION_DIR_NAME, DATA_INGESTION_WATERMARK_FILE_NAME)
+        labels_path = os.path.join(previous_run_dir, MODEL_TRAINER_DIR_NAME, MODEL_TRAINER_LABELS_FILE_NAME)
+        if not (os.path.exists(watermark_path) and os.path.exists(labels_path)):
+            return None
+
+        watermark_report = read_yaml_file(watermark_path) or {}
+        labels = load_numpy_array_data(labels_path)
+        n_clusters = len(model.cluster_centers_)
+        cluster_counts = np.bincount(labels, minlength=n_clusters)
+        return {
+            "watermark_field": watermark_report.get("watermark_field"),
+            "watermark": watermark_report.get("watermark"),
+            "cluster_counts": [int(count) for count in cluster_counts],
+            # KMeans inertia_ is the summed squared distance to the nearest centre
+            "mean_squared_distance": float(getattr(model, "inertia_", np.nan)) / max(1, len(labels)),
+            "base_run_dir": previous_run_dir,
+            "n_increments": 0
+        }
+
+    def _full_retrain(self, message: str, rows_processed: int = 0, drift: Optional[float] = None):
+        logging.info(f"🔁 Full retrain required: {message}")
+        return IncrementalTrainerArtifact(full_retrain_required=True, message=message,
+                                          rows_processed=rows_processed, drift=drift)
+
+    def _link_or_copy(self, source: str, destination: str) -> None:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copy2(source, destination)
+
+    def _discard_run_dir(self) -> None:
+        shutil.rmtree(self.incremental_trainer_config.incremental_trainer_dir, ignore_errors=True)
+        run_dir = self.incremental_trainer_config.training_pipeline_config.artifact_dir
+        if os.path.isdir(run_dir) and not os.listdir(run_dir):
+            os.rmdir(run_dir)
+
+    def validate_increment(self) -> None:
+        """Profile the increment and check it against schema.yaml, as a full run does its feature store."""
+        config = self.incremental_trainer_config
+        validation = DataValidation(
+            DataIngestionArtifact(feature_store_file_path=config.increment_file_path),
+            DataValidationConfig(config.training_pipeline_config)
+        )
+        validation_artifact = validation.initiate_data_validation()
+        if not validation_artifact.validation_status:
+            raise Exception(f"❌ Increment failed data validation. {validation_artifact.message}")
+
+    def initiate_incremental_training(self) -> IncrementalTrainerArtifact:
+        try:
+            logging.info("🚀 Starting incremental training")
+            config = self.incremental_trainer_config
+            watermark_field = self.incremental_config["watermark_field"]
+            if watermark_field != "_id":
+                return self._full_retrain(
+                    f"watermark field '{watermark_field}' can return edited documents; increments need _id"
+                )
+
+            try:
+                previous_run_dir = get_latest_artifact_run(
+                    exclude_run_dir=config.training_pipeline_config.artifact_dir
+                )
+            except Exception:
+                return self._full_retrain("no previous run to update")
+
+            model = load_object(os.path.join(previous_run_dir, MODEL_TRAINER_DIR_NAME, MODEL_OBJECT_FILE_NAME))
+            if not hasattr(model, "cluster_centers_"):
+                return self._full_retrain(f"{type(model).__name__} has no centroids to update")
+
+            state = self.load_previous_state(previous_run_dir, model)
+            if state is None or state.get("watermark") is None:
+                return self._full_retrain(f"no watermark recorded for {previous_run_dir}")
+            if state.get("watermark_field") != watermark_field:
+                return self._full_retrain(f"watermark field changed to '{watermark_field}'")
+            if not np.isfinite(state.get("mean_squared_distance", np.nan)):
+                return self._full_retrain("previous run has no baseline distance for drift detection")
+
+            column_types = get_schema_column_types(self.schema_config)
+            usvisa_data = self._get_usvisa_data()
+            rows, new_watermark = usvisa_data.export_collection_increment(
+                collection_name=config.collection_name,
+                file_path=config.increment_file_path,
+                columns=list(column_types.keys()),
+                watermark_field=watermark_field,
+                watermark_value=usvisa_data.decode_watermark(state["watermark"]),
+                column_types=column_types,
+                batch_size=self.incremental_config["batch_size"]
+            )
+            if rows == 0:
+                self._discard_run_dir()
+                logging.info(f"✅ No new documents since {previous_run_dir}; serving model unchanged")
+                return IncrementalTrainerArtifact(full_retrain_required=False, message="no new documents")
+
+            self.validate_increment()
+
+            transformer_path = os.path.join(previous_run_dir, DATA_TRANSFORMATION_DIR_NAME, TRANSFORM_OBJECT_FILE_NAME)
+            transformer = load_object(transformer_path)
+            input_features = self.schema_config["transform_columns"] + self.schema_config["oh_columns"]
+            increment_df = load_dataframe(config.increment_file_path, columns=input_features)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                increment_data = transformer.transform(increment_df)
+
+            centers = np.asarray(model.cluster_centers_, dtype=np.float64)
+            labels, squared_distances = min_squared_distances(increment_data, centers)
+            drift = float(squared_distances.mean() / state["mean_squared_distance"] - 1.0) \
+                if state["mean_squared_distance"] > 0 else float("inf")
+            logging.info(f"📐 {rows} new rows, drift vs previous run: {drift:.4f}")
+
+            if drift > self.incremental_config["drift_threshold"]:
+                return self._full_retrain(
+                    f"drift {drift:.4f} exceeds threshold {self.incremental_config['drift_threshold']}",
+                    rows_processed=rows, drift=drift
+                )
+
+            # Weighted running mean per centre; empty increments leave a centre where it was
+            n_clusters = len(centers)
+            old_counts = np.asarray(state["cluster_counts"], dtype=np.float64)
+            new_counts = np.bincount(labels, minlength=n_clusters).astype(np.float64)
+            new_sums = np.zeros_like(centers)
+            for cluster in np.flatnonzero(new_counts):
+                members = increment_data[labels == cluster]
+                new_sums[cluster] = np.asarray(members.sum(axis=0)).ravel()
+            total_counts = old_counts + new_counts
+            updated_centers = np.where(
+                new_counts[:, None] > 0,
+                (centers * old_counts[:, None] + new_sums) / np.maximum(total_counts, 1)[:, None],
+                centers
+            )
+
+            updated_model = copy.deepcopy(model)
+            updated_model.cluster_centers_ = updated_centers.astype(model.cluster_centers_.dtype)
+            if hasattr(updated_model, "_counts"):
+                # MiniBatchKMeans keeps per-centre counts for its own partial_fit learning rates
+                updated_model._counts = total_counts.astype(updated_model._counts.dtype)
+
+            new_labels, new_squared_distances = min_squared_distances(increment_data, updated_centers)
+            if len(np.unique(new_labels)) < 2:
+                # Nothing to score against the serving model; keep the watermark so these rows are retried
+                self._discard_run_dir()
+                logging.info(f"ℹ️ {rows} new rows all fall in one cluster; waiting for more before updating")
+                return IncrementalTrainerArtifact(full_retrain_required=False,
+                                                  message="increment too small to evaluate", drift=drift)
+
+            previous_total = old_counts.sum()
+            mean_squared_distance = float(
+                (state["mean_squared_distance"] * previous_total + new_squared_distances.sum())
+                / (previous_total + rows)
+            )
+
+            save_object(config.trained_model_file_path, updated_model)
+            self._link_or_copy(transformer_path, config.transformer_object_path)
+            transformed_data_path = config.transformed_sparse_data_path if hasattr(increment_data, "tocsr") \
+                else config.transformed_data_path
+            save_numpy_array_data(transformed_data_path, increment_data)
+            save_numpy_array_data(config.labels_file_path, np.asarray(new_labels, dtype=np.int32))
+            write_yaml_file(config.state_file_path, content={
+                "watermark_field": watermark_field,
+                "watermark": usvisa_data.encode_watermark(new_watermark),
+                "cluster_counts": [int(count) for count in total_counts],
+                "mean_squared_distance": mean_squared_distance,
+                "base_run_dir": state.get("base_run_dir", previous_run_dir),
+                "previous_run_dir": previous_run_dir,
+                "n_increments": int(state.get("n_increments", 0)) + 1
+            })
+            logging.info(f"✅ Incremental update of {previous_run_dir} saved to {config.trained_model_file_path}")
+            return IncrementalTrainerArtifact(
+                full_retrain_required=False,
+                message=f"updated centroids of {previous_run_dir} with {rows} rows",
+                rows_processed=rows,
+                drift=drift,
+                model_path=config.trained_model_file_path,
+                transformed_data_path=transformed_data_path,
+                labels_path=config.labels_file_path
+            )
+        except Exception as e:
+            raise USvisaException(e, sys)
@@ -1,74 +1,161 @@
 import os
 import sys
-import pandas as pd
-from sklearn.metrics import silhouette_score
-from sklearn.cluster import KMeans
+import warnings
+import numpy as np
 
 from src.exception import USvisaException
 from src.logger import logging
+from src.utils.cluster_scoring import get_scoring_config, score_clustering
 from src.utils.main_utils import (
     load_object,
     read_yaml_file,
     write_yaml_file,
-    save_object  # ✅ Make sure this exists
+    load_numpy_array_data
 )
+from src.utils.artifact_format import load_dataframe_rows
+from src.constants import (
+    DATA_TRANSFORMATION_DIR_NAME,
+    MODEL_CONFIG_FILE_PATH,
+    MODEL_OBJECT_FILE_NAME,
+    MODEL_TRAINER_DIR_NAME,
+    SCHEMA_FILE_PATH,
+    TRANSFORM_OBJECT_FILE_NAME
+)
+from src.data_access.artifact_registry import get_latest_artifact_run
 
 from src.entity.config_entity import ModelEvaluationConfig
-from src.entity.artifact_entity import DataTransformationArtifact, ModelEvaluationArtifact
+from src.entity.artifact_entity import (
+    DataIngestionArtifact,
+    DataTransformationArtifact,
+    ModelTrainerArtifact,
+    ModelEvaluationArtifact
+)
 
 
 class ModelEvaluation:
     def __init__(self, model_eval_config: ModelEvaluationConfig,
-                 data_transformation_artifact: DataTransformationArtifact):
+                 data_transformation_artifact: DataTransformationArtifact,
+                 model_trainer_artifact: ModelTrainerArtifact,
+                 data_ingestion_artifact: DataIngestionArtifact = None):
         try:
             self.model_eval_config = model_eval_config
             self.data_transformation_artifact = data_transformation_artifact
+            self.model_trainer_artifact = model_trainer_artifact
+            self.data_ingestion_artifact = data_ingestion_artifact
+            self.model_config = read_yaml_file(MODEL_CONFIG_FILE_PATH)
+            self.schema_config = read_yaml_file(SCHEMA_FILE_PATH)
         except Exception as e:
             raise USvisaException(e, sys)
 
+    def get_evaluation_sample(self, n_rows: int) -> np.ndarray:
+        """Row indices of the evaluation sample shared by the new and incumbent models."""
+        evaluation_config = self.model_config.get("evaluation") or {}
+        sample_size = evaluation_config.get("sample_size", 20000)
+        rng = np.random.default_rng(evaluation_config.get("random_state", 42))
+        if n_rows <= sample_size:
+            return np.arange(n_rows)
+        return np.sort(rng.choice(n_rows, size=sample_size, replace=False))
+
+    def get_incumbent_labels(self, sample_index: np.ndarray):
+        """
+        Predict the evaluation sample with the model currently serving (the
+        latest accepted earlier run), using that run's own transformer on the
+        raw feature-store rows. Returns (run_dir, labels) or (None, None).
+        """
+        current_run_dir = self.model_eval_config.training_pipeline_config.artifact_dir
+        try:
+            incumbent_run_dir = get_latest_artifact_run(exclude_run_dir=current_run_dir)
+        except Exception:
+            logging.info("ℹ️ No incumbent model found; the new model is evaluated on its own")
+            return None, None
+
+        if self.data_ingestion_artifact is None:
+            logging.info("ℹ️ No ingestion artifact given; skipping incumbent comparison")
+            return None, None
+
+        try:
+            incumbent_model = load_object(
+                os.path.join(incumbent_run_dir, MODEL_TRAINER_DIR_NAME, MODEL_OBJECT_FILE_NAME)
+            )
+            incumbent_transformer = load_object(
+                os.path.join(incumbent_run_dir, DATA_TRANSFORMATION_DIR_NAME, TRANSFORM_OBJECT_FILE_NAME)
+            )
+            input_features = self.schema_config["transform_columns"] + self.schema_config["oh_columns"]
+            # Only the sampled rows are kept; the rest of the feature store is streamed past
+            raw_sample = load_dataframe_rows(
+                self.data_ingestion_artifact.feature_store_file_path, sample_index, columns=input_features
+            )
+
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                labels = incumbent_model.predict(incumbent_transformer.transform(raw_sample))
+            return incumbent_run_dir, np.asarray(labels)
+        except Exception as e:
+            logging.info(f"⚠️ Could not score incumbent from {incumbent_run_dir}: {e}")
+            return None, None
+
     def initiate_model_evaluation(self) -> ModelEvaluationArtifact:
         try:
             logging.info("🚀 Starting model evaluation")
 
-            # Load transformed data
-            transformed_data = pd.read_csv(self.data_transformation_artifact.transformed_data_path)
+            # Reuse the trainer's transformed matrix and cached labels; nothing is refit
+            transformed_data = load_numpy_array_data(self.data_transformation_artifact.transformed_data_path, mmap_mode="r")
+            new_labels = load_numpy_array_data(self.model_trainer_artifact.labels_path)
 
-            # Load model config
-            model_config = read_yaml_file(os.path.join("config", "model.yaml"))
-            model_params = model_config["model_selection"]["module_0"]["params"]
+            evaluation_config = self.model_config.get("evaluation") or {}
+            min_improvement = evaluation_config.get("min_improvement", 0.0)
+            scoring_config = get_scoring_config(self.model_config)
 
-            # Fit new model
-            new_model = KMeans(**model_params)
-            new_model.fit(transformed_data)
+            sample_index = self.get_evaluation_sample(len(new_labels))
+            sample_data = transformed_data[sample_index]
 
-            new_score = silhouette_score(transformed_data, new_model.labels_)
+            # Both labelings are scored in the new run's feature space on the same rows
+            new_cluster_score = score_clustering(sample_data, new_labels[sample_index], scoring_config)
+            new_score = new_cluster_score.value
+
+            incumbent_run_dir, incumbent_labels = self.get_incumbent_labels(sample_index)
+            incumbent_cluster_score = None
+            if incumbent_labels is not None and len(np.unique(incumbent_labels)) > 1:
+                incumbent_cluster_score = score_clustering(sample_data, incumbent_labels, scoring_config)
+
+            if incumbent_cluster_score is None:
+                improvement = new_cluster_score.ranking_value
+                is_model_accepted = True
+            else:
+                improvement = new_cluster_score.ranking_value - incumbent_cluster_score.ranking_value
+                is_model_accepted = improvement > min_improvement
 
             # Save evaluation report
             eval_report = {
                 "model_evaluation": {
-                    "silhouette_score": float(new_score)
+                    "silhouette_score": float(new_score),
+                    "score_details": new_cluster_score.to_dict(),
+                    "is_model_accepted": bool(is_model_accepted),
+                    "improvement": float(improvement),
+                    "min_improvement": float(min_improvement),
+                    "evaluation_sample_size": int(len(sample_index)),
+                    "incumbent_run_dir": incumbent_run_dir,
+                    "incumbent_score_details": incumbent_cluster_score.to_dict() if incumbent_cluster_score else None
                 }
             }
 
             os.makedirs(os.path.dirname(self.model_eval_config.model_evaluation_file_path), exist_ok=True)
             write_yaml_file(self.model_eval_config.model_evaluation_file_path, content=eval_report)
 
-            # Save evaluated model
-            evaluated_model_path = os.path.join(
-                os.path.dirname(self.model_eval_config.model_evaluation_file_path),
-                "evaluated_model.pkl"
+            logging.info(
+                f"✅ Model evaluation completed. Score: {new_score:.4f}, "
+                f"incumbent: {incumbent_cluster_score.value if incumbent_cluster_score else None}, "
+                f"accepted: {is_model_accepted}"
             )
-            save_object(evaluated_model_path, new_model)
-
-            logging.info(f"✅ Model evaluation completed. Silhouette Score: {new_score:.4f}")
 
             return ModelEvaluationArtifact(
-                is_model_accepted=True,
-                evaluated_model_path=evaluated_model_path,
+                is_model_accepted=is_model_accepted,
+                evaluated_model_path=self.model_trainer_artifact.model_path,
                 silhouette_score=new_score,
-                improved_accuracy=new_score  # You can subtract previous_score if comparing
+                improved_accuracy=improvement,
+                incumbent_run_dir=incumbent_run_dir,
+                incumbent_score=incumbent_cluster_score.value if incumbent_cluster_score else None
             )
 
         except Exception as e:
             raise USvisaException(e, sys)
-
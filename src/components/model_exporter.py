@@ -0,0 +1,192 @@
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.exception import USvisaException
+from src.logger import logging
+from src.utils.main_utils import load_object
+from src.utils.artifact_format import load_dataframe
+from src.utils.inference_artifact import write_inference_artifact
+from src.data_access.artifact_registry import compute_file_sha256
+from src.pipline.compact_predictor import CompactPredictor
+from src.entity.config_entity import ModelExporterConfig
+from src.entity.artifact_entity import (
+    DataIngestionArtifact,
+    DataTransformationArtifact,
+    ModelTrainerArtifact,
+    ModelExporterArtifact
+)
+
+
+class UnsupportedModelError(Exception):
+    pass
+
+
+def check_equivalence(predictor: CompactPredictor, transformer, model, sample: pd.DataFrame) -> None:
+    """
+    Raise ValueError unless ``predictor`` reproduces the sklearn transform
+    bit for bit and every label on ``sample``.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected_data = transformer.transform(sample)
+        expected_labels = np.asarray(model.predict(expected_data))
+    if scipy.sparse.issparse(expected_data):
+        expected_data = expected_data.toarray()
+
+    compact_data = predictor.transform(sample)
+    if not np.array_equal(compact_data, expected_data):
+        raise ValueError("Compact transform differs from the fitted transformer")
+    mismatches = int((predictor.predict(sample) != expected_labels).sum())
+    if mismatches:
+        raise ValueError(f"Compact predictor disagrees with the model on {mismatches}/{len(sample)} rows")
+    single = predictor.predict_one(sample.iloc[0].to_dict())
+    if single != expected_labels[0]:
+        raise ValueError("Single-record path disagrees with the model")
+
+
+def build_probe_frame(predictor: CompactPredictor, n_rows: int = 256, random_state: int = 42) -> pd.DataFrame:
+    """
+    Synthetic rows for checking equivalence when no real data is at hand:
+    numerics drawn around the scaler's mean (wide enough to reach every
+    centroid), every known category cycled through, plus one unseen value.
+    """
+    rng = np.random.default_rng(random_state)
+    probe = {}
+    for position, name in enumerate(predictor.numeric_features):
+        probe[name] = predictor.scaler_mean[position] + 3 * predictor.scaler_scale[position] * rng.standard_normal(n_rows)
+    for position, name in enumerate(predictor.categorical_features):
+        values = [value for value in predictor.header["categories"][position] if value is not None] + ["__unseen__"]
+        probe[name] = [values[index % len(values)] for index in rng.permutation(n_rows)]
+    return pd.DataFrame(probe, columns=predictor.numeric_features + predictor.categorical_features)
+
+
+class ModelExporter:
+    """
+    Compiles a run's fitted transformer and clustering model into one
+    memory-mappable inference artifact (see src.utils.inference_artifact)
+    that CompactPredictor serves with NumPy alone.
+
+    Only the shapes this pipeline produces are compiled: a ColumnTransformer
+    of StandardScaler and OneHotEncoder (no drop, no infrequent categories)
+    in front of a centroid model. Anything else is skipped and serving keeps
+    using the pickles. The export is checked against the sklearn objects on
+    a sample of raw rows and a synthetic probe (see check_equivalence) and
+    discarded if a single value or label differs.
+    """
+
+    def __init__(self, model_exporter_config: ModelExporterConfig,
+                 data_transformation_artifact: DataTransformationArtifact,
+                 model_trainer_artifact: ModelTrainerArtifact,
+                 data_ingestion_artifact: DataIngestionArtifact):
+        try:
+            self.model_exporter_config = model_exporter_config
+            self.data_transformation_artifact = data_transformation_artifact
+            self.model_trainer_artifact = model_trainer_artifact
+            self.data_ingestion_artifact = data_ingestion_artifact
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    @staticmethod
+    def compile(transformer, model) -> tuple:
+        """(header, arrays) for the inference artifact, or UnsupportedModelError."""
+        if not isinstance(transformer, ColumnTransformer):
+            raise UnsupportedModelError(f"{type(transformer).__name__} is not a ColumnTransformer")
+        if not hasattr(model, "cluster_centers_"):
+            raise UnsupportedModelError(f"{type(model).__name__} has no centroids")
+
+        steps = [(name, fitted, list(columns)) for name, fitted, columns in transformer.transformers_
+                 if not (isinstance(fitted, str) and fitted == "drop")]
+        if (len(steps) != 2 or not isinstance(steps[0][1], StandardScaler)
+                or not isinstance(steps[1][1], OneHotEncoder)):
+            raise UnsupportedModelError("Expected a StandardScaler step followed by a OneHotEncoder step")
+        (_, scaler, numeric_features), (_, encoder, categorical_features) = steps
+
+        if encoder.drop is not None or getattr(encoder, "infrequent_categories_", None) is not None:
+            raise UnsupportedModelError("OneHotEncoder with drop or infrequent categories is not supported")
+        if not (scaler.with_mean and scaler.with_std):
+            raise UnsupportedModelError("StandardScaler must center and scale")
+
+        categories = []
+        for column_categories in encoder.categories_:
+            categories.append([
+                None if isinstance(value, float) and np.isnan(value)
+                else value.item() if isinstance(value, np.generic) else value
+                for value in column_categories
+            ])
+
+        centroids = np.asarray(model.cluster_centers_, dtype=np.float64)
+        header = {
+            "model_class": type(model).__name__,
+            "numeric_features": numeric_features,
+            "categorical_features": categorical_features,
+            "categories": categories,
+            "n_features_out": len(numeric_features) + sum(len(values) for values in categories),
+            "n_clusters": int(centroids.shape[0])
+        }
+        arrays = {
+            "scaler_mean": np.asarray(scaler.mean_, dtype=np.float64),
+            "scaler_scale": np.asarray(scaler.scale_, dtype=np.float64),
+            "centroids": centroids,
+            "centroid_sq_norms": np.einsum("ij,ij->i", centroids, centroids)
+        }
+        return header, arrays
+
+    def verify(self, predictor: CompactPredictor, transformer, model) -> int:
+        """Compare against sklearn on up to verify_sample_size raw rows; returns the rows checked."""
+        input_features = predictor.numeric_features + predictor.categorical_features
+        raw_df = load_dataframe(self.data_ingestion_artifact.feature_store_file_path, columns=input_features)
+        # Rows with missing numerics cannot be predicted by either side
+        raw_df = raw_df.dropna(subset=predictor.numeric_features)
+        sample_size = min(len(raw_df), self.model_exporter_config.verify_sample_size)
+        rng = np.random.default_rng(42)
+        sample = raw_df.iloc[np.sort(rng.choice(len(raw_df), size=sample_size, replace=False))]
+        check_equivalence(predictor, transformer, model, sample)
+        return sample_size
+
+    def initiate_model_exporter(self) -> ModelExporterArtifact:
+        try:
+            logging.info("🚀 Starting model export")
+            output_path = self.model_exporter_config.inference_artifact_path
+            transformer_path = self.data_transformation_artifact.transformer_object_path
+            model_path = self.model_trainer_artifact.model_path
+            transformer = load_object(transformer_path)
+            model = load_object(model_path)
+
+            try:
+                header, arrays = self.compile(transformer, model)
+            except UnsupportedModelError as e:
+                logging.info(f"ℹ️ Skipping compact export: {e}")
+                return ModelExporterArtifact(inference_artifact_path=None, is_exported=False, message=str(e))
+
+            header.update({
+                "model_version": os.path.basename(
+                    os.path.normpath(self.model_exporter_config.training_pipeline_config.artifact_dir)
+                ),
+                "source_hashes": {
+                    "model": compute_file_sha256(model_path),
+                    "transformer": compute_file_sha256(transformer_path)
+                }
+            })
+            write_inference_artifact(output_path, header, arrays)
+
+            try:
+                predictor = CompactPredictor(output_path)
+                rows_checked = self.verify(predictor, transformer, model)
+                check_equivalence(predictor, transformer, model, build_probe_frame(predictor))
+            except ValueError as e:
+                os.remove(output_path)
+                logging.info(f"⚠️ Compact export discarded: {e}")
+                return ModelExporterArtifact(inference_artifact_path=None, is_exported=False, message=str(e))
+
+            message = f"verified against sklearn on {rows_checked} rows plus a synthetic probe"
+            logging.info(f"✅ Inference artifact saved to {output_path} ({os.path.getsize(output_path)} bytes), {message}")
+            return ModelExporterArtifact(inference_artifact_path=output_path, is_exported=True, message=message)
+        except Exception as e:
+            raise USvisaException(e, sys)
@@ -0,0 +1,61 @@
+import sys
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Optional
+
+from src.exception import USvisaException
+from src.logger import logging
+from src.data_access.artifact_registry import ArtifactRegistry
+from src.entity.config_entity import ModelPusherConfig
+from src.entity.artifact_entity import ModelEvaluationArtifact, ModelPusherArtifact
+
+
+class ModelPusher:
+    """
+    Records a finished run in the artifact registry and, when evaluation
+    accepted it, moves the registry's promoted pointer to it so serving
+    switches over. Optionally garbage-collects old runs afterwards.
+    """
+
+    def __init__(self, model_pusher_config: ModelPusherConfig,
+                 model_evaluation_artifact: ModelEvaluationArtifact,
+                 stage_artifacts: Optional[Dict[str, Any]] = None,
+                 mode: str = "full"):
+        try:
+            self.model_pusher_config = model_pusher_config
+            self.model_evaluation_artifact = model_evaluation_artifact
+            self.stage_artifacts = stage_artifacts or {}
+            self.mode = mode
+            self.registry = ArtifactRegistry(model_pusher_config.base_artifact_path)
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def initiate_model_pusher(self) -> ModelPusherArtifact:
+        try:
+            logging.info("🚀 Starting model pusher")
+            run_dir = self.model_pusher_config.training_pipeline_config.artifact_dir
+
+            if not self.registry.exists():
+                # First push: pick up runs that predate the registry so they can be compared and collected
+                self.registry.bootstrap_from_disk()
+
+            stages = {name: asdict(artifact) if is_dataclass(artifact) else artifact
+                      for name, artifact in self.stage_artifacts.items()}
+            is_promoted = bool(self.model_evaluation_artifact.is_model_accepted)
+            self.registry.register_run(run_dir, stages=stages, accepted=is_promoted, mode=self.mode)
+            if is_promoted:
+                self.registry.promote(run_dir)
+
+            removed_run_dirs = []
+            if self.model_pusher_config.keep_last_runs > 0:
+                removed_run_dirs = self.registry.garbage_collect(self.model_pusher_config.keep_last_runs)
+
+            promoted_run_dir = self.registry.get_promoted_run()
+            logging.info(f"✅ Model pusher completed. Serving run: {promoted_run_dir}")
+            return ModelPusherArtifact(
+                run_dir=run_dir,
+                is_promoted=is_promoted,
+                promoted_run_dir=promoted_run_dir,
+                removed_run_dirs=removed_run_dirs
+            )
+        except Exception as e:
+            raise USvisaException(e, sys)
@@ -0,0 +1,222 @@
+import importlib
+import itertools
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from src.exception import USvisaException
+from src.logger import logging
+from src.utils.main_utils import load_numpy_array_data, load_object, save_numpy_array_data, save_object
+from src.utils.cluster_scoring import ClusterScore, score_clustering
+
+
+@dataclass
+class ModelCandidate:
+    name: str
+    class_name: str
+    module: str
+    params: Dict[str, Any]
+
+
+@dataclass
+class CandidateResult:
+    candidate: ModelCandidate
+    status: str
+    score: Optional[float] = None
+    fit_seconds: Optional[float] = None
+    error: Optional[str] = None
+    cluster_score: Optional[ClusterScore] = None
+    # Written by the worker; only the winner's are loaded back into model / labels
+    model_path: Optional[str] = field(default=None, repr=False)
+    labels_path: Optional[str] = field(default=None, repr=False)
+    model: Any = field(default=None, repr=False)
+    labels: Any = field(default=None, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.candidate.name,
+            "class": self.candidate.class_name,
+            "module": self.candidate.module,
+            "params": self.candidate.params,
+            "status": self.status,
+            "score": self.score,
+            "score_details": self.cluster_score.to_dict() if self.cluster_score else None,
+            "fit_seconds": self.fit_seconds,
+            "error": self.error
+        }
+
+
+class CandidateTimeoutError(Exception):
+    pass
+
+
+def expand_model_candidates(model_selection: dict) -> List[ModelCandidate]:
+    """
+    Turn the model_selection section of model.yaml into concrete candidates.
+    An entry may carry a ``param_grid`` (param -> list of values); every
+    combination is merged over ``params`` and becomes its own candidate.
+    """
+    candidates = []
+    for model_key, model_info in model_selection.items():
+        class_name = model_info["class"]
+        base_params = model_info.get("params") or {}
+        param_grid = model_info.get("param_grid") or {}
+
+        if not param_grid:
+            candidates.append(ModelCandidate(f"{model_key}_{class_name}", class_name, model_info["module"], dict(base_params)))
+            continue
+
+        grid_keys = list(param_grid.keys())
+        for index, values in enumerate(itertools.product(*(param_grid[key] for key in grid_keys))):
+            params = dict(base_params)
+            params.update(dict(zip(grid_keys, values)))
+            candidates.append(ModelCandidate(f"{model_key}_{class_name}_{index}", class_name, model_info["module"], params))
+    return candidates
+
+
+def _raise_timeout(signum, frame):
+    raise CandidateTimeoutError()
+
+
+def evaluate_candidate(candidate: ModelCandidate, data_path: str, output_dir: str,
+                       timeout_seconds: Optional[float] = None, limit_threads: bool = False,
+                       scoring_config: Optional[dict] = None) -> CandidateResult:
+    """
+    Fit one candidate and score it. Runs inside a worker process: the matrix
+    is memory-mapped from disk, so workers share the OS page cache instead of
+    each receiving a pickled copy. The fitted model and its labels are
+    written to ``output_dir`` and only their paths travel back to the parent.
+    """
+    # SIGALRM handlers can only be installed from the main thread of a process
+    use_alarm = (bool(timeout_seconds) and hasattr(signal, "setitimer")
+                 and threading.current_thread() is threading.main_thread())
+    previous_handler = None
+    started = time.perf_counter()
+    try:
+        data = load_numpy_array_data(data_path, mmap_mode="r")
+        model_class = getattr(importlib.import_module(candidate.module), candidate.class_name)
+        model = model_class(**candidate.params)
+
+        if use_alarm:
+            previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if limit_threads:
+                # One BLAS/OpenMP thread per worker so parallel candidates don't oversubscribe cores
+                from threadpoolctl import threadpool_limits
+                with threadpool_limits(limits=1):
+                    model.fit(data)
+                    clusters = model.predict(data)
+            else:
+                model.fit(data)
+                clusters = model.predict(data)
+            cluster_score = score_clustering(data, clusters, scoring_config)
+
+        fit_seconds = time.perf_counter() - started
+        model_path = os.path.join(output_dir, f"{candidate.name}.pkl")
+        labels_path = os.path.join(output_dir, f"{candidate.name}_labels.npy")
+        save_object(model_path, model)
+        save_numpy_array_data(labels_path, np.asarray(clusters, dtype=np.int32))
+
+        return CandidateResult(candidate, "ok", score=cluster_score.value, fit_seconds=fit_seconds,
+                               cluster_score=cluster_score, model_path=model_path, labels_path=labels_path)
+    except CandidateTimeoutError:
+        return CandidateResult(candidate, "timeout", fit_seconds=time.perf_counter() - started,
+                               error=f"exceeded {timeout_seconds}s")
+    except Exception as e:
+        return CandidateResult(candidate, "error", fit_seconds=time.perf_counter() - started, error=str(e))
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            if previous_handler is not None:
+                signal.signal(signal.SIGALRM, previous_handler)
+
+
+class ParallelModelSearch:
+    """
+    Evaluates model candidates across a process pool. Each candidate gets its
+    own timeout (enforced inside the worker); an overall deadline of
+    timeout * number of rounds backs that up by terminating the pool.
+    """
+
+    def __init__(self, data_path: str, n_jobs: int = -1, timeout_seconds: Optional[float] = None,
+                 scoring_config: Optional[dict] = None):
+        self.data_path = data_path
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs in (None, -1) else max(1, n_jobs)
+        self.timeout_seconds = timeout_seconds
+        self.scoring_config = scoring_config
+
+    def run(self, candidates: List[ModelCandidate]) -> List[CandidateResult]:
+        try:
+            n_workers = min(self.n_jobs, len(candidates))
+            logging.info(f"🔍 Evaluating {len(candidates)} candidates on {n_workers} worker(s)")
+
+            output_dir = tempfile.mkdtemp(prefix="model_search_", dir=os.path.dirname(os.path.abspath(self.data_path)))
+            try:
+                if n_workers <= 1:
+                    results = [evaluate_candidate(candidate, self.data_path, output_dir, self.timeout_seconds,
+                                                  scoring_config=self.scoring_config)
+                               for candidate in candidates]
+                else:
+                    results = self._run_parallel(candidates, n_workers, output_dir)
+
+                leaderboard = self.leaderboard(results)
+                if leaderboard and leaderboard[0].status == "ok":
+                    self.load_outputs(leaderboard[0])
+                return leaderboard
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    @staticmethod
+    def load_outputs(result: CandidateResult) -> CandidateResult:
+        """Load a candidate's fitted model and labels from the files its worker wrote."""
+        result.model = load_object(result.model_path)
+        result.labels = load_numpy_array_data(result.labels_path)
+        return result
+
+    def _run_parallel(self, candidates: List[ModelCandidate], n_workers: int,
+                      output_dir: str) -> List[CandidateResult]:
+        deadline = None
+        if self.timeout_seconds:
+            rounds = -(-len(candidates) // n_workers)
+            deadline = time.monotonic() + self.timeout_seconds * rounds + 30
+
+        pool = multiprocessing.Pool(processes=n_workers)
+        try:
+            pending = [
+                (candidate, pool.apply_async(evaluate_candidate, (candidate, self.data_path, output_dir,
+                                                                   self.timeout_seconds, True, self.scoring_config)))
+                for candidate in candidates
+            ]
+            results = []
+            for candidate, async_result in pending:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    results.append(async_result.get(timeout=remaining))
+                except multiprocessing.TimeoutError:
+                    results.append(CandidateResult(candidate, "timeout", error="search deadline exceeded"))
+            return results
+        finally:
+            # terminate() also kills any worker stuck in native code past its alarm
+            pool.terminate()
+            pool.join()
+
+    @staticmethod
+    def leaderboard(results: List[CandidateResult]) -> List[CandidateResult]:
+        return sorted(results, key=lambda result: (
+            result.cluster_score is None,
+            -result.cluster_score.ranking_value if result.cluster_score else 0.0
+        ))
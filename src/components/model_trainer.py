@@ -1,26 +1,38 @@
 import os
 import sys
-import pandas as pd
-import importlib
 import joblib
-from sklearn.metrics import silhouette_score
 from src.logger import logging
 from src.exception import USvisaException
-from src.utils.main_utils import read_yaml_file, save_object
+from src.utils.main_utils import read_yaml_file, write_yaml_file, save_object, save_numpy_array_data
+from src.components.model_search import ParallelModelSearch, expand_model_candidates
+from src.utils.cluster_scoring import get_scoring_config
 from src.constants import MODEL_CONFIG_FILE_PATH
 from src.entity.config_entity import ModelTrainerConfig
 from src.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact
 
-# ✅ MLflow & .env setup
-import mlflow
-import mlflow.sklearn
-from dotenv import load_dotenv
 
-# Load .env variables
-load_dotenv()
-mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI"))
-os.environ["MLFLOW_TRACKING_USERNAME"] = os.getenv("MLFLOW_TRACKING_USERNAME")
-os.environ["MLFLOW_TRACKING_PASSWORD"] = os.getenv("MLFLOW_TRACKING_PASSWORD")
+_mlflow = None
+
+
+def get_mlflow():
+    """
+    ✅ MLflow & .env setup, done on first use rather than at import so that
+    importing this module (or anything serving-side that reaches it) does
+    not load mlflow or read its credentials.
+    """
+    global _mlflow
+    if _mlflow is None:
+        import mlflow
+        import mlflow.sklearn
+        from dotenv import load_dotenv
+
+        # Load .env variables
+        load_dotenv()
+        mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI"))
+        os.environ["MLFLOW_TRACKING_USERNAME"] = os.getenv("MLFLOW_TRACKING_USERNAME")
+        os.environ["MLFLOW_TRACKING_PASSWORD"] = os.getenv("MLFLOW_TRACKING_PASSWORD")
+        _mlflow = mlflow
+    return _mlflow
 
 
 class ModelTrainer:
@@ -36,14 +48,13 @@ class ModelTrainer:
 
     def train_model(self) -> ModelTrainerArtifact:
         try:
-            logging.info("🚀 Loading transformed data")
-            df = pd.read_csv(self.data_transformation_artifact.transformed_data_path)
-
-            best_model = None
-            best_score = -1
-            best_model_name = None
+            transformed_data_path = self.data_transformation_artifact.transformed_data_path
+            search_config = self.model_config.get("search") or {}
+            scoring_config = get_scoring_config(self.model_config)
+            metric = scoring_config["metric"]
 
             # ✅ Start MLflow experiment
+            mlflow = get_mlflow()
             mlflow.set_experiment("Model_Trainer_Clustering")
            
 
@@ -51,46 +62,60 @@ class ModelTrainer:
                 mlflow.log_param("transformed_data_path", self.data_transformation_artifact.transformed_data_path)
 
                 logging.info("🔍 Searching best model from model.yaml")
-                for model_key, model_info in self.model_config['model_selection'].items():
-                    class_name = model_info['class']
-                    module_name = model_info['module']
-                    params = model_info['params']
-
-                    model_class = getattr(importlib.import_module(module_name), class_name)
-                    model = model_class(**params)
-
-                    model.fit(df)
-                    clusters = model.predict(df)
-                    score = silhouette_score(df, clusters)
-
-                    logging.info(f"Model: {class_name}, Silhouette Score: {score}")
-
-                    # ✅ Log each model's params and metric
-                    mlflow.log_param(f"{class_name}_params", str(params))
-                    mlflow.log_metric(f"{class_name}_silhouette", score)
-
-                    if score > best_score:
-                        best_model = model
-                        best_score = score
-                        best_model_name = class_name
+                candidates = expand_model_candidates(self.model_config['model_selection'])
+                search = ParallelModelSearch(
+                    data_path=transformed_data_path,
+                    n_jobs=search_config.get("n_jobs", -1),
+                    timeout_seconds=search_config.get("timeout_seconds"),
+                    scoring_config=scoring_config
+                )
+                leaderboard = search.run(candidates)
+
+                # ✅ Log each model's params and metric from the parent process
+                for result in leaderboard:
+                    logging.info(f"Model: {result.candidate.name}, Status: {result.status}, {metric} score: {result.cluster_score}")
+                    mlflow.log_param(f"{result.candidate.name}_params", str(result.candidate.params))
+                    if result.cluster_score is not None:
+                        mlflow.log_metric(f"{result.candidate.name}_{metric}", result.cluster_score.value)
+
+                write_yaml_file(
+                    self.model_trainer_config.leaderboard_file_path,
+                    content={"leaderboard": [result.to_dict() for result in leaderboard]},
+                    replace=True
+                )
+                mlflow.log_artifact(self.model_trainer_config.leaderboard_file_path)
 
-                if best_model is None:
+                best_result = leaderboard[0] if leaderboard else None
+                if best_result is None or best_result.status != "ok":
                     raise Exception("❌ No model was successfully trained.")
 
+                best_model = best_result.model
+                best_score = best_result.score
+                best_model_name = best_result.candidate.class_name
+                best_cluster_score = best_result.cluster_score
+
                 os.makedirs(os.path.dirname(self.model_trainer_config.trained_model_file_path), exist_ok=True)
                 save_object(self.model_trainer_config.trained_model_file_path, best_model)
+                # Cache the winner's training labels so evaluation never has to refit or re-predict
+                save_numpy_array_data(self.model_trainer_config.labels_file_path, best_result.labels)
 
                 logging.info(f"✅ Best Model: {best_model_name}, Score: {best_score}")
 
                 # ✅ Log best model details and artifact
                 mlflow.log_param("best_model", best_model_name)
-                mlflow.log_metric("best_silhouette_score", best_score)
+                mlflow.log_param("scoring_method", best_cluster_score.method)
+                mlflow.log_metric(f"best_{metric}_score", best_score)
+                if best_cluster_score.ci_low is not None:
+                    mlflow.log_metric(f"best_{metric}_ci_low", best_cluster_score.ci_low)
+                    mlflow.log_metric(f"best_{metric}_ci_high", best_cluster_score.ci_high)
                 joblib.dump(best_model, "best_model.pkl")  # ✅ Save model locally
                 mlflow.log_artifact("best_model.pkl") 
 
                 return ModelTrainerArtifact(
                     model_path=self.model_trainer_config.trained_model_file_path,
-                    silhouette_score=best_score
+                    silhouette_score=best_score,
+                    score_details=best_cluster_score.to_dict(),
+                    labels_path=self.model_trainer_config.labels_file_path
                 )
 
         except Exception as e:
@@ -10,15 +10,21 @@ ca = certifi.where()
 class MongoDBClient:
     client = None
 
-    def __init__(self, database_name=DATABASE_NAME):
+    def __init__(self, database_name=DATABASE_NAME, client=None):
+        """
+        :param client: optional pre-built client (e.g. mongomock.MongoClient or a
+                       local mongod) used instead of the shared Atlas connection
+        """
         try:
-            if MongoDBClient.client is None:
-                if MONGODB_URL is None:
-                    raise ValueError("MongoDB URL is not set.")
-                MongoDBClient.client = pymongo.MongoClient(MONGODB_URL, tlsCAFile=ca)
-            self.client = MongoDBClient.client
+            if client is not None:
+                self.client = client
+            else:
+                if MongoDBClient.client is None:
+                    if MONGODB_URL is None:
+                        raise ValueError("MongoDB URL is not set.")
+                    MongoDBClient.client = pymongo.MongoClient(MONGODB_URL, tlsCAFile=ca)
+                self.client = MongoDBClient.client
             self.database = self.client[database_name]
             logging.info("✅ MongoDB connection successful.")
         except Exception as e:
             raise USvisaException(e, sys)
-
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.exception import USvisaException
+from src.logger import logging
+from src.utils.main_utils import read_yaml_file
+from src.constants import (
+    ARTIFACT_DIR,
+    ARTIFACT_REGISTRY_FILE_NAME,
+    ARTIFACT_RUN_TIMESTAMP_FORMAT,
+    DATA_TRANSFORMATION_DIR_NAME,
+    TRANSFORM_OBJECT_FILE_NAME,
+    MODEL_TRAINER_DIR_NAME,
+    MODEL_OBJECT_FILE_NAME,
+    MODEL_EVALUATION_DIR_NAME,
+    MODEL_EVALUATION_FILE_NAME,
+    MODEL_EXPORTER_DIR_NAME,
+    INFERENCE_ARTIFACT_FILE_NAME
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in one process are still serialized by the thread lock
+    fcntl = None
+
+
+def parse_run_timestamp(run_name: str) -> Optional[datetime]:
+    """Datetime encoded in a run directory name, or None for anything else."""
+    try:
+        return datetime.strptime(run_name, ARTIFACT_RUN_TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def list_run_dirs(base_artifact_path: str = ARTIFACT_DIR) -> List[str]:
+    """
+    Timestamped run directories, newest first. Names are parsed rather than
+    string-sorted, since %m_%d_%Y does not sort across months and years.
+    """
+    runs = []
+    for name in os.listdir(base_artifact_path):
+        timestamp = parse_run_timestamp(name)
+        if timestamp is not None and os.path.isdir(os.path.join(base_artifact_path, name)):
+            runs.append((timestamp, name))
+    return [os.path.join(base_artifact_path, name) for _, name in sorted(runs, reverse=True)]
+
+
+def is_servable_run(run_path: str) -> bool:
+    """
+    A run can serve traffic once it has a model, its transformer and an
+    evaluation report that did not reject it. Reports written before
+    promotion gating existed carry no is_model_accepted flag and count as
+    accepted.
+    """
+    model_path = os.path.join(run_path, MODEL_TRAINER_DIR_NAME, MODEL_OBJECT_FILE_NAME)
+    transformer_path = os.path.join(run_path, DATA_TRANSFORMATION_DIR_NAME, TRANSFORM_OBJECT_FILE_NAME)
+    evaluation_path = os.path.join(run_path, MODEL_EVALUATION_DIR_NAME, MODEL_EVALUATION_FILE_NAME)
+    if not (os.path.exists(model_path) and os.path.exists(transformer_path) and os.path.exists(evaluation_path)):
+        return False
+    report = (read_yaml_file(evaluation_path) or {}).get("model_evaluation") or {}
+    return report.get("is_model_accepted", True) is not False
+
+
+def compute_file_sha256(file_path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for block in iter(lambda: file_obj.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArtifactRegistry:
+    """
+    JSON manifest of training runs under ``artifact/``.
+
+    Each run records its stage artifacts, stage metrics, content hashes of
+    the model and transformer and whether evaluation accepted it; a single
+    ``promoted`` pointer names the run that serves traffic. Readers resolve
+    the promoted run with one small file read (cached on the file's stat),
+    instead of listing and sorting the artifact directory.
+
+    Updates are read-modify-write under an exclusive lock file and land via
+    ``os.replace``, so readers never see a half-written manifest.
+    """
+
+    def __init__(self, base_artifact_path: str = ARTIFACT_DIR,
+                 registry_file_name: str = ARTIFACT_REGISTRY_FILE_NAME):
+        self.base_artifact_path = base_artifact_path
+        self.registry_path = os.path.join(base_artifact_path, registry_file_name)
+        self._thread_lock = threading.Lock()
+        self._cached_stat = None
+        self._cached_manifest = None
+
+    @staticmethod
+    def _empty_manifest() -> dict:
+        return {"version": 1, "promoted": None, "runs": {}}
+
+    def exists(self) -> bool:
+        return os.path.exists(self.registry_path)
+
+    def read(self) -> dict:
+        """Current manifest; re-parsed only when the file changed on disk."""
+        try:
+            try:
+                stat = os.stat(self.registry_path)
+            except FileNotFoundError:
+                return self._empty_manifest()
+            stat_key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if stat_key != self._cached_stat:
+                with open(self.registry_path, "r") as registry_file:
+                    self._cached_manifest = json.load(registry_file)
+                self._cached_stat = stat_key
+            return self._cached_manifest
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.base_artifact_path, exist_ok=True)
+        with self._thread_lock, open(f"{self.registry_path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, manifest: dict) -> None:
+        tmp_path = f"{self.registry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as registry_file:
+            json.dump(manifest, registry_file, indent=2, sort_keys=True, default=str)
+            registry_file.flush()
+            os.fsync(registry_file.fileno())
+        os.replace(tmp_path, self.registry_path)
+
+    @contextmanager
+    def update(self):
+        """Yield a fresh copy of the manifest; it is written back atomically on exit."""
+        with self._locked():
+            if self.exists():
+                with open(self.registry_path, "r") as registry_file:
+                    manifest = json.load(registry_file)
+            else:
+                manifest = self._empty_manifest()
+            yield manifest
+            self._write(manifest)
+
+    @staticmethod
+    def run_id(run_dir: str) -> str:
+        return os.path.basename(os.path.normpath(run_dir))
+
+    def register_run(self, run_dir: str, stages: Optional[Dict[str, Any]] = None,
+                     metrics: Optional[Dict[str, Any]] = None, accepted: Optional[bool] = None,
+                     mode: str = "full") -> dict:
+        try:
+            run_id = self.run_id(run_dir)
+            timestamp = parse_run_timestamp(run_id)
+            hashes = {}
+            for name, path in (
+                ("model", os.path.join(run_dir, MODEL_TRAINER_DIR_NAME, MODEL_OBJECT_FILE_NAME)),
+                ("transformer", os.path.join(run_dir, DATA_TRANSFORMATION_DIR_NAME, TRANSFORM_OBJECT_FILE_NAME)),
+                ("inference", os.path.join(run_dir, MODEL_EXPORTER_DIR_NAME, INFERENCE_ARTIFACT_FILE_NAME))
+            ):
+                if os.path.exists(path):
+                    hashes[name] = compute_file_sha256(path)
+
+            with self.update() as manifest:
+                entry = manifest["runs"].setdefault(run_id, {})
+                entry.update({
+                    "run_dir": run_dir,
+                    "timestamp": timestamp.isoformat() if timestamp else None,
+                    "mode": mode,
+                    "accepted": accepted,
+                    "hashes": hashes,
+                    "registered_at": datetime.now().isoformat(timespec="seconds")
+                })
+                if stages is not None:
+                    entry["stages"] = stages
+                if metrics is not None:
+                    entry["metrics"] = metrics
+            logging.info(f"🗂️ Registered run {run_id} (accepted: {accepted})")
+            return entry
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def update_run_metrics(self, run_dir: str, metrics: Dict[str, Any]) -> None:
+        try:
+            with self.update() as manifest:
+                manifest["runs"].setdefault(self.run_id(run_dir), {"run_dir": run_dir})["metrics"] = metrics
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def promote(self, run_dir: str) -> None:
+        try:
+            run_id = self.run_id(run_dir)
+            with self.update() as manifest:
+                if run_id not in manifest["runs"]:
+                    raise KeyError(f"Run {run_id} is not registered")
+                manifest["promoted"] = run_id
+                manifest["runs"][run_id]["promoted_at"] = datetime.now().isoformat(timespec="seconds")
+            logging.info(f"🏆 Promoted run {run_id}")
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def get_promoted_run(self) -> Optional[str]:
+        """Run directory of the promoted run, or None if nothing is promoted yet."""
+        manifest = self.read()
+        run_id = manifest.get("promoted")
+        if run_id is None:
+            return None
+        return manifest["runs"].get(run_id, {}).get("run_dir")
+
+    def list_runs(self) -> List[dict]:
+        """Registered runs, newest first by their parsed timestamp."""
+        runs = [dict(entry, run_id=run_id) for run_id, entry in self.read().get("runs", {}).items()]
+        return sorted(runs, key=lambda entry: entry.get("timestamp") or "", reverse=True)
+
+    def bootstrap_from_disk(self) -> Optional[str]:
+        """
+        Register every existing run once and promote the newest servable one;
+        used when serving starts against an artifact/ made before the registry.
+        """
+        try:
+            promoted = None
+            for run_dir in list_run_dirs(self.base_artifact_path):
+                servable = is_servable_run(run_dir)
+                self.register_run(run_dir, accepted=servable, mode="discovered")
+                if servable and promoted is None:
+                    promoted = run_dir
+            if promoted is not None:
+                self.promote(promoted)
+            return promoted
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def garbage_collect(self, keep_last: int) -> List[str]:
+        """
+        Delete registered runs beyond the ``keep_last`` newest, always keeping
+        the promoted run. Hard-linked files shared with kept runs survive.
+        Returns the removed run directories.
+        """
+        try:
+            removed = []
+            with self.update() as manifest:
+                runs = sorted(manifest["runs"].items(), key=lambda item: item[1].get("timestamp") or "", reverse=True)
+                for run_id, entry in runs[max(0, keep_last):]:
+                    if run_id == manifest.get("promoted"):
+                        continue
+                    shutil.rmtree(entry["run_dir"], ignore_errors=True)
+                    del manifest["runs"][run_id]
+                    removed.append(entry["run_dir"])
+            if removed:
+                logging.info(f"🧹 Garbage-collected {len(removed)} old runs")
+            return removed
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+
+_registries = {}
+
+
+def _get_registry(base_artifact_path: str) -> ArtifactRegistry:
+    # One instance per artifact dir so its parsed manifest is reused between calls
+    if base_artifact_path not in _registries:
+        _registries[base_artifact_path] = ArtifactRegistry(base_artifact_path)
+    return _registries[base_artifact_path]
+
+
+def get_latest_artifact_run(base_artifact_path: str = ARTIFACT_DIR, exclude_run_dir: str = None) -> str:
+    """
+    Return the run to serve: the artifact registry's promoted run, read from
+    its manifest without listing ``artifact/``. Before anything is promoted
+    (or when the promoted run is excluded or missing) falls back to the
+    newest servable run on disk (see is_servable_run), ordered by the
+    timestamp parsed from the directory name.
+    """
+    try:
+        excluded = os.path.normpath(exclude_run_dir) if exclude_run_dir else None
+
+        promoted_run_dir = _get_registry(base_artifact_path).get_promoted_run()
+        if (promoted_run_dir and os.path.normpath(promoted_run_dir) != excluded
+                and os.path.isdir(promoted_run_dir)):
+            return promoted_run_dir
+
+        for run_path in list_run_dirs(base_artifact_path):
+            if os.path.normpath(run_path) == excluded:
+                continue
+            if is_servable_run(run_path):
+                return run_path
+
+        raise FileNotFoundError("No complete, accepted timestamped artifact directories found.")
+    except Exception as e:
+        raise USvisaException(e, sys)
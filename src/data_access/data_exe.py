@@ -1,23 +1,29 @@
 from src.configuration.mongo_db_connection import MongoDBClient
 from src.exception import USvisaException
+from src.logger import logging
+from src.utils.artifact_format import open_dataframe_writer
 import pandas as pd
+import os
 import sys
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
+from bson import ObjectId
 
 class USvisaData:
-    def __init__(self):
+    def __init__(self, mongo_client: Optional[MongoDBClient] = None):
         try:
-            self.mongo_client = MongoDBClient()
+            self.mongo_client = mongo_client if mongo_client is not None else MongoDBClient()
         except Exception as e:
             raise USvisaException(e, sys)
 
+    def _get_collection(self, collection_name: str, database_name: Optional[str] = None):
+        if database_name is None:
+            return self.mongo_client.database[collection_name]
+        return self.mongo_client.client[database_name][collection_name]
+
     def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None) -> pd.DataFrame:
         try:
-            if database_name is None:
-                collection = self.mongo_client.database[collection_name]
-            else:
-                collection = self.mongo_client.client[database_name][collection_name]
+            collection = self._get_collection(collection_name, database_name)
 
             df = pd.DataFrame(list(collection.find()))
             if "_id" in df.columns:
@@ -26,3 +32,162 @@ class USvisaData:
             return df
         except Exception as e:
             raise USvisaException(e, sys)
+
+    @staticmethod
+    def coerce_chunk(chunk: pd.DataFrame, column_types: Dict[str, str]) -> pd.DataFrame:
+        """
+        Apply schema.yaml types to one chunk so every chunk written to the
+        feature store has the same dtypes regardless of what Mongo returned.
+        """
+        chunk = chunk.replace({"na": np.nan})
+        for column, column_type in column_types.items():
+            if column not in chunk.columns:
+                continue
+            if column_type == "int":
+                chunk[column] = pd.to_numeric(chunk[column], errors="coerce").astype("Int64")
+            elif column_type == "float":
+                chunk[column] = pd.to_numeric(chunk[column], errors="coerce").astype("float64")
+            else:
+                chunk[column] = chunk[column].astype("object")
+        return chunk
+
+    def _stream_cursor_to_file(self, cursor, file_path: str, columns: List[str],
+                               column_types: Dict[str, str], batch_size: int,
+                               watermark_field: Optional[str] = None) -> Tuple[int, Any]:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+        rows_written = 0
+        watermark = None
+        buffer = []
+
+        with open_dataframe_writer(file_path, column_types) as writer:
+            def flush():
+                chunk = self.coerce_chunk(pd.DataFrame(buffer, columns=columns), column_types)
+                writer.write(chunk)
+                return len(chunk)
+
+            try:
+                for document in cursor:
+                    if watermark_field is not None:
+                        # Cursor is sorted on the watermark, so the last one seen is the max
+                        watermark = document.pop(watermark_field, watermark)
+                    buffer.append(document)
+                    if len(buffer) >= batch_size:
+                        rows_written += flush()
+                        buffer = []
+                if buffer or rows_written == 0:
+                    rows_written += flush()
+            finally:
+                cursor.close()
+
+        return rows_written, watermark
+
+    def export_collection_to_file(self, collection_name: str, file_path: str, columns: List[str],
+                                  column_types: Optional[Dict[str, str]] = None,
+                                  batch_size: int = 10000,
+                                  database_name: Optional[str] = None) -> int:
+        """
+        Stream the collection into file_path one chunk at a time, in the
+        artifact format implied by its extension (Parquet, Arrow IPC or CSV).
+
+        Only ``columns`` are fetched (server-side projection, no ``_id``), the
+        cursor pulls ``batch_size`` documents per round trip, and each chunk is
+        type-coerced and appended to the file before the next is read, so
+        memory stays flat regardless of collection size.
+        Returns the number of rows written.
+        """
+        try:
+            collection = self._get_collection(collection_name, database_name)
+            projection = {column: 1 for column in columns}
+            projection["_id"] = 0
+
+            cursor = collection.find({}, projection=projection, batch_size=batch_size)
+            rows_written, _ = self._stream_cursor_to_file(
+                cursor, file_path, columns, column_types or {}, batch_size
+            )
+
+            logging.info(f"✅ Streamed {rows_written} rows from '{collection_name}' to {file_path}")
+            return rows_written
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def get_max_watermark(self, collection_name: str, watermark_field: str,
+                          database_name: Optional[str] = None) -> Any:
+        """Current maximum of ``watermark_field`` in the collection, or None if empty."""
+        try:
+            collection = self._get_collection(collection_name, database_name)
+            document = collection.find_one({}, projection={watermark_field: 1}, sort=[(watermark_field, -1)])
+            return None if document is None else document.get(watermark_field)
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def get_collection_fingerprint(self, collection_name: str, watermark_field: str,
+                                   database_name: Optional[str] = None) -> Optional[dict]:
+        """
+        Cheap identity of the collection contents: document count plus the
+        current watermark, which must be an update timestamp. None for
+        ``_id``, which an in-place edit leaves unchanged, so the contents
+        cannot be identified without reading them.
+        """
+        try:
+            if watermark_field == "_id":
+                return None
+            collection = self._get_collection(collection_name, database_name)
+            return {
+                "collection": collection_name,
+                "count": collection.count_documents({}),
+                "watermark_field": watermark_field,
+                "watermark": self.encode_watermark(self.get_max_watermark(collection_name, watermark_field, database_name))
+            }
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def export_collection_increment(self, collection_name: str, file_path: str, columns: List[str],
+                                    watermark_field: str, watermark_value: Any = None,
+                                    column_types: Optional[Dict[str, str]] = None,
+                                    batch_size: int = 10000,
+                                    database_name: Optional[str] = None) -> Tuple[int, Any]:
+        """
+        Stream only documents whose ``watermark_field`` is greater than
+        ``watermark_value`` (``_id`` or an update timestamp; it should be
+        indexed), sorted on it. Returns (rows written, new watermark); the
+        watermark is unchanged when nothing new arrived.
+        """
+        try:
+            collection = self._get_collection(collection_name, database_name)
+            projection = {column: 1 for column in columns}
+            projection[watermark_field] = 1
+            if watermark_field != "_id":
+                projection["_id"] = 0
+
+            query = {} if watermark_value is None else {watermark_field: {"$gt": watermark_value}}
+            cursor = collection.find(query, projection=projection, batch_size=batch_size).sort(watermark_field, 1)
+            rows_written, new_watermark = self._stream_cursor_to_file(
+                cursor, file_path, columns, column_types or {}, batch_size, watermark_field=watermark_field
+            )
+            if new_watermark is None:
+                rows_written, new_watermark = 0, watermark_value
+
+            logging.info(f"✅ Streamed {rows_written} new rows from '{collection_name}' past watermark {watermark_value}")
+            return rows_written, new_watermark
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    @staticmethod
+    def encode_watermark(watermark: Any) -> Optional[dict]:
+        """Make a watermark YAML-safe (ObjectIds are stored as hex strings)."""
+        if watermark is None:
+            return None
+        if isinstance(watermark, ObjectId):
+            return {"type": "objectid", "value": str(watermark)}
+        return {"type": "value", "value": watermark}
+
+    @staticmethod
+    def decode_watermark(encoded: Optional[dict]) -> Any:
+        if not encoded:
+            return None
+        if encoded.get("type") == "objectid":
+            return ObjectId(encoded["value"])
+        return encoded.get("value")
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 
 @dataclass
 class DataIngestionArtifact:
     feature_store_file_path: str
+    watermark_file_path: Optional[str] = None
 
 
 
@@ -11,6 +12,7 @@ class DataIngestionArtifact:
 class DataValidationArtifact:
     validation_status: bool
     message: str
+    report_file_path: Optional[str] = None
 
 
 
@@ -24,9 +26,19 @@ class DataTransformationArtifact:
 @dataclass
 class ModelTrainerArtifact:
     model_path: str
-    silhouette_score: float
+    silhouette_score: float  # score under the configured metric, silhouette by default
+    score_details: Optional[dict] = None
+    labels_path: Optional[str] = None
+
+
 
 
+@dataclass
+class ModelExporterArtifact:
+    inference_artifact_path: Optional[str]
+    is_exported: bool
+    message: str
+
 
 
 @dataclass
@@ -35,4 +47,24 @@ class ModelEvaluationArtifact:
     evaluated_model_path: str
     silhouette_score: float
     improved_accuracy: float
+    incumbent_run_dir: Optional[str] = None
+    incumbent_score: Optional[float] = None
 
+
+@dataclass
+class IncrementalTrainerArtifact:
+    full_retrain_required: bool
+    message: str
+    rows_processed: int = 0
+    drift: Optional[float] = None
+    model_path: Optional[str] = None
+    transformed_data_path: Optional[str] = None
+    labels_path: Optional[str] = None
+
+
+@dataclass
+class ModelPusherArtifact:
+    run_dir: str
+    is_promoted: bool
+    promoted_run_dir: Optional[str]
+    removed_run_dirs: Optional[list] = None
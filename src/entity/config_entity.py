@@ -4,17 +4,22 @@ from datetime import datetime
 from src.constants import *
 from src.constants import DATA_VALIDATION_DIR_NAME 
 from src.constants import DATA_TRANSFORMATION_DIR_NAME, TRANSFORM_OBJECT_FILE_NAME, TRANSFORMED_FILE_NAME,MODEL_CONFIG_FILE_PATH
+from src.constants import TRANSFORMED_SPARSE_FILE_NAME
 import os
 from src.constants import MODEL_EVALUATION_FILE_NAME
 
 # Global timestamp
-TIMESTAMP: str = datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
+TIMESTAMP: str = datetime.now().strftime(ARTIFACT_RUN_TIMESTAMP_FORMAT)
 
 @dataclass
 class TrainingPipelineConfig:
     pipeline_name: str = PIPELINE_NAME
     artifact_dir: str = os.path.join(ARTIFACT_DIR, TIMESTAMP)
     timestamp: str = TIMESTAMP
+    pipeline_state_file_path: str = field(init=False)
+
+    def __post_init__(self):
+        self.pipeline_state_file_path = os.path.join(self.artifact_dir, PIPELINE_STATE_FILE_NAME)
 
 @dataclass
 class DataIngestionConfig:
@@ -22,6 +27,10 @@ class DataIngestionConfig:
     data_ingestion_dir: str = field(init=False)
     feature_store_file_path: str = field(init=False)
     collection_name: str = field(default=DATA_INGESTION_COLLECTION_NAME)
+    streaming_export: bool = field(default=DATA_INGESTION_STREAMING_EXPORT)
+    export_batch_size: int = field(default=DATA_INGESTION_BATCH_SIZE)
+    watermark_field: str = field(default=DATA_INGESTION_WATERMARK_FIELD)
+    watermark_file_path: str = field(init=False)
 
     def __post_init__(self):
         self.data_ingestion_dir = os.path.join(
@@ -33,18 +42,25 @@ class DataIngestionConfig:
             DATA_INGESTION_FEATURE_STORE_DIR,
             FILE_NAME
         )
+        self.watermark_file_path = os.path.join(
+            self.data_ingestion_dir,
+            DATA_INGESTION_WATERMARK_FILE_NAME
+        )
 
 
 @dataclass
 class DataValidationConfig:
     training_pipeline_config: TrainingPipelineConfig
     data_validation_dir: str = None
+    report_file_path: str = None
+    chunk_size: int = DATA_VALIDATION_CHUNK_SIZE
 
     def __post_init__(self):
         self.data_validation_dir = os.path.join(
             self.training_pipeline_config.artifact_dir,
             DATA_VALIDATION_DIR_NAME
         )
+        self.report_file_path = os.path.join(self.data_validation_dir, DATA_VALIDATION_REPORT_FILE_NAME)
 
 
 
@@ -55,6 +71,8 @@ class DataTransformationConfig:
     data_transformation_dir: str = field(init=False)
     transformer_object_path: str = field(init=False)
     transformed_data_path: str = field(init=False)
+    transformed_sparse_data_path: str = field(init=False)
+    chunk_size: int = DATA_TRANSFORMATION_CHUNK_SIZE
 
     def __post_init__(self):
         self.data_transformation_dir = os.path.join(
@@ -69,6 +87,10 @@ class DataTransformationConfig:
             self.data_transformation_dir,
             TRANSFORMED_FILE_NAME
         )
+        self.transformed_sparse_data_path = os.path.join(
+            self.data_transformation_dir,
+            TRANSFORMED_SPARSE_FILE_NAME
+        )
 
 
 
@@ -76,6 +98,8 @@ class DataTransformationConfig:
 class ModelTrainerConfig:
     training_pipeline_config: TrainingPipelineConfig = field(default_factory=TrainingPipelineConfig)
     trained_model_file_path: str = field(init=False)
+    leaderboard_file_path: str = field(init=False)
+    labels_file_path: str = field(init=False)
 
     def __post_init__(self):
         self.trained_model_file_path = os.path.join(
@@ -83,6 +107,61 @@ class ModelTrainerConfig:
             "model_trainer",
             "model.pkl"
         )
+        self.leaderboard_file_path = os.path.join(
+            self.training_pipeline_config.artifact_dir,
+            "model_trainer",
+            MODEL_TRAINER_LEADERBOARD_FILE_NAME
+        )
+        self.labels_file_path = os.path.join(
+            self.training_pipeline_config.artifact_dir,
+            "model_trainer",
+            MODEL_TRAINER_LABELS_FILE_NAME
+        )
+
+
+@dataclass
+class ModelExporterConfig:
+    training_pipeline_config: TrainingPipelineConfig
+    inference_artifact_path: str = field(init=False)
+    verify_sample_size: int = field(default=INFERENCE_ARTIFACT_VERIFY_ROWS)
+
+    def __post_init__(self):
+        self.inference_artifact_path = os.path.join(
+            self.training_pipeline_config.artifact_dir,
+            MODEL_EXPORTER_DIR_NAME,
+            INFERENCE_ARTIFACT_FILE_NAME
+        )
+
+
+@dataclass
+class IncrementalTrainerConfig:
+    training_pipeline_config: TrainingPipelineConfig
+    collection_name: str = field(default=DATA_INGESTION_COLLECTION_NAME)
+    incremental_trainer_dir: str = field(init=False)
+    increment_file_path: str = field(init=False)
+    state_file_path: str = field(init=False)
+    trained_model_file_path: str = field(init=False)
+    transformer_object_path: str = field(init=False)
+    transformed_data_path: str = field(init=False)
+    transformed_sparse_data_path: str = field(init=False)
+    labels_file_path: str = field(init=False)
+
+    def __post_init__(self):
+        artifact_dir = self.training_pipeline_config.artifact_dir
+        self.incremental_trainer_dir = os.path.join(artifact_dir, INCREMENTAL_TRAINER_DIR_NAME)
+        self.increment_file_path = os.path.join(self.incremental_trainer_dir, INCREMENTAL_BATCH_FILE_NAME)
+        self.state_file_path = os.path.join(self.incremental_trainer_dir, INCREMENTAL_STATE_FILE_NAME)
+        # The incremental run mirrors a full run's layout so serving picks it up unchanged
+        self.trained_model_file_path = os.path.join(artifact_dir, MODEL_TRAINER_DIR_NAME, MODEL_OBJECT_FILE_NAME)
+        self.transformer_object_path = os.path.join(
+            artifact_dir, DATA_TRANSFORMATION_DIR_NAME, TRANSFORM_OBJECT_FILE_NAME
+        )
+        # The increment's own transformed rows and labels, which model evaluation scores
+        self.transformed_data_path = os.path.join(artifact_dir, DATA_TRANSFORMATION_DIR_NAME, TRANSFORMED_FILE_NAME)
+        self.transformed_sparse_data_path = os.path.join(
+            artifact_dir, DATA_TRANSFORMATION_DIR_NAME, TRANSFORMED_SPARSE_FILE_NAME
+        )
+        self.labels_file_path = os.path.join(artifact_dir, MODEL_TRAINER_DIR_NAME, MODEL_TRAINER_LABELS_FILE_NAME)
 
 
 @dataclass
@@ -97,3 +176,9 @@ class ModelEvaluationConfig:
             MODEL_EVALUATION_FILE_NAME
         )
 
+
+@dataclass
+class ModelPusherConfig:
+    training_pipeline_config: TrainingPipelineConfig
+    base_artifact_path: str = field(default=ARTIFACT_DIR)
+    keep_last_runs: int = field(default=ARTIFACT_REGISTRY_KEEP_RUNS)
@@ -1,30 +1,242 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict
 
-# Create log directory (within app container – ephemeral on Render)
-LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
+from src.constants import LOG_ASYNC, LOG_DIR, LOG_FORMAT, LOG_LEVEL, LOG_LEVELS, LOG_SAMPLE_RATES
+
+# LOG_DIR is within the app container – ephemeral on Render; it is created with the first record
 
 # Create unique log file with timestamp
 LOG_FILE = f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log"
 LOG_PATH = os.path.join(LOG_DIR, LOG_FILE)
 
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# LogRecord attributes that are not extra={...} fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class LazyFileHandler(logging.FileHandler):
+    """
+    FileHandler that creates its directory and file on the first record
+    instead of at import, so importing src.* has no filesystem side effects.
+    """
+
+    def __init__(self, filename: str, mode: str = "a", encoding: str = None):
+        super().__init__(filename, mode=mode, encoding=encoding, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+@lru_cache(maxsize=1024)
+def _module_from_path(pathname: str) -> str:
+    relative = os.path.relpath(os.path.splitext(pathname)[0], _REPO_ROOT)
+    if relative.startswith(os.pardir) or os.path.isabs(relative):
+        return ""
+    parts = relative.split(os.sep)
+    return ".".join(parts[:-1] if parts[-1] == "__init__" else parts)
+
+
+def record_module(record: logging.LogRecord) -> str:
+    """
+    Dotted module a record came from. The code base logs through the root
+    logger (``logging.info``), so for root records this is derived from the
+    calling file; named loggers (uvicorn, mlflow, ...) use their name.
+    """
+    if record.name != "root":
+        return record.name
+    return _module_from_path(record.pathname) or record.name
+
+
+def _parse_mapping(spec: str) -> Dict[str, str]:
+    # "a=1, b.c=2" -> {"a": "1", "b.c": "2"}
+    mapping = {}
+    for item in spec.split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            mapping[key.strip()] = value.strip()
+    return mapping
+
+
+def _to_level(level) -> int:
+    return level if isinstance(level, int) else logging.getLevelName(str(level).upper())
+
+
+class ModuleLevelFilter(logging.Filter):
+    """
+    Per-module thresholds: a record passes if its level is at least the one
+    configured for the longest matching module prefix, else the default.
+    """
+
+    def __init__(self, default_level, module_levels: Dict[str, object] = None):
+        super().__init__()
+        self.default_level = _to_level(default_level)
+        self.module_levels = {module: _to_level(level) for module, level in (module_levels or {}).items()}
+
+    @property
+    def lowest_level(self) -> int:
+        return min([self.default_level, *self.module_levels.values()])
+
+    def level_for(self, module: str) -> int:
+        match = max((prefix for prefix in self.module_levels
+                     if module == prefix or module.startswith(prefix + ".")), key=len, default=None)
+        return self.default_level if match is None else self.module_levels[match]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.module_levels:
+            return record.levelno >= self.default_level
+        return record.levelno >= self.level_for(record_module(record))
+
+
+class SampledLogger(logging.LoggerAdapter):
+    """
+    Logger for high-frequency lines such as one per prediction. Below
+    WARNING, only one in every ``1 / rate`` calls from each call site is
+    logged, decided before a record is built, so skipped calls cost about
+    as much as a disabled level. The rate comes from LOG_SAMPLE_RATES for
+    ``group`` unless given; 1 logs everything, 0 nothing.
+
+        prediction_logging = SampledLogger("prediction")
+        prediction_logging.info(f"✅ Prediction complete. Cluster: {prediction}")
+    """
+
+    def __init__(self, group: str, logger: logging.Logger = None, rate: float = None):
+        super().__init__(logger or logging.getLogger(), {})
+        self.group = group
+        rate = float(_sample_rates.get(group, 1.0) if rate is None else rate)
+        self.interval = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counters: Dict[tuple, int] = {}
+
+    def process(self, msg, kwargs):
+        return msg, kwargs
+
+    def log(self, level: int, msg, *args, **kwargs) -> None:
+        if level < logging.WARNING:
+            if not self.interval or not self.isEnabledFor(level):
+                return
+            frame = sys._getframe(1)
+            if frame.f_code.co_filename == logging.__file__:
+                # Called through .info() / .debug()
+                frame = frame.f_back
+            site = (frame.f_code, frame.f_lineno)
+            # A lost increment under a race only shifts which call is kept
+            count = self._counters.get(site, 0)
+            self._counters[site] = count + 1
+            if count % self.interval:
+                return
+        # Attribute the record to the caller, not to this method
+        kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+        super().log(level, msg, *args, **kwargs)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, module, message, any extra={...} fields and the traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record_module(record),
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # Like QueueHandler.prepare, but keeps the traceback in exc_text instead of
+    # folding it into the message, so the JSON formatter can report it separately
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # A shallow copy, as copy.copy makes, without its reduce-protocol overhead
+        prepared = logging.LogRecord.__new__(type(record))
+        prepared.__dict__.update(record.__dict__)
+        record = prepared
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _default_formatter.formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+_default_formatter = logging.Formatter()
+_sample_rates = _parse_mapping(LOG_SAMPLE_RATES)
+
+
+def _start_listener() -> None:
+    global listener
+    listener = logging.handlers.QueueListener(queue_handler.queue, file_handler, console_handler,
+                                              respect_handler_level=True)
+    listener.start()
+
+
+def _restart_listener() -> None:
+    # The child inherits the parent's unwritten records but not its thread; start over empty
+    queue_handler.queue = queue.SimpleQueue()
+    _start_listener()
+
+
+def _stop_listener() -> None:
+    # Looked up at exit, so a forked child stops its own listener rather than the parent's
+    listener.stop()
+
+
 # Formatter for logs
-formatter = logging.Formatter("[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s")
+if LOG_FORMAT.lower() == "json":
+    formatter = JsonFormatter()
+else:
+    formatter = logging.Formatter("[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s")
 
 # File Handler (logs saved while app is running)
-file_handler = logging.FileHandler(LOG_PATH)
+file_handler = LazyFileHandler(LOG_PATH)
 file_handler.setFormatter(formatter)
 
 # Console Handler (for Render Logs tab)
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(formatter)
 
+module_level_filter = ModuleLevelFilter(LOG_LEVEL, _parse_mapping(LOG_LEVELS))
+# Named loggers honour their own level before a record is even created
+for _module, _level in module_level_filter.module_levels.items():
+    logging.getLogger(_module).setLevel(_level)
+
+# Records are filtered in the calling thread; formatting and writing happen on the listener's thread
+if LOG_ASYNC:
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+    _start_listener()
+    # Drain the queue on exit; in a forked worker the listener thread is gone and has to be restarted
+    atexit.register(_stop_listener)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_listener)
+    handlers = [queue_handler]
+else:
+    listener = None
+    handlers = [file_handler, console_handler]
+
+for _handler in handlers:
+    _handler.addFilter(module_level_filter)
+
 # Root logger setup
 logging.basicConfig(
-    level=logging.INFO,
-    handlers=[file_handler, console_handler]
+    level=module_level_filter.lowest_level,
+    handlers=handlers
 )
 
 # Optional: expose logger instance
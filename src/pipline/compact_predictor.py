@@ -0,0 +1,178 @@
+import math
+import threading
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from src.utils.inference_artifact import read_inference_artifact
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class CompactPredictor:
+    """
+    NumPy-only nearest-centroid engine equivalent to
+    ColumnTransformer(StandardScaler, OneHotEncoder(handle_unknown='ignore'))
+    followed by KMeans.predict, without importing sklearn, pandas or dill.
+
+    Built from an inference artifact file (see ModelExporter) or from the
+    same tables compiled in memory from the fitted sklearn objects.
+
+    Rows are written straight into per-thread buffers that are reused
+    across calls: numerics are scaled in place with the scaler's own
+    subtract-then-divide (a fused multiply by 1/scale would round
+    differently), categoricals are one-hot encoded through a lookup table
+    of output columns (indexed by category code for pandas Categoricals),
+    and labels come from one GEMM plus an argmin over ||c||^2 - 2 x.c, the
+    expression sklearn's KMeans uses.
+
+    Input is a record dict, a list of record dicts, or anything indexable by
+    column name (a pandas DataFrame, a dict of columns).
+    """
+
+    def __init__(self, file_path: str = None, header: dict = None, arrays: Dict[str, np.ndarray] = None):
+        if file_path is not None:
+            header, arrays = read_inference_artifact(file_path)
+        self.file_path = file_path
+        self.header = header
+        self.model_version = header.get("model_version")
+        self.numeric_features: List[str] = header["numeric_features"]
+        self.categorical_features: List[str] = header["categorical_features"]
+        self.n_features_out: int = header["n_features_out"]
+        self.n_numeric = len(self.numeric_features)
+
+        self.scaler_mean = arrays["scaler_mean"]
+        self.scaler_scale = arrays["scaler_scale"]
+        self.centroids_t = np.ascontiguousarray(np.asarray(arrays["centroids"]).T)
+        self.centroid_sq_norms = arrays["centroid_sq_norms"]
+        self.n_clusters = self.centroids_t.shape[1]
+
+        # value -> output column for each categorical feature; None stands for a missing value
+        self._category_index: List[Dict[Any, int]] = []
+        self._missing_index: List[int] = []
+        column = self.n_numeric
+        for categories in header["categories"]:
+            index, missing = {}, -1
+            for position, category in enumerate(categories):
+                if category is None:
+                    missing = column + position
+                else:
+                    index[category] = column + position
+            self._category_index.append(index)
+            self._missing_index.append(missing)
+            column += len(categories)
+
+        self._buffers = threading.local()
+
+    def _get_buffers(self, n_rows: int):
+        """(features, distances) views of this thread's buffers, grown when needed."""
+        buffers = self._buffers
+        capacity = getattr(buffers, "capacity", 0)
+        if capacity < n_rows:
+            capacity = max(n_rows, 2 * capacity, 1)
+            buffers.features = np.empty((capacity, self.n_features_out), dtype=np.float64)
+            buffers.distances = np.empty((capacity, self.n_clusters), dtype=np.float64)
+            buffers.capacity = capacity
+        return buffers.features[:n_rows], buffers.distances[:n_rows]
+
+    def _code(self, position: int, value: Any) -> int:
+        if _is_missing(value):
+            return self._missing_index[position]
+        return self._category_index[position].get(value, -1)
+
+    def _fill_record(self, record: dict, row: np.ndarray) -> None:
+        row[:] = 0.0
+        for position, name in enumerate(self.numeric_features):
+            value = record.get(name)
+            row[position] = np.nan if value is None else value
+        for position, name in enumerate(self.categorical_features):
+            column = self._code(position, record.get(name))
+            # Unknown categories stay all-zero, as with handle_unknown='ignore'
+            if column >= 0:
+                row[column] = 1.0
+
+    def _column_codes(self, position: int, column, n_rows: int) -> np.ndarray:
+        """Output column per row for one categorical feature (-1 for unknown values)."""
+        categorical = getattr(column, "cat", None)
+        if categorical is not None:
+            # pandas Categorical: look each category up once, then gather by code (-1 = missing)
+            table = np.array([self._code(position, value) for value in categorical.categories]
+                             + [self._missing_index[position]], dtype=np.intp)
+            return table[np.asarray(categorical.codes)]
+
+        values = column.tolist() if hasattr(column, "tolist") else column
+        if self._missing_index[position] < 0:
+            lookup = self._category_index[position].get
+            return np.fromiter((lookup(value, -1) for value in values), dtype=np.intp, count=n_rows)
+        return np.fromiter((self._code(position, value) for value in values), dtype=np.intp, count=n_rows)
+
+    def _fill_columns(self, records, features: np.ndarray) -> None:
+        features[:] = 0.0
+        for position, name in enumerate(self.numeric_features):
+            features[:, position] = np.asarray(records[name], dtype=np.float64)
+        rows = np.arange(len(features))
+        for position, name in enumerate(self.categorical_features):
+            columns = self._column_codes(position, records[name], len(features))
+            known = columns >= 0
+            features[rows[known], columns[known]] = 1.0
+
+    def _transform_into(self, records, features: np.ndarray) -> np.ndarray:
+        if isinstance(records, list):
+            for row, record in zip(features, records):
+                self._fill_record(record, row)
+        else:
+            self._fill_columns(records, features)
+
+        numeric = features[:, :self.n_numeric]
+        if np.isnan(numeric).any():
+            raise ValueError("Input contains NaN in a numeric feature")
+        # Same operations and order as StandardScaler.transform
+        numeric -= self.scaler_mean
+        numeric /= self.scaler_scale
+        return features
+
+    @staticmethod
+    def _as_rows(records):
+        if isinstance(records, dict) and not isinstance(next(iter(records.values()), None), (list, np.ndarray)):
+            return [records]
+        return records
+
+    def _n_rows(self, records) -> int:
+        if isinstance(records, list):
+            return len(records)
+        return len(records[self.numeric_features[0]])
+
+    def transform(self, records: Union[dict, List[dict], Any]) -> np.ndarray:
+        """Transformed feature matrix (a new array, safe to keep)."""
+        records = self._as_rows(records)
+        features = np.empty((self._n_rows(records), self.n_features_out), dtype=np.float64)
+        return self._transform_into(records, features)
+
+    def _assign(self, features: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        # argmin_k ||x - c_k||^2 == argmin_k (||c_k||^2 - 2 x.c_k); ||x||^2 is the same for every k
+        np.dot(features, self.centroids_t, out=distances)
+        distances *= -2.0
+        distances += self.centroid_sq_norms
+        return distances.argmin(axis=1)
+
+    def predict_transformed(self, data: np.ndarray) -> np.ndarray:
+        distances = np.empty((len(data), self.n_clusters), dtype=np.float64)
+        return self._assign(np.ascontiguousarray(data, dtype=np.float64), distances).astype(np.int64)
+
+    def predict(self, records: Union[dict, List[dict], Any]) -> np.ndarray:
+        records = self._as_rows(records)
+        features, distances = self._get_buffers(self._n_rows(records))
+        return self._assign(self._transform_into(records, features), distances).astype(np.int64)
+
+    def predict_one(self, record: dict) -> int:
+        """Single-record path: no DataFrame, no list wrapping, no per-call buffers."""
+        features, distances = self._get_buffers(1)
+        self._fill_record(record, features[0])
+        numeric = features[0, :self.n_numeric]
+        if np.isnan(numeric).any():
+            raise ValueError("Input contains NaN in a numeric feature")
+        numeric -= self.scaler_mean
+        numeric /= self.scaler_scale
+        return int(self._assign(features, distances)[0])
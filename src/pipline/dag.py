@@ -0,0 +1,227 @@
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field, is_dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.exception import USvisaException
+from src.logger import logging
+from src.utils.metrics import peak_rss_mb
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline node. ``run`` receives the outputs of ``inputs`` as keyword
+    arguments named after those stages and returns this stage's artifact.
+    ``artifact_class`` rebuilds the artifact from the state file on resume.
+    Stages that rely on thread-local or main-thread-only state (MLflow's
+    active run, SIGALRM timeouts) set ``main_thread``.
+    """
+    name: str
+    run: Callable[..., Any]
+    inputs: List[str] = field(default_factory=list)
+    artifact_class: Optional[type] = None
+    main_thread: bool = False
+
+
+@dataclass
+class StageMetrics:
+    status: str
+    started_at: Optional[str] = None
+    wall_seconds: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    children_cpu_seconds: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _children_cpu_seconds() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class PipelineDAG:
+    """A validated set of stages; ``order`` is a topological order of their names."""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        for stage in stages:
+            unknown = [name for name in stage.inputs if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {unknown}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline stages form a cycle through '{name}'")
+            visiting.add(name)
+            for upstream in self.stages[name].inputs:
+                visit(upstream)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+
+class DAGScheduler:
+    """
+    Runs a PipelineDAG, starting every stage as soon as all of its inputs
+    have completed, so independent stages overlap on a thread pool.
+
+    Per stage it records wall time, the CPU time of the thread that ran it,
+    CPU time of child processes reaped meanwhile (the model search pool)
+    and the process's peak RSS once the stage finished. RSS and child CPU
+    are process-wide, so they are approximate while stages overlap.
+
+    With ``state_file_path`` set, each completed stage's artifact and
+    metrics are persisted to JSON; running again with ``resume`` skips the
+    completed stages and restarts from the first one that did not finish.
+    """
+
+    def __init__(self, dag: PipelineDAG, state_file_path: Optional[str] = None, max_workers: int = 2):
+        self.dag = dag
+        self.state_file_path = state_file_path
+        self.max_workers = max(1, max_workers)
+        self.metrics: Dict[str, StageMetrics] = {}
+        self._outputs: Dict[str, Any] = {}
+        self._state: Dict[str, dict] = {}
+        self._state_lock = threading.Lock()
+
+    def _load_state(self) -> Dict[str, dict]:
+        if not self.state_file_path or not os.path.exists(self.state_file_path):
+            return {}
+        with open(self.state_file_path, "r") as state_file:
+            return json.load(state_file).get("stages", {})
+
+    def _save_state(self) -> None:
+        if not self.state_file_path:
+            return
+        os.makedirs(os.path.dirname(self.state_file_path), exist_ok=True)
+        tmp_path = f"{self.state_file_path}.tmp"
+        with open(tmp_path, "w") as state_file:
+            json.dump({"stages": self._state}, state_file, indent=2, default=str)
+        os.replace(tmp_path, self.state_file_path)
+
+    def _record(self, name: str, metrics: StageMetrics, output: Any = None) -> None:
+        with self._state_lock:
+            self.metrics[name] = metrics
+            entry = {"status": metrics.status, "metrics": asdict(metrics)}
+            if metrics.status == "completed":
+                self._outputs[name] = output
+                entry["artifact"] = asdict(output) if is_dataclass(output) else output
+            self._state[name] = entry
+            self._save_state()
+
+    def _execute(self, stage: Stage) -> Any:
+        kwargs = {name: self._outputs[name] for name in stage.inputs}
+        started_at = datetime.now().isoformat(timespec="seconds")
+        wall_start, cpu_start, children_start = time.perf_counter(), time.thread_time(), _children_cpu_seconds()
+        logging.info(f"▶️ Stage '{stage.name}' started")
+        try:
+            output = stage.run(**kwargs)
+        except Exception as e:
+            self._record(stage.name, StageMetrics(
+                "failed", started_at, time.perf_counter() - wall_start, time.thread_time() - cpu_start,
+                _children_cpu_seconds() - children_start, peak_rss_mb(), str(e)
+            ))
+            raise
+        metrics = StageMetrics(
+            "completed", started_at, round(time.perf_counter() - wall_start, 4),
+            round(time.thread_time() - cpu_start, 4), round(_children_cpu_seconds() - children_start, 4),
+            peak_rss_mb()
+        )
+        self._record(stage.name, metrics, output)
+        logging.info(
+            f"⏱️ Stage '{stage.name}' done in {metrics.wall_seconds:.2f}s "
+            f"(cpu {metrics.cpu_seconds:.2f}s, children {metrics.children_cpu_seconds:.2f}s, "
+            f"peak rss {metrics.peak_rss_mb} MB)"
+        )
+        return output
+
+    def _restore_completed(self) -> None:
+        for name, entry in self._load_state().items():
+            stage = self.dag.stages.get(name)
+            if stage is None or entry.get("status") != "completed":
+                continue
+            artifact = entry.get("artifact")
+            self._outputs[name] = stage.artifact_class(**artifact) if stage.artifact_class else artifact
+            self._state[name] = entry
+            self.metrics[name] = StageMetrics(**entry["metrics"])
+
+        # A resumed stage whose upstream is rerun must rerun too
+        for name in self.dag.order:
+            if any(upstream not in self._outputs for upstream in self.dag.stages[name].inputs):
+                self._outputs.pop(name, None)
+                self._state.pop(name, None)
+                self.metrics.pop(name, None)
+
+        if self._outputs:
+            logging.info(f"⏩ Resuming; already completed: {sorted(self._outputs)}")
+
+    def run(self, resume: bool = True) -> Dict[str, Any]:
+        """Run every stage not yet completed; returns {stage name: artifact}."""
+        try:
+            if resume:
+                self._restore_completed()
+
+            pending = [name for name in self.dag.order if name not in self._outputs]
+            running = {}
+            failure = None
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as pool:
+                while pending or running:
+                    ready = [name for name in pending
+                             if failure is None
+                             and all(upstream in self._outputs for upstream in self.dag.stages[name].inputs)]
+                    inline = [name for name in ready if self.dag.stages[name].main_thread]
+                    for name in ready:
+                        if name not in inline:
+                            pending.remove(name)
+                            running[pool.submit(self._execute, self.dag.stages[name])] = name
+
+                    if inline:
+                        pending.remove(inline[0])
+                        try:
+                            self._execute(self.dag.stages[inline[0]])
+                        except Exception as e:
+                            failure = failure or e
+                        continue
+
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        running.pop(future)
+                        if future.exception() is not None:
+                            failure = failure or future.exception()
+
+            if failure is not None:
+                raise failure
+            return dict(self._outputs)
+        except Exception as e:
+            raise USvisaException(e, sys)
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import os
+from typing import Optional, Tuple
+
+from src.constants import CLUSTER_LABELS
+from src.logger import logging
+
+DASHBOARD_COLUMNS = [
+    "cluster",
+    "Gender",
+    "Income Level",
+    "Top Interests",
+    "Time Spent Online (hrs/weekday)",
+    "Time Spent Online (hrs/weekend)",
+    "Likes and Reactions",
+    "Click-Through Rates (CTR)",
+    "Conversion Rates"
+]
+
+
+def compute_file_digest(file_path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for block in iter(lambda: file_obj.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_dashboard_context(data_path: str) -> dict:
+    """
+    Compute the dashboard KPIs and render its Plotly figures to HTML.
+
+    Kept as a module-level function returning plain data so it can run in a
+    separate process and be pickled back to the web worker. pandas and
+    Plotly are imported here, in the worker that renders, so web workers
+    start without them.
+    """
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    df = pd.read_csv(data_path, usecols=DASHBOARD_COLUMNS)
+    df["Cluster Label"] = df["cluster"].map(CLUSTER_LABELS)
+
+    total_users = len(df)
+    avg_ctr = round(df['Click-Through Rates (CTR)'].mean(), 2)
+    avg_weekday = round(df['Time Spent Online (hrs/weekday)'].mean(), 2)
+    avg_conversion = round(df['Conversion Rates'].mean(), 2)
+
+    cluster_data = df["Cluster Label"].value_counts().reset_index()
+    cluster_data.columns = ["Segment", "Users"]
+    bar_fig = px.bar(cluster_data, x="Segment", y="Users", text="Users", title="Users per Segment")
+    # plotly.js is embedded once, in the first chart on the page
+    bar_html = pio.to_html(bar_fig, full_html=False, include_plotlyjs=True)
+
+    features = ["Time Spent Online (hrs/weekday)", "Time Spent Online (hrs/weekend)", "Likes and Reactions", "Click-Through Rates (CTR)"]
+    radar_df = df.groupby("Cluster Label")[features].mean()
+    radar_df_norm = (radar_df - radar_df.min()) / (radar_df.max() - radar_df.min())
+    radar_df_norm = radar_df_norm.reset_index()
+    radar_fig = go.Figure()
+    for i, label in enumerate(radar_df_norm["Cluster Label"]):
+        vals = radar_df_norm.iloc[i][features].tolist()
+        radar_fig.add_trace(go.Scatterpolar(r=vals + [vals[0]], theta=features + [features[0]], fill='toself', name=label))
+    radar_fig.update_layout(title="Segment Profiles", polar=dict(radialaxis=dict(visible=True, range=[0, 1])))
+    radar_html = pio.to_html(radar_fig, full_html=False, include_plotlyjs=False)
+
+    # Aggregate before plotting so the figure carries counts, not every row
+    gender_counts = df.groupby(["Gender", "Cluster Label"]).size().reset_index(name="count")
+    gender_fig = px.bar(gender_counts, x="Gender", y="count", color="Cluster Label", barmode="group", title="Gender by Segment")
+    gender_html = pio.to_html(gender_fig, full_html=False, include_plotlyjs=False)
+
+    income_counts = df.groupby(["Income Level", "Cluster Label"]).size().reset_index(name="count")
+    income_fig = px.bar(income_counts, x="Income Level", y="count", color="Cluster Label", barmode="group", title="Income vs Segment")
+    income_html = pio.to_html(income_fig, full_html=False, include_plotlyjs=False)
+
+    top_interests = df["Top Interests"].dropna().str.split(", ").explode().value_counts().nlargest(10)
+    interest_fig = px.bar(top_interests, x=top_interests.index, y=top_interests.values,
+                          labels={"x": "Interest", "y": "Users"}, title="Top 10 Interests")
+    interest_html = pio.to_html(interest_fig, full_html=False, include_plotlyjs=False)
+
+    return {
+        "total_users": total_users,
+        "avg_ctr": avg_ctr,
+        "avg_weekday": avg_weekday,
+        "avg_conversion": avg_conversion,
+        "bar_html": bar_html,
+        "radar_html": radar_html,
+        "gender_html": gender_html,
+        "income_html": income_html,
+        "interest_html": interest_html
+    }
+
+
+class DashboardCache:
+    """
+    Holds the computed dashboard context (KPIs and rendered figure fragments)
+    for one data file. A cheap (mtime, size) stat check serves the cached
+    context; when the stat changes the file is re-hashed, and the context is
+    rebuilt only if the content hash actually differs.
+    """
+
+    def __init__(self, data_path: str):
+        self.data_path = data_path
+        self._stat_key: Optional[Tuple[int, int]] = None
+        self._content_hash: Optional[str] = None
+        self._context: Optional[dict] = None
+        self._rebuild_lock = asyncio.Lock()
+
+    def _current_stat_key(self) -> Tuple[int, int]:
+        stat = os.stat(self.data_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_if_fresh(self) -> Optional[dict]:
+        if self._context is not None and self._current_stat_key() == self._stat_key:
+            return self._context
+        return None
+
+    def invalidate(self) -> None:
+        self._stat_key = None
+        self._content_hash = None
+        self._context = None
+
+    async def get(self, executor) -> dict:
+        """
+        Return the dashboard context, rebuilding it on ``executor`` (a
+        BoundedExecutor) when the data file changed. Concurrent misses wait
+        for a single rebuild instead of each starting their own.
+        """
+        context = self.get_if_fresh()
+        if context is not None:
+            return context
+
+        async with self._rebuild_lock:
+            context = self.get_if_fresh()
+            if context is not None:
+                return context
+
+            # Stat before hashing: a write landing mid-rebuild changes the stat
+            # again and triggers another rebuild on the next request
+            stat_key = self._current_stat_key()
+            content_hash = await executor.run(compute_file_digest, self.data_path)
+
+            if self._context is not None and content_hash == self._content_hash:
+                logging.info("📊 Dashboard data touched but unchanged; reusing cached aggregates")
+            else:
+                logging.info(f"📊 Rebuilding dashboard aggregates for {self.data_path}")
+                self._context = await executor.run(build_dashboard_context, self.data_path)
+                self._content_hash = content_hash
+
+            self._stat_key = stat_key
+            return self._context
@@ -0,0 +1,85 @@
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.logger import logging
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when a BoundedExecutor already has max_workers + max_queue jobs in flight."""
+
+
+class ExecutorWorkerCrashedError(ExecutorSaturatedError):
+    """
+    Raised for the jobs in flight when a worker dies (OOM, kill). The pool
+    is replaced, so callers answer 503 like a saturated executor and the
+    next request runs on fresh workers.
+    """
+
+
+class BoundedExecutor:
+    """
+    Runs blocking work off the event loop on a thread or process pool and
+    rejects new work once max_workers running plus max_queue waiting jobs are
+    in flight, so callers can answer 503 instead of piling up latency.
+    """
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 4, max_queue: int = 32):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "thread":
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers, thread_name_prefix=self.name
+                        )
+                    else:
+                        # spawn avoids forking a process that already runs uvicorn threads
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context("spawn")
+                        )
+                    logging.info(f"🧵 Started {self.kind} executor '{self.name}' with {self.max_workers} workers")
+        return self._executor
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturatedError(f"Executor '{self.name}' is saturated")
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+            except BrokenExecutor as e:
+                self._replace_broken(executor)
+                raise ExecutorWorkerCrashedError(f"Executor '{self.name}' lost a worker; retry the request") from e
+        finally:
+            self._slots.release()
+
+    def _replace_broken(self, broken: Executor) -> None:
+        # Every job of the broken pool lands here; only the first one swaps it out
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        logging.info(f"⚠️ {self.kind.capitalize()} executor '{self.name}' broke; a new pool starts on the next job")
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,212 @@
+import asyncio
+import sys
+import threading
+import time
+from typing import List, Optional, Set, Tuple
+
+from src.exception import USvisaException
+from src.logger import logging
+from src.constants import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS
+from src.pipline.model_registry import ModelRegistry
+from src.pipline.executors import BoundedExecutor, ExecutorSaturatedError
+
+
+class MicroBatchStats:
+    """
+    Running counters for the micro-batcher: how many rows each vectorized
+    call carried and how long requests sat in the queue before it ran.
+    """
+
+    def __init__(self, max_batch_size: int):
+        self._lock = threading.Lock()
+        self.batch_size_buckets = [2 ** i for i in range(max(1, max_batch_size).bit_length())]
+        if self.batch_size_buckets[-1] < max_batch_size:
+            self.batch_size_buckets.append(max_batch_size)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.batches = 0
+            self.rows = 0
+            self.failed_batches = 0
+            self.batch_size_counts = [0] * len(self.batch_size_buckets)
+            self.queue_wait_seconds_sum = 0.0
+            self.queue_wait_seconds_max = 0.0
+
+    def observe_batch(self, batch_size: int, queue_waits: List[float], failed: bool = False) -> None:
+        with self._lock:
+            self.batches += 1
+            self.rows += batch_size
+            if failed:
+                self.failed_batches += 1
+            for index, upper_bound in enumerate(self.batch_size_buckets):
+                if batch_size <= upper_bound:
+                    self.batch_size_counts[index] += 1
+                    break
+            self.queue_wait_seconds_sum += sum(queue_waits)
+            self.queue_wait_seconds_max = max([self.queue_wait_seconds_max] + queue_waits)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "rows": self.rows,
+                "failed_batches": self.failed_batches,
+                "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+                "batch_size_histogram": {
+                    f"le_{upper_bound}": count
+                    for upper_bound, count in zip(self.batch_size_buckets, self.batch_size_counts)
+                },
+                "mean_queue_wait_ms": 1000 * self.queue_wait_seconds_sum / self.rows if self.rows else 0.0,
+                "max_queue_wait_ms": 1000 * self.queue_wait_seconds_max
+            }
+
+
+class MicroBatcherStoppedError(ExecutorSaturatedError):
+    """
+    Raised for requests still queued when the batcher stops (app shutdown),
+    so callers answer 503 instead of waiting on a future nobody resolves.
+    """
+
+
+class MicroBatcher:
+    """
+    Coalesces single-row /predict calls that arrive within a short window
+    (max_wait_ms or max_batch_size rows, whichever comes first) into one
+    PredictionPipeline.predict_batch call and resolves each caller's future.
+    With an executor, batches run off the event loop and several may be in
+    flight at once; without one they run inline on the loop.
+    """
+
+    def __init__(self, model_registry: ModelRegistry,
+                 max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+                 max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS,
+                 executor: Optional[BoundedExecutor] = None):
+        self.model_registry = model_registry
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0.0, max_wait_ms) / 1000
+        self.stats = MicroBatchStats(self.max_batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run(), name="predict-micro-batcher")
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        # Requests queued after the last collected batch will never be picked up
+        stopped = 0
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(MicroBatcherStoppedError("Prediction service is shutting down"))
+                stopped += 1
+        if stopped:
+            logging.info(f"⚠️ Micro-batcher stopped with {stopped} queued request(s); answered as unavailable")
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def submit(self, input_data: dict) -> int:
+        # Cache hits skip the batching window and the executor hop
+        pipeline = self.model_registry.current
+        if pipeline is not None:
+            cached = pipeline.get_cached(input_data)
+            if cached is not None:
+                return cached
+
+        if self._worker is None or self._worker.done():
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((input_data, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self, batch: List[Tuple[dict, asyncio.Future, float]]) -> None:
+        """
+        Fill ``batch`` in place, so whatever was already taken off the queue
+        is still there for _run if the wait is cancelled.
+        """
+        batch.append(await self._queue.get())
+        deadline = time.perf_counter() + self.max_wait_seconds
+
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued without yielding to the loop
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    def _predict(self, records: List[dict]) -> list:
+        return self.model_registry.get().predict_batch(records).tolist()
+
+    async def _predict_async(self, records: List[dict]) -> list:
+        if self.executor is None:
+            return self._predict(records)
+        return await self.executor.run(self._predict, records)
+
+    async def _dispatch(self, batch: List[Tuple[dict, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        queue_waits = [started - enqueued for _, _, enqueued in batch]
+        records = [record for record, _, _ in batch]
+
+        try:
+            results = await self._predict_async(records)
+            self.stats.observe_batch(len(batch), queue_waits)
+            for (_, future, _), cluster in zip(batch, results):
+                if not future.done():
+                    future.set_result(int(cluster))
+        except ExecutorSaturatedError as e:
+            # Backpressure: no point retrying row by row against a full pool
+            self.stats.observe_batch(len(batch), queue_waits, failed=True)
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        except Exception as batch_error:
+            # Score rows one by one so a single bad record only fails its own caller
+            self.stats.observe_batch(len(batch), queue_waits, failed=True)
+            logging.info(f"⚠️ Micro-batch of {len(batch)} failed, retrying per record: {batch_error}")
+            for record, future, _ in batch:
+                if future.done():
+                    continue
+                try:
+                    future.set_result(int((await self._predict_async([record]))[0]))
+                except ExecutorSaturatedError as e:
+                    future.set_exception(e)
+                except Exception as e:
+                    future.set_exception(USvisaException(e, sys))
+
+    def _start_dispatch(self, batch: List[Tuple[dict, asyncio.Future, float]]) -> None:
+        task = asyncio.create_task(self._dispatch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(self) -> None:
+        while True:
+            batch = []
+            try:
+                await self._collect(batch)
+            except asyncio.CancelledError:
+                # Stopped mid-window: the rows already collected still get answered; stop() awaits them
+                if batch:
+                    self._start_dispatch(batch)
+                raise
+            self._start_dispatch(batch)
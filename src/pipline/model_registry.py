@@ -0,0 +1,117 @@
+import os
+import sys
+import threading
+from typing import Optional
+
+from src.exception import USvisaException
+from src.logger import logging
+from src.constants import MODEL_REGISTRY_POLL_INTERVAL_SECONDS, PREDICTION_CACHE_ENABLED
+from src.pipline.prediction_cache import PredictionCache
+from src.pipline.prediction_pipeline import PredictionPipeline, get_latest_artifact_run
+from src.utils.metrics import Counter
+
+MODEL_RELOADS = Counter(
+    "model_registry_reloads_total",
+    "Serving model loads: the initial load, hot swaps to a newly promoted run, and failed refreshes",
+    ("result",)
+)
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the serving PredictionPipeline.
+
+    The model and transformer are unpickled once and shared by every request.
+    A background thread polls the artifact registry's promoted run (one
+    manifest stat per poll), builds a fresh PredictionPipeline off to the
+    side when it changes and swaps the reference in one assignment, so
+    in-flight requests keep the pipeline they started with.
+
+    With ``prediction_cache_enabled``, every pipeline shares one
+    PredictionCache; it is cleared on each swap so entries of the previous
+    run stop taking memory.
+    """
+
+    def __init__(self, poll_interval: float = MODEL_REGISTRY_POLL_INTERVAL_SECONDS,
+                 prediction_cache_enabled: bool = PREDICTION_CACHE_ENABLED):
+        self.poll_interval = poll_interval
+        self.prediction_cache: Optional[PredictionCache] = PredictionCache() if prediction_cache_enabled else None
+        self._pipeline: Optional[PredictionPipeline] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        pipeline = self._pipeline
+        return pipeline.model_version if pipeline is not None else None
+
+    @property
+    def current(self) -> Optional[PredictionPipeline]:
+        """The pipeline being served, without loading one."""
+        return self._pipeline
+
+    def get(self) -> PredictionPipeline:
+        pipeline = self._pipeline
+        if pipeline is None:
+            pipeline = self.load()
+        return pipeline
+
+    def load(self) -> PredictionPipeline:
+        try:
+            with self._lock:
+                if self._pipeline is None:
+                    self._pipeline = PredictionPipeline(prediction_cache=self.prediction_cache)
+                    MODEL_RELOADS.inc(result="loaded")
+                    logging.info(f"📦 Model registry loaded run: {self._pipeline.model_version}")
+                return self._pipeline
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def refresh(self) -> bool:
+        """
+        Swap to the promoted artifact run if it differs from the one being
+        served. Returns True when a swap happened.
+        """
+        try:
+            latest_run_dir = get_latest_artifact_run()
+            latest_version = os.path.basename(os.path.normpath(latest_run_dir))
+            if latest_version == self.model_version:
+                return False
+
+            # Build outside the lock so readers are never blocked on unpickling
+            new_pipeline = PredictionPipeline(artifact_run_dir=latest_run_dir, prediction_cache=self.prediction_cache)
+            with self._lock:
+                previous_version = self.model_version
+                self._pipeline = new_pipeline
+            if self.prediction_cache is not None:
+                self.prediction_cache.clear()
+            MODEL_RELOADS.inc(result="swapped")
+
+            logging.info(f"🔁 Model registry swapped {previous_version} -> {latest_version}")
+            return True
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def _watch(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the current model if the new run cannot be loaded
+                MODEL_RELOADS.inc(result="failed")
+                logging.info(f"⚠️ Model registry refresh failed: {e}")
+
+    def start(self) -> None:
+        self.load()
+        if self.poll_interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval)
+            self._watcher = None
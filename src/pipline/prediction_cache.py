@@ -0,0 +1,112 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from numbers import Number
+from typing import Any, Hashable, Optional, Tuple
+
+from src.constants import PREDICTION_CACHE_MAX_SIZE, PREDICTION_CACHE_TTL_SECONDS
+from src.utils.metrics import Counter
+
+CACHE_LOOKUPS = Counter("prediction_cache_lookups_total", "Prediction cache lookups by result", ("result",))
+CACHE_EVICTIONS = Counter("prediction_cache_evictions_total", "Entries dropped by the LRU bound")
+
+_NAN = ("nan",)
+
+
+def _canonical_value(value: Any) -> Hashable:
+    # Every numeric ends up as a float64 in the transform, so 3, 3.0 and np.int64(3) share an entry
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, Number):
+        value = float(value)
+        return _NAN if math.isnan(value) else value
+    hash(value)
+    return value
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predicted clusters, keyed on the model version plus
+    the canonicalized input record (field order ignored, numerics compared
+    as floats). Entries older than ``ttl_seconds`` are treated as misses;
+    ``ttl_seconds <= 0`` keeps them until evicted. ``clear`` drops
+    everything and is called when a new run is promoted.
+    """
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_MAX_SIZE,
+                 ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS):
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(model_version: Optional[str], record: dict) -> Optional[Tuple]:
+        """Cache key for ``record``, or None if a value cannot be hashed (never cached)."""
+        try:
+            return (model_version, tuple(sorted((name, _canonical_value(value)) for name, value in record.items())))
+        except TypeError:
+            return None
+
+    def get(self, key: Optional[Tuple], record_miss: bool = True) -> Optional[int]:
+        """
+        Cached value or None. Pass record_miss=False for a peek that is
+        followed by a counted lookup on the same key, so misses aren't
+        counted twice.
+        """
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None and self.ttl_seconds > 0 and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += record_miss
+                if record_miss:
+                    CACHE_LOOKUPS.inc(result="miss")
+                return None
+            value = entry[0]
+            self._entries.move_to_end(key)
+            self.hits += 1
+        CACHE_LOOKUPS.inc(result="hit")
+        return value
+
+    def put(self, key: Optional[Tuple], value: int) -> None:
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                CACHE_EVICTIONS.inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
@@ -1,26 +1,52 @@
 import os
 import sys
+import time
 import warnings
-import pandas as pd
+import numpy as np
+from typing import TYPE_CHECKING, Iterator, List, Optional, Union
 
 from src.utils.main_utils import load_object
+# get_latest_artifact_run lives with the registry; re-exported for existing callers
+from src.data_access.artifact_registry import get_latest_artifact_run
+from src.pipline.compact_predictor import CompactPredictor
+from src.pipline.prediction_cache import PredictionCache
+from src.utils.metrics import Histogram
 from src.exception import USvisaException
-from src.logger import logging
+from src.logger import logging, SampledLogger
+from src.constants import (
+    DATA_TRANSFORMATION_DIR_NAME,
+    TRANSFORM_OBJECT_FILE_NAME,
+    MODEL_TRAINER_DIR_NAME,
+    MODEL_OBJECT_FILE_NAME,
+    MODEL_EXPORTER_DIR_NAME,
+    INFERENCE_ARTIFACT_FILE_NAME,
+    USE_COMPACT_PREDICTOR,
+    PREDICTION_BATCH_CHUNK_SIZE
+)
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Per-prediction lines, sampled at LOG_SAMPLE_RATES["prediction"]
+prediction_logging = SampledLogger("prediction")
+
+_STEP_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+LOAD_SECONDS = Histogram(
+    "prediction_pipeline_load_seconds", "Time to load a run's artifacts into a PredictionPipeline", ("path",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+# The compact path fuses transform and predict into one call, recorded as step="predict"
+STEP_SECONDS = Histogram(
+    "prediction_pipeline_step_seconds", "Time spent per PredictionPipeline step (uncached predictions)",
+    ("step", "path", "mode"), buckets=_STEP_BUCKETS
+)
 
 def get_latest_artifact_path(subdir_name: str) -> str:
     try:
-        base_artifact_path = "artifact"
-        subdirs = sorted(
-            [d for d in os.listdir(base_artifact_path) if os.path.isdir(os.path.join(base_artifact_path, d))],
-            reverse=True
-        )
-        if not subdirs:
-            raise FileNotFoundError("No timestamped artifact directories found.")
+        full_path = os.path.join(get_latest_artifact_run(), subdir_name)
 
-        latest_dir = subdirs[0]
-        full_path = os.path.join(base_artifact_path, latest_dir, subdir_name)
-        
         if not os.path.exists(full_path):
             raise FileNotFoundError(f"Expected path not found: {full_path}")
 
@@ -30,40 +56,224 @@ def get_latest_artifact_path(subdir_name: str) -> str:
 
 
 class PredictionPipeline:
-    def __init__(self):
+    def __init__(self, artifact_run_dir: str = None, use_compact_predictor: bool = USE_COMPACT_PREDICTOR,
+                 prediction_cache: Optional[PredictionCache] = None):
+        """
+        :param use_compact_predictor: serve from the run's NumPy-only inference
+                                      artifact when it has one, skipping the
+                                      sklearn/dill unpickling entirely
+        :param prediction_cache: optional cache consulted by predict and by
+                                 predict_batch on record lists; entries are
+                                 keyed on this run's model_version
+        """
         try:
+            load_started = time.perf_counter()
+            self.prediction_cache = prediction_cache
             # Automatically resolve paths to latest model and transformer
-            self.model_path = os.path.join(get_latest_artifact_path("model_trainer"), "model.pkl")
-            self.transformer_path = os.path.join(get_latest_artifact_path("data_transformation"), "transformer.pkl")
+            if artifact_run_dir is None:
+                artifact_run_dir = get_latest_artifact_run()
+
+            self.artifact_run_dir = artifact_run_dir
+            self.model_version = os.path.basename(os.path.normpath(artifact_run_dir))
+            self.model_path = os.path.join(artifact_run_dir, MODEL_TRAINER_DIR_NAME, MODEL_OBJECT_FILE_NAME)
+            self.transformer_path = os.path.join(artifact_run_dir, DATA_TRANSFORMATION_DIR_NAME, TRANSFORM_OBJECT_FILE_NAME)
+            self.inference_artifact_path = os.path.join(
+                artifact_run_dir, MODEL_EXPORTER_DIR_NAME, INFERENCE_ARTIFACT_FILE_NAME
+            )
+            self._model = None
+            self._transformer = None
+            self.compact_predictor = None
 
-            logging.info(f"📦 Loading model from: {self.model_path}")
-            logging.info(f"📦 Loading transformer from: {self.transformer_path}")
+            if use_compact_predictor and os.path.exists(self.inference_artifact_path):
+                logging.info(f"📦 Loading inference artifact from: {self.inference_artifact_path}")
+                self.compact_predictor = CompactPredictor(self.inference_artifact_path)
+            else:
+                logging.info(f"📦 Loading model from: {self.model_path}")
+                logging.info(f"📦 Loading transformer from: {self.transformer_path}")
 
-            # Load the model and transformer objects
-            self.model = load_object(self.model_path)
-            self.transformer = load_object(self.transformer_path)
+                # Load the model and transformer objects
+                self._model = load_object(self.model_path)
+                self._transformer = load_object(self.transformer_path)
+                if use_compact_predictor:
+                    self.compact_predictor = self._build_compact_predictor()
+
+            LOAD_SECONDS.observe(time.perf_counter() - load_started, path=self.serving_path)
 
         except Exception as e:
             raise USvisaException(e, sys)
 
+    def _build_compact_predictor(self) -> Optional[CompactPredictor]:
+        """
+        NumPy fast path compiled from the unpickled objects for runs exported
+        before the inference artifact existed. Used only if it matches sklearn
+        exactly on a synthetic probe; otherwise (or for models without
+        centroids) predictions keep going through sklearn.
+        """
+        from src.components.model_exporter import (
+            ModelExporter, UnsupportedModelError, build_probe_frame, check_equivalence
+        )
+        try:
+            header, arrays = ModelExporter.compile(self._transformer, self._model)
+            predictor = CompactPredictor(header=dict(header, model_version=self.model_version), arrays=arrays)
+            check_equivalence(predictor, self._transformer, self._model, build_probe_frame(predictor))
+            logging.info("⚡ Serving through the NumPy nearest-centroid fast path")
+            return predictor
+        except (UnsupportedModelError, ValueError) as e:
+            logging.info(f"ℹ️ NumPy fast path unavailable, using sklearn: {e}")
+            return None
+
+    @property
+    def serving_path(self) -> str:
+        return "compact" if self.compact_predictor is not None else "sklearn"
+
+    @property
+    def model(self):
+        # Unpickled on first use when serving from the inference artifact
+        if self._model is None:
+            self._model = load_object(self.model_path)
+        return self._model
+
+    @property
+    def transformer(self):
+        if self._transformer is None:
+            self._transformer = load_object(self.transformer_path)
+        return self._transformer
+
+    def get_cached(self, input_data: dict) -> Optional[int]:
+        """
+        Cached cluster for ``input_data`` under this model version, or None.
+        A miss is not counted here: the caller goes on to predict, which does.
+        """
+        if self.prediction_cache is None:
+            return None
+        return self.prediction_cache.get(self.prediction_cache.make_key(self.model_version, input_data),
+                                         record_miss=False)
+
     def predict(self, input_data: dict) -> int:
         try:
-            logging.info("🚀 Starting prediction pipeline")
+            if self.prediction_cache is not None:
+                cache_key = self.prediction_cache.make_key(self.model_version, input_data)
+                prediction = self.prediction_cache.get(cache_key)
+                if prediction is None:
+                    prediction = self._predict_uncached(input_data)
+                    self.prediction_cache.put(cache_key, prediction)
+                return prediction
+            return self._predict_uncached(input_data)
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def _predict_uncached(self, input_data: dict) -> int:
+        try:
+            prediction_logging.info("🚀 Starting prediction pipeline")
+
+            if self.compact_predictor is not None:
+                with STEP_SECONDS.time(step="predict", path="compact", mode="single"):
+                    prediction = self.compact_predictor.predict_one(input_data)
+                prediction_logging.info(f"✅ Prediction complete. Cluster: {prediction}")
+                return prediction
 
-            # Convert the input dict to a DataFrame
-            input_df = pd.DataFrame([input_data])
+            import pandas as pd
 
-            # Apply the same transformation as during training
-            transformed_data = self.transformer.transform(input_df)
+            with STEP_SECONDS.time(step="transform", path="sklearn", mode="single"):
+                # Convert the input dict to a DataFrame
+                input_df = pd.DataFrame([input_data])
+
+                # Apply the same transformation as during training
+                transformed_data = self.transformer.transform(input_df)
 
             # Suppress feature name warnings from sklearn
-            with warnings.catch_warnings():
+            with STEP_SECONDS.time(step="predict", path="sklearn", mode="single"), warnings.catch_warnings():
                 warnings.simplefilter("ignore")
                 prediction = self.model.predict(transformed_data)
 
-            logging.info(f"✅ Prediction complete. Cluster: {prediction[0]}")
+            prediction_logging.info(f"✅ Prediction complete. Cluster: {prediction[0]}")
             return int(prediction[0])  # Ensure it's serializable for web apps
 
         except Exception as e:
             raise USvisaException(e, sys)
 
+    @staticmethod
+    def _iter_chunks(input_data, chunk_size: int, records_as_dataframe: bool = True) -> Iterator["pd.DataFrame"]:
+        """
+        Yield DataFrame chunks of at most chunk_size rows from a DataFrame,
+        a pyarrow Table or a list of records without copying the whole input.
+        With records_as_dataframe=False, record lists are yielded as list slices
+        and pandas is never imported.
+        """
+        # A DataFrame argument means pandas is already loaded; don't import it just to check
+        pandas = sys.modules.get("pandas")
+        if pandas is not None and isinstance(input_data, pandas.DataFrame):
+            for start in range(0, len(input_data), chunk_size):
+                yield input_data.iloc[start:start + chunk_size]
+        elif hasattr(input_data, "to_pandas") and hasattr(input_data, "slice"):
+            # pyarrow.Table: convert one slice at a time to keep memory bounded
+            for start in range(0, input_data.num_rows, chunk_size):
+                yield input_data.slice(start, chunk_size).to_pandas()
+        elif isinstance(input_data, list):
+            for start in range(0, len(input_data), chunk_size):
+                chunk = input_data[start:start + chunk_size]
+                if records_as_dataframe:
+                    import pandas as pd
+                    chunk = pd.DataFrame(chunk)
+                yield chunk
+        else:
+            raise TypeError(f"Unsupported batch input type: {type(input_data).__name__}")
+
+    def predict_batch(self, input_data: Union["pd.DataFrame", List[dict], "pyarrow.Table"],
+                      chunk_size: int = PREDICTION_BATCH_CHUNK_SIZE) -> np.ndarray:
+        try:
+            if self.prediction_cache is not None and isinstance(input_data, list):
+                return self._predict_records_cached(input_data, chunk_size)
+            return self._predict_batch_uncached(input_data, chunk_size)
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def _predict_records_cached(self, records: List[dict], chunk_size: int) -> np.ndarray:
+        """Serve the cached records and run only the misses through the model."""
+        cache = self.prediction_cache
+        keys = [cache.make_key(self.model_version, record) for record in records]
+        result = np.empty(len(records), dtype=np.int64)
+        missing = []
+        for index, key in enumerate(keys):
+            cached = cache.get(key)
+            if cached is None:
+                missing.append(index)
+            else:
+                result[index] = cached
+
+        if missing:
+            predictions = self._predict_batch_uncached([records[index] for index in missing], chunk_size)
+            result[missing] = predictions
+            for index, prediction in zip(missing, predictions.tolist()):
+                cache.put(keys[index], prediction)
+        return result
+
+    def _predict_batch_uncached(self, input_data, chunk_size: int) -> np.ndarray:
+        try:
+            prediction_logging.info("🚀 Starting batch prediction pipeline")
+
+            predictions = []
+            for chunk_df in self._iter_chunks(input_data, chunk_size,
+                                              records_as_dataframe=self.compact_predictor is None):
+                if len(chunk_df) == 0:
+                    continue
+
+                if self.compact_predictor is not None:
+                    with STEP_SECONDS.time(step="predict", path="compact", mode="batch"):
+                        predictions.append(self.compact_predictor.predict(chunk_df))
+                    continue
+
+                # One vectorized transform and predict per chunk
+                with STEP_SECONDS.time(step="transform", path="sklearn", mode="batch"):
+                    transformed_data = self.transformer.transform(chunk_df)
+
+                with STEP_SECONDS.time(step="predict", path="sklearn", mode="batch"), warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    predictions.append(np.asarray(self.model.predict(transformed_data), dtype=np.int64))
+
+            result = np.concatenate(predictions) if predictions else np.empty(0, dtype=np.int64)
+            prediction_logging.info(f"✅ Batch prediction complete. Rows: {len(result)}")
+            return result
+
+        except Exception as e:
+            raise USvisaException(e, sys)
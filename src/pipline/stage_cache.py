@@ -0,0 +1,140 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Optional
+
+from src.exception import USvisaException
+from src.logger import logging
+from src.constants import ARTIFACT_DIR, STAGE_CACHE_INDEX_FILE_NAME
+
+
+def compute_cache_key(stage_name: str, *parts: Any) -> str:
+    """sha256 over the stage name and a canonical JSON dump of its inputs."""
+    payload = json.dumps([stage_name, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def code_fingerprint(*objects: Any) -> str:
+    """
+    Hash of the source files defining ``objects`` (modules, classes or
+    functions), so editing a stage's code invalidates its cached output.
+    """
+    digest = hashlib.sha256()
+    for source_file in sorted({inspect.getsourcefile(obj) for obj in objects}):
+        with open(source_file, "rb") as file_obj:
+            digest.update(os.path.basename(source_file).encode("utf-8"))
+            digest.update(file_obj.read())
+    return digest.hexdigest()
+
+
+def _link_tree(source_dir: str, destination_dir: str) -> None:
+    def link_or_copy(source: str, destination: str):
+        if os.path.exists(destination):
+            os.remove(destination)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copy2(source, destination)
+
+    shutil.copytree(source_dir, destination_dir, copy_function=link_or_copy, dirs_exist_ok=True)
+
+
+def _rebase_paths(value: Any, old_run_dir: str, new_run_dir: str) -> Any:
+    if isinstance(value, str) and (value == old_run_dir or value.startswith(old_run_dir + os.sep)):
+        return new_run_dir + value[len(old_run_dir):]
+    if isinstance(value, dict):
+        return {key: _rebase_paths(item, old_run_dir, new_run_dir) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rebase_paths(item, old_run_dir, new_run_dir) for item in value]
+    return value
+
+
+def _paths_under(value: Any, run_dir: str):
+    if isinstance(value, str) and value.startswith(run_dir + os.sep):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _paths_under(item, run_dir)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _paths_under(item, run_dir)
+
+
+class StageCache:
+    """
+    Content-addressed memo of pipeline stage outputs across runs.
+
+    The index (a JSON file under ``artifact/``) maps a stage's cache key, a
+    hash of everything the stage reads (data fingerprint, config sections,
+    code version and upstream keys), to the run directory that produced it
+    and the stage's artifact. A hit hard-links that run's stage directory
+    into the current run and returns the artifact with its paths rebased,
+    so downstream stages cannot tell the difference. Stage outputs are
+    treated as immutable once written; nothing rewrites them in place.
+    """
+
+    def __init__(self, base_artifact_path: str = ARTIFACT_DIR, index_file_name: str = STAGE_CACHE_INDEX_FILE_NAME):
+        self.index_path = os.path.join(base_artifact_path, index_file_name)
+        self._lock = threading.Lock()
+
+    def _read_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r") as index_file:
+                return json.load(index_file)
+        except ValueError:
+            logging.info(f"⚠️ Stage cache index {self.index_path} is unreadable; starting a new one")
+            return {}
+
+    def _write_index(self, index: dict) -> None:
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as index_file:
+            json.dump(index, index_file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, cache_key: str) -> Optional[dict]:
+        """Index entry for ``cache_key`` if every file it points at still exists."""
+        try:
+            entry = self._read_index().get(cache_key)
+            if entry is None:
+                return None
+            run_dir = entry["run_dir"]
+            if entry.get("stage_dir") and not os.path.isdir(os.path.join(run_dir, entry["stage_dir"])):
+                return None
+            if not all(os.path.exists(path) for path in _paths_under(entry["artifact"], run_dir)):
+                return None
+            return entry
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def restore(self, entry: dict, run_dir: str) -> dict:
+        """Hard-link the cached stage directory into ``run_dir``; returns the rebased artifact fields."""
+        try:
+            if entry.get("stage_dir"):
+                _link_tree(os.path.join(entry["run_dir"], entry["stage_dir"]),
+                           os.path.join(run_dir, entry["stage_dir"]))
+            return _rebase_paths(entry["artifact"], entry["run_dir"], run_dir)
+        except Exception as e:
+            raise USvisaException(e, sys)
+
+    def store(self, cache_key: str, stage_name: str, run_dir: str, stage_dir: Optional[str], artifact: dict) -> None:
+        try:
+            with self._lock:
+                index = self._read_index()
+                index[cache_key] = {
+                    "stage": stage_name,
+                    "run_dir": run_dir,
+                    "stage_dir": stage_dir,
+                    "artifact": artifact,
+                    "created_at": datetime.now().isoformat(timespec="seconds")
+                }
+                self._write_index(index)
+        except Exception as e:
+            raise USvisaException(e, sys)
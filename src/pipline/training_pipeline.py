@@ -4,6 +4,9 @@ from src.entity.config_entity import (
     DataTransformationConfig,
     ModelTrainerConfig,
     ModelEvaluationConfig,
+    ModelExporterConfig,
+    ModelPusherConfig,
+    IncrementalTrainerConfig,
     TrainingPipelineConfig
 )
 
@@ -12,7 +15,10 @@ from src.entity.artifact_entity import (
     DataValidationArtifact,
     DataTransformationArtifact,
     ModelTrainerArtifact,
-    ModelEvaluationArtifact
+    ModelEvaluationArtifact,
+    ModelExporterArtifact,
+    ModelPusherArtifact,
+    IncrementalTrainerArtifact
 )
 
 from src.components.data_ingestion import DataIngestion
@@ -20,75 +26,406 @@ from src.components.data_validation import DataValidation
 from src.components.data_transformation import DataTransformation
 from src.components.model_trainer import ModelTrainer
 from src.components.model_evaluation import ModelEvaluation
+from src.components.model_exporter import ModelExporter
+from src.components.model_pusher import ModelPusher
+from src.components.incremental_trainer import IncrementalModelTrainer
+from src.components.model_search import ParallelModelSearch
+from src.data_access.data_exe import USvisaData
+from src.data_access.artifact_registry import ArtifactRegistry, compute_file_sha256
+from src.pipline.stage_cache import StageCache, compute_cache_key, code_fingerprint
+from src.pipline.dag import DAGScheduler, PipelineDAG, Stage
+from src.utils.artifact_format import load_dataframe, read_row_count
+from src.utils.metrics import Gauge, Histogram, metrics_enabled, peak_rss_mb
+from src.utils.cluster_scoring import score_clustering
+from src.utils.column_stats import ColumnStatistics
+from src.utils.main_utils import read_yaml_file, save_numpy_array_data
+from src.constants import (
+    SCHEMA_FILE_PATH,
+    MODEL_CONFIG_FILE_PATH,
+    FILE_NAME,
+    STAGE_CACHE_ENABLED,
+    PIPELINE_MAX_WORKERS,
+    DATA_INGESTION_DIR_NAME,
+    DATA_VALIDATION_DIR_NAME,
+    DATA_TRANSFORMATION_DIR_NAME,
+    MODEL_TRAINER_DIR_NAME
+)
 
 from src.logger import logging
 from src.exception import USvisaException
+from dataclasses import asdict
+import functools
+import time
+import numpy as np
+import sklearn
+import os
 import sys
 
 
+STAGE_SECONDS = Histogram(
+    "training_stage_duration_seconds", "Wall time of each TrainPipeline stage", ("stage", "status"),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+)
+STAGE_ROWS = Gauge("training_stage_rows", "Rows processed by the last run of each TrainPipeline stage", ("stage",))
+STAGE_PEAK_RSS = Gauge(
+    "training_stage_peak_rss_bytes", "Process peak RSS when each TrainPipeline stage last finished", ("stage",)
+)
+
+
+def _array_rows(file_path: str) -> int:
+    # From the .npy header / the .npz shape entry; the data itself is not read
+    if file_path.endswith(".npz"):
+        with np.load(file_path) as arrays:
+            return int(arrays["shape"][0])
+    return int(np.load(file_path, mmap_mode="r").shape[0])
+
+
+def instrumented_stage(stage_name: str, rows=None):
+    """
+    Records a start_* stage's duration, the process peak RSS once it ends
+    and, given ``rows(artifact, *stage_args)``, how many rows it processed.
+    A no-op unless metrics are enabled.
+    """
+    def decorator(start_stage):
+        @functools.wraps(start_stage)
+        def wrapper(self, *args, **kwargs):
+            if not metrics_enabled():
+                return start_stage(self, *args, **kwargs)
+            started, status = time.perf_counter(), "failed"
+            try:
+                artifact = start_stage(self, *args, **kwargs)
+                status = "completed"
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage_name, status=status)
+                peak_mb = peak_rss_mb()
+                if peak_mb is not None:
+                    STAGE_PEAK_RSS.set(int(peak_mb * 1024 * 1024), stage=stage_name)
+            if rows is not None:
+                try:
+                    STAGE_ROWS.set(rows(artifact, *args, **kwargs), stage=stage_name)
+                except Exception as e:
+                    # Counting rows is best effort; it never fails the stage
+                    logging.info(f"⚠️ Could not count rows for stage '{stage_name}': {e}")
+            return artifact
+        return wrapper
+    return decorator
+
+
 class TrainPipeline:
-    def __init__(self):
+    def __init__(self, use_stage_cache: bool = STAGE_CACHE_ENABLED, artifact_dir: str = None):
+        """
+        :param artifact_dir: existing run directory to resume instead of a new timestamped one
+        """
         try:
             logging.info("🚀 Initializing TrainPipeline")
-            self.training_pipeline_config = TrainingPipelineConfig()
+            self.resumable = artifact_dir is not None
+            if artifact_dir is None:
+                self.training_pipeline_config = TrainingPipelineConfig()
+            else:
+                self.training_pipeline_config = TrainingPipelineConfig(
+                    artifact_dir=artifact_dir, timestamp=os.path.basename(os.path.normpath(artifact_dir))
+                )
 
             self.data_ingestion_config = DataIngestionConfig(self.training_pipeline_config)
             self.data_validation_config = DataValidationConfig(self.training_pipeline_config)
             self.data_transformation_config = DataTransformationConfig(self.training_pipeline_config)
-            self.model_trainer_config = ModelTrainerConfig()
+            self.model_trainer_config = ModelTrainerConfig(self.training_pipeline_config)
             self.model_evaluation_config = ModelEvaluationConfig(self.training_pipeline_config)
+            self.model_exporter_config = ModelExporterConfig(self.training_pipeline_config)
+            self.model_pusher_config = ModelPusherConfig(self.training_pipeline_config)
+            self.incremental_trainer_config = IncrementalTrainerConfig(self.training_pipeline_config)
+
+            self.stage_cache = StageCache() if use_stage_cache else None
+            self.usvisa_data = None
 
         except Exception as e:
             raise USvisaException(e, sys)
 
+    def _get_usvisa_data(self) -> USvisaData:
+        if self.usvisa_data is None:
+            self.usvisa_data = USvisaData()
+        return self.usvisa_data
+
+    def get_stage_cache_keys(self, feature_store_digest: str = None) -> dict:
+        """
+        Cache key per cacheable stage. Each key chains its upstream key, so a
+        change anywhere upstream invalidates everything after it, while a
+        model.yaml-only change leaves ingestion, validation and
+        transformation keys untouched.
+
+        When the collection has no cheap fingerprint (an ``_id`` watermark)
+        ingestion is never cached and this returns no keys; once ingestion
+        has run, call again with the sha256 of the feature store it wrote to
+        key the later stages on the data itself.
+        """
+        schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+        model_config = read_yaml_file(MODEL_CONFIG_FILE_PATH)
+
+        ingestion_key = None
+        if feature_store_digest is None:
+            data_fingerprint = self._get_usvisa_data().get_collection_fingerprint(
+                self.data_ingestion_config.collection_name, self.data_ingestion_config.watermark_field
+            )
+            if data_fingerprint is None:
+                return {}
+            ingestion_key = compute_cache_key(
+                "data_ingestion", data_fingerprint, schema_config["columns"], FILE_NAME,
+                code_fingerprint(DataIngestion, USvisaData, load_dataframe)
+            )
+
+        validation_key = compute_cache_key(
+            "data_validation", ingestion_key or feature_store_digest, schema_config, code_fingerprint(DataValidation, ColumnStatistics)
+        )
+        transformation_key = compute_cache_key(
+            "data_transformation", validation_key,
+            {section: schema_config.get(section) for section in ("num_features", "oh_columns", "transform_columns")},
+            sklearn.__version__, code_fingerprint(DataTransformation, ColumnStatistics, save_numpy_array_data)
+        )
+        trainer_key = compute_cache_key(
+            "model_trainer", transformation_key,
+            {section: model_config.get(section) for section in ("model_selection", "search", "scoring")},
+            sklearn.__version__, code_fingerprint(ModelTrainer, ParallelModelSearch, score_clustering)
+        )
+        return {
+            "data_ingestion": ingestion_key,
+            "data_validation": validation_key,
+            "data_transformation": transformation_key,
+            "model_trainer": trainer_key
+        }
+
+    def run_cached_stage(self, stage_name: str, cache_key: str, stage_dir: str, artifact_class, run_stage):
+        """
+        Return the cached artifact for ``cache_key`` (hard-linking its files
+        into this run) or run the stage and record its output.
+        """
+        run_dir = self.training_pipeline_config.artifact_dir
+        if self.stage_cache is None or cache_key is None:
+            return run_stage()
+
+        entry = self.stage_cache.lookup(cache_key)
+        if entry is not None:
+            logging.info(f"♻️ Reusing {stage_name} output from {entry['run_dir']}")
+            return artifact_class(**self.stage_cache.restore(entry, run_dir))
+
+        artifact = run_stage()
+        self.stage_cache.store(cache_key, stage_name, run_dir, stage_dir, asdict(artifact))
+        return artifact
+
+    @instrumented_stage("data_ingestion", rows=lambda artifact: read_row_count(artifact.feature_store_file_path))
     def start_data_ingestion(self) -> DataIngestionArtifact:
         logging.info("📥 Starting data ingestion")
-        ingestion = DataIngestion(self.data_ingestion_config)
+        ingestion = DataIngestion(self.data_ingestion_config, self._get_usvisa_data())
         return ingestion.initiate_data_ingestion()
 
+    @instrumented_stage("data_validation", rows=lambda artifact, ingestion_artifact: read_row_count(
+        ingestion_artifact.feature_store_file_path
+    ))
     def start_data_validation(self, ingestion_artifact: DataIngestionArtifact) -> DataValidationArtifact:
         logging.info("🔍 Starting data validation")
         validation = DataValidation(ingestion_artifact, self.data_validation_config)
         return validation.initiate_data_validation()
 
-    def start_data_transformation(self, ingestion_artifact: DataIngestionArtifact) -> DataTransformationArtifact:
+    @instrumented_stage("data_transformation",
+                        rows=lambda artifact, *inputs: _array_rows(artifact.transformed_data_path))
+    def start_data_transformation(self, ingestion_artifact: DataIngestionArtifact,
+                                  validation_artifact: DataValidationArtifact = None) -> DataTransformationArtifact:
         logging.info("🔧 Starting data transformation")
-        transformation = DataTransformation(ingestion_artifact, self.data_transformation_config)
+        transformation = DataTransformation(ingestion_artifact, self.data_transformation_config, validation_artifact)
         return transformation.initiate_data_transformation()
 
+    @instrumented_stage("model_trainer", rows=lambda artifact, transformation_artifact: _array_rows(
+        transformation_artifact.transformed_data_path
+    ))
     def start_model_trainer(self, transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
         logging.info("🤖 Starting model training")
         trainer = ModelTrainer(transformation_artifact, self.model_trainer_config)
         return trainer.train_model()
 
+    @instrumented_stage("model_evaluation", rows=lambda artifact, transformation_artifact, *inputs: _array_rows(
+        transformation_artifact.transformed_data_path
+    ))
     def start_model_evaluation(
-        self, transformation_artifact: DataTransformationArtifact
+        self,
+        transformation_artifact: DataTransformationArtifact,
+        trainer_artifact: ModelTrainerArtifact,
+        ingestion_artifact: DataIngestionArtifact
     ) -> ModelEvaluationArtifact:
         logging.info("📊 Starting model evaluation")
-        evaluator = ModelEvaluation(self.model_evaluation_config, transformation_artifact)
+        evaluator = ModelEvaluation(
+            self.model_evaluation_config, transformation_artifact, trainer_artifact, ingestion_artifact
+        )
         return evaluator.initiate_model_evaluation()
 
-    def run_pipeline(self):
-        try:
-            logging.info("🏁 Pipeline execution started")
+    @instrumented_stage("model_exporter", rows=lambda artifact, transformation_artifact, *inputs: _array_rows(
+        transformation_artifact.transformed_data_path
+    ))
+    def start_model_exporter(
+        self,
+        transformation_artifact: DataTransformationArtifact,
+        trainer_artifact: ModelTrainerArtifact,
+        ingestion_artifact: DataIngestionArtifact
+    ) -> ModelExporterArtifact:
+        logging.info("📦 Starting model export")
+        exporter = ModelExporter(
+            self.model_exporter_config, transformation_artifact, trainer_artifact, ingestion_artifact
+        )
+        return exporter.initiate_model_exporter()
 
-            ingestion_artifact = self.start_data_ingestion()
-            validation_artifact = self.start_data_validation(ingestion_artifact)
+    @instrumented_stage("model_pusher")
+    def start_model_pusher(self, evaluation_artifact: ModelEvaluationArtifact,
+                           stage_artifacts: dict = None, mode: str = "full") -> ModelPusherArtifact:
+        logging.info("🚚 Starting model pusher")
+        pusher = ModelPusher(self.model_pusher_config, evaluation_artifact, stage_artifacts, mode)
+        return pusher.initiate_model_pusher()
 
-            if not validation_artifact.validation_status:
-                raise Exception("❌ Data validation failed. Stopping pipeline.")
+    @instrumented_stage("incremental_training", rows=lambda artifact: artifact.rows_processed)
+    def start_incremental_training(self) -> IncrementalTrainerArtifact:
+        logging.info("➕ Starting incremental training")
+        incremental_trainer = IncrementalModelTrainer(self.incremental_trainer_config, self._get_usvisa_data())
+        return incremental_trainer.initiate_incremental_training()
 
-            transformation_artifact = self.start_data_transformation(ingestion_artifact)
-            trainer_artifact = self.start_model_trainer(transformation_artifact)
-            evaluation_artifact = self.start_model_evaluation(transformation_artifact)
+    def run_incremental_pipeline(self):
+        """
+        Update the latest run's centroids with documents added since its
+        watermark; falls back to the full pipeline when that is not possible
+        or the new data has drifted past the configured threshold. The
+        updated model is promoted only if model evaluation accepts it.
+        """
+        try:
+            logging.info("🏁 Incremental pipeline execution started")
+            incremental_artifact = self.start_incremental_training()
 
-            logging.info(f"📈 Evaluation Score: {evaluation_artifact.silhouette_score}")
-            logging.info("✅ Pipeline execution completed successfully")
+            if incremental_artifact.full_retrain_required:
+                logging.info(f"🔁 Falling back to full retrain: {incremental_artifact.message}")
+                self.run_pipeline()
+                return
+
+            if incremental_artifact.model_path is not None:
+                # The increment's own rows are the evaluation sample and the export's verification sample
+                transformation_artifact = DataTransformationArtifact(
+                    transformed_data_path=incremental_artifact.transformed_data_path,
+                    transformer_object_path=self.incremental_trainer_config.transformer_object_path
+                )
+                trainer_artifact = ModelTrainerArtifact(
+                    model_path=incremental_artifact.model_path,
+                    silhouette_score=None,
+                    labels_path=incremental_artifact.labels_path
+                )
+                ingestion_artifact = DataIngestionArtifact(
+                    feature_store_file_path=self.incremental_trainer_config.increment_file_path
+                )
+                evaluation_artifact = self.start_model_evaluation(
+                    transformation_artifact, trainer_artifact, ingestion_artifact
+                )
+                self.start_model_exporter(transformation_artifact, trainer_artifact, ingestion_artifact)
+                self.start_model_pusher(
+                    evaluation_artifact, {"incremental_trainer": incremental_artifact}, mode="incremental"
+                )
+                logging.info(f"🏷️ Incremental model accepted for serving: {evaluation_artifact.is_model_accepted}")
 
+            logging.info(f"✅ Incremental pipeline completed: {incremental_artifact.message}")
         except Exception as e:
             raise USvisaException(e, sys)
 
+    def build_dag(self) -> PipelineDAG:
+        """
+        Stages and their inputs. Transformation follows validation, whose
+        column statistics replace the transformer's fitting pass, so neither
+        transformation nor training starts on data that failed validation.
+        """
+        cache_keys = self.get_stage_cache_keys() if self.stage_cache is not None else {}
+
+        def cached(stage_name, stage_dir, artifact_class, run_stage):
+            return lambda **inputs: self.run_cached_stage(
+                stage_name, cache_keys.get(stage_name), stage_dir, artifact_class, lambda: run_stage(**inputs)
+            )
+
+        def ingest():
+            ingestion_artifact = self.run_cached_stage(
+                "data_ingestion", cache_keys.get("data_ingestion"), DATA_INGESTION_DIR_NAME, DataIngestionArtifact,
+                self.start_data_ingestion
+            )
+            if self.stage_cache is not None and cache_keys.get("data_ingestion") is None:
+                # Later stages are keyed on what was actually ingested
+                cache_keys.update(self.get_stage_cache_keys(
+                    compute_file_sha256(ingestion_artifact.feature_store_file_path)
+                ))
+            return ingestion_artifact
 
+        def validate(data_ingestion):
+            validation_artifact = self.run_cached_stage(
+                "data_validation", cache_keys.get("data_validation"), DATA_VALIDATION_DIR_NAME, DataValidationArtifact,
+                lambda: self.start_data_validation(data_ingestion)
+            )
+            if not validation_artifact.validation_status:
+                raise Exception(f"❌ Data validation failed. Stopping pipeline. {validation_artifact.message}")
+            return validation_artifact
 
+        return PipelineDAG([
+            Stage("data_ingestion", ingest, artifact_class=DataIngestionArtifact),
+            Stage("data_validation", validate, ["data_ingestion"], DataValidationArtifact),
+            Stage("data_transformation",
+                  cached("data_transformation", DATA_TRANSFORMATION_DIR_NAME, DataTransformationArtifact,
+                         lambda data_ingestion, data_validation: self.start_data_transformation(
+                             data_ingestion, data_validation
+                         )),
+                  ["data_ingestion", "data_validation"], DataTransformationArtifact),
+            # MLflow's active run and the search's SIGALRM timeouts are tied to the main thread
+            Stage("model_trainer",
+                  cached("model_trainer", MODEL_TRAINER_DIR_NAME, ModelTrainerArtifact,
+                         lambda data_transformation, data_validation: self.start_model_trainer(data_transformation)),
+                  ["data_transformation", "data_validation"], ModelTrainerArtifact, main_thread=True),
+            # Evaluation is never cached: its outcome depends on whichever model is serving now
+            Stage("model_evaluation",
+                  lambda data_ingestion, data_transformation, model_trainer: self.start_model_evaluation(
+                      data_transformation, model_trainer, data_ingestion
+                  ),
+                  ["data_ingestion", "data_transformation", "model_trainer"], ModelEvaluationArtifact),
+            # Export runs beside evaluation; both only read the trainer's output
+            Stage("model_exporter",
+                  lambda data_ingestion, data_transformation, model_trainer: self.start_model_exporter(
+                      data_transformation, model_trainer, data_ingestion
+                  ),
+                  ["data_ingestion", "data_transformation", "model_trainer"], ModelExporterArtifact),
+            Stage("model_pusher",
+                  lambda **artifacts: self.start_model_pusher(artifacts["model_evaluation"], artifacts),
+                  ["data_ingestion", "data_validation", "data_transformation", "model_trainer",
+                   "model_exporter", "model_evaluation"],
+                  ModelPusherArtifact)
+        ])
 
+    def run_pipeline(self, resume: bool = False):
+        """
+        Run the stage DAG in this pipeline's run directory. With ``resume``,
+        stages completed by an earlier attempt on the same directory are not
+        run again. Only a directory passed as TrainPipeline(artifact_dir=...)
+        is resumed: the default one comes from the import-time timestamp, so
+        a second pipeline in the same process would otherwise pick up the
+        first one's finished state.
+        """
+        try:
+            logging.info("🏁 Pipeline execution started")
+            if resume and not self.resumable:
+                logging.info("ℹ️ No artifact_dir was given to resume; running every stage")
+                resume = False
 
+            scheduler = DAGScheduler(
+                self.build_dag(),
+                state_file_path=self.training_pipeline_config.pipeline_state_file_path,
+                max_workers=PIPELINE_MAX_WORKERS
+            )
+            outputs = scheduler.run(resume=resume)
+            evaluation_artifact = outputs["model_evaluation"]
+            ArtifactRegistry(self.model_pusher_config.base_artifact_path).update_run_metrics(
+                self.training_pipeline_config.artifact_dir,
+                {name: asdict(metrics) for name, metrics in scheduler.metrics.items()}
+            )
+
+            logging.info(f"📈 Evaluation Score: {evaluation_artifact.silhouette_score}")
+            logging.info(f"🏷️ Model accepted for serving: {evaluation_artifact.is_model_accepted}")
+            logging.info(f"📦 Serving run: {outputs['model_pusher'].promoted_run_dir}")
+            logging.info("✅ Pipeline execution completed successfully")
+            return outputs
+
+        except Exception as e:
+            raise USvisaException(e, sys)
@@ -0,0 +1,390 @@
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.exception import USvisaException
+from src.logger import logging
+
+# schema.yaml column types -> Arrow types used on disk
+ARROW_TYPE_NAMES = {
+    "int": "int64",
+    "float": "float64",
+    "category": "string"
+}
+
+
+def apply_schema_dtypes(df: pd.DataFrame, column_types: Optional[Dict[str, str]] = None,
+                        categorical_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Cast a frame to the schema.yaml types: nullable Int64 for int, float64
+    for float, pandas Categorical for ``categorical_columns`` and object for
+    any other category column.
+    """
+    column_types = column_types or {}
+    categorical_columns = set(categorical_columns or [])
+    for column in df.columns:
+        column_type = column_types.get(column)
+        if column in categorical_columns:
+            df[column] = df[column].astype("category")
+        elif column_type == "int":
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+        elif column_type == "float":
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+        elif column_type == "category":
+            df[column] = df[column].astype("object")
+    return df
+
+
+class ArtifactWriter(ABC):
+    """Appends DataFrame chunks to a single artifact file."""
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ArtifactFormat(ABC):
+    """
+    One on-disk representation for the DataFrames handed between pipeline
+    stages. Implementations must support appending chunks and reading back a
+    subset of columns.
+    """
+    name: str = ""
+    extension: str = ""
+
+    @abstractmethod
+    def open_writer(self, file_path: str, column_types: Optional[Dict[str, str]] = None) -> ArtifactWriter:
+        ...
+
+    @abstractmethod
+    def read(self, file_path: str, columns: Optional[List[str]] = None,
+             categorical_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def read_column_names(self, file_path: str) -> List[str]:
+        ...
+
+    @abstractmethod
+    def iter_chunks(self, file_path: str, columns: Optional[List[str]] = None,
+                    chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        """Yield the file as frames of at most ``chunk_size`` rows, never holding all of it."""
+
+    def read_row_count(self, file_path: str) -> int:
+        # Formats without row metadata stream a single column
+        first_column = self.read_column_names(file_path)[:1]
+        return sum(len(chunk) for chunk in self.iter_chunks(file_path, first_column))
+
+    def write(self, df: pd.DataFrame, file_path: str, column_types: Optional[Dict[str, str]] = None) -> None:
+        with self.open_writer(file_path, column_types) as writer:
+            writer.write(df)
+
+
+class _CsvWriter(ArtifactWriter):
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._header_written = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self.file_path, mode="a" if self._header_written else "w",
+                  index=False, header=not self._header_written)
+        self._header_written = True
+
+
+class CsvFormat(ArtifactFormat):
+    name = "csv"
+    extension = ".csv"
+
+    def open_writer(self, file_path: str, column_types: Optional[Dict[str, str]] = None) -> ArtifactWriter:
+        return _CsvWriter(file_path)
+
+    def read(self, file_path: str, columns: Optional[List[str]] = None,
+             categorical_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        dtype = {column: "category" for column in categorical_columns or []
+                 if columns is None or column in columns}
+        return pd.read_csv(file_path, usecols=columns, dtype=dtype or None)
+
+    def read_column_names(self, file_path: str) -> List[str]:
+        return list(pd.read_csv(file_path, nrows=0).columns)
+
+    def iter_chunks(self, file_path: str, columns: Optional[List[str]] = None,
+                    chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        with pd.read_csv(file_path, usecols=columns, chunksize=chunk_size) as reader:
+            yield from reader
+
+
+def _arrow_schema(column_types: Optional[Dict[str, str]], df: pd.DataFrame):
+    import pyarrow as pa
+
+    if not column_types:
+        return None
+    fields = []
+    for column in df.columns:
+        type_name = ARROW_TYPE_NAMES.get(column_types.get(column))
+        if type_name is None:
+            return None
+        fields.append(pa.field(str(column), getattr(pa, type_name)()))
+    return pa.schema(fields)
+
+
+def _to_arrow_table(df: pd.DataFrame, schema):
+    import pyarrow as pa
+
+    # Categoricals are stored as plain strings; Parquet dictionary-encodes them
+    # on disk and readers turn them back into dictionary/categorical columns
+    df = df.copy(deep=False)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("object")
+    df.columns = [str(column) for column in df.columns]
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+class _ParquetWriter(ArtifactWriter):
+    def __init__(self, file_path: str, column_types: Optional[Dict[str, str]]):
+        self.file_path = file_path
+        self.column_types = column_types
+        self._writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            table = _to_arrow_table(df, _arrow_schema(self.column_types, df))
+            self._writer = pq.ParquetWriter(self.file_path, table.schema, use_dictionary=True, compression="snappy")
+        else:
+            table = _to_arrow_table(df, self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetFormat(ArtifactFormat):
+    name = "parquet"
+    extension = ".parquet"
+
+    def open_writer(self, file_path: str, column_types: Optional[Dict[str, str]] = None) -> ArtifactWriter:
+        return _ParquetWriter(file_path, column_types)
+
+    def read(self, file_path: str, columns: Optional[List[str]] = None,
+             categorical_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+
+        read_dictionary = [column for column in categorical_columns or []
+                           if columns is None or column in columns]
+        table = pq.read_table(file_path, columns=columns, read_dictionary=read_dictionary or None)
+        return table.to_pandas()
+
+    def read_column_names(self, file_path: str) -> List[str]:
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(file_path).names)
+
+    def iter_chunks(self, file_path: str, columns: Optional[List[str]] = None,
+                    chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(file_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+
+    def read_row_count(self, file_path: str) -> int:
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(file_path).metadata.num_rows
+
+
+class _ArrowIpcWriter(ArtifactWriter):
+    def __init__(self, file_path: str, column_types: Optional[Dict[str, str]]):
+        self.file_path = file_path
+        self.column_types = column_types
+        self._sink = None
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        import pyarrow as pa
+
+        if self._writer is None:
+            table = _to_arrow_table(df, _arrow_schema(self.column_types, df))
+            self._schema = table.schema
+            self._sink = pa.OSFile(self.file_path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+        else:
+            table = _to_arrow_table(df, self._schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = None
+            self._sink = None
+
+
+class ArrowIpcFormat(ArtifactFormat):
+    name = "arrow"
+    extension = ".arrow"
+
+    def open_writer(self, file_path: str, column_types: Optional[Dict[str, str]] = None) -> ArtifactWriter:
+        return _ArrowIpcWriter(file_path, column_types)
+
+    def read(self, file_path: str, columns: Optional[List[str]] = None,
+             categorical_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        import pyarrow as pa
+
+        with pa.memory_map(file_path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        for column in categorical_columns or []:
+            if column in table.column_names:
+                index = table.column_names.index(column)
+                table = table.set_column(index, column, table.column(column).dictionary_encode())
+        return table.to_pandas()
+
+    def read_column_names(self, file_path: str) -> List[str]:
+        import pyarrow as pa
+
+        with pa.memory_map(file_path, "r") as source:
+            return list(pa.ipc.open_file(source).schema.names)
+
+    def iter_chunks(self, file_path: str, columns: Optional[List[str]] = None,
+                    chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+        import pyarrow as pa
+
+        with pa.memory_map(file_path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                batch = reader.get_batch(index)
+                if columns is not None:
+                    batch = batch.select(columns)
+                # Record batches are as large as the writer's chunks; re-slice them to chunk_size
+                for start in range(0, batch.num_rows, chunk_size):
+                    yield batch.slice(start, chunk_size).to_pandas()
+
+    def read_row_count(self, file_path: str) -> int:
+        import pyarrow as pa
+
+        # Memory-mapped, so only the batch headers are touched
+        with pa.memory_map(file_path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            return sum(reader.get_batch(index).num_rows for index in range(reader.num_record_batches))
+
+
+ARTIFACT_FORMATS: Dict[str, ArtifactFormat] = {
+    fmt.name: fmt for fmt in (CsvFormat(), ParquetFormat(), ArrowIpcFormat())
+}
+
+
+def get_artifact_format(file_path: str) -> ArtifactFormat:
+    """Pick the format implementation from the file extension."""
+    extension = os.path.splitext(file_path)[1].lower()
+    for fmt in ARTIFACT_FORMATS.values():
+        if fmt.extension == extension:
+            return fmt
+    raise ValueError(f"No artifact format registered for extension '{extension}'")
+
+
+def save_dataframe(file_path: str, df: pd.DataFrame, column_types: Optional[Dict[str, str]] = None) -> None:
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        get_artifact_format(file_path).write(df, file_path, column_types)
+        logging.info(f"💾 Saved {len(df)} rows to {file_path}")
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def open_dataframe_writer(file_path: str, column_types: Optional[Dict[str, str]] = None) -> ArtifactWriter:
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        return get_artifact_format(file_path).open_writer(file_path, column_types)
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def load_dataframe(file_path: str, columns: Optional[List[str]] = None,
+                   categorical_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Load an artifact, reading only ``columns`` when given; columnar formats
+    skip the other columns on disk entirely.
+    """
+    try:
+        return get_artifact_format(file_path).read(file_path, columns, categorical_columns)
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def iter_dataframe_chunks(file_path: str, columns: Optional[List[str]] = None,
+                          chunk_size: int = 100000) -> Iterator[pd.DataFrame]:
+    """Stream an artifact as DataFrame chunks of at most ``chunk_size`` rows."""
+    try:
+        yield from get_artifact_format(file_path).iter_chunks(file_path, columns, chunk_size)
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def load_dataframe_rows(file_path: str, row_index, columns: Optional[List[str]] = None,
+                        chunk_size: int = 100000) -> pd.DataFrame:
+    """
+    Rows at the positions in ``row_index``, in that order, streamed chunk by
+    chunk so that only the selected rows are ever held in memory. Reading
+    stops after the chunk holding the last selected row.
+    """
+    try:
+        row_index = np.asarray(row_index, dtype=np.int64)
+        order = np.argsort(row_index, kind="stable")
+        sorted_index = row_index[order]
+        parts = []
+        start = 0
+        for chunk in get_artifact_format(file_path).iter_chunks(file_path, columns, chunk_size):
+            stop = start + len(chunk)
+            low, high = np.searchsorted(sorted_index, [start, stop])
+            if high > low:
+                parts.append(chunk.iloc[sorted_index[low:high] - start])
+            start = stop
+            if high == len(sorted_index):
+                break
+        if start <= (sorted_index[-1] if len(sorted_index) else -1):
+            raise IndexError(f"Row {sorted_index[-1]} is out of range for {file_path} ({start} rows)")
+
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        selected = pd.concat(parts, ignore_index=True)
+        # Back from ascending positions to the caller's order
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        return selected.iloc[inverse].reset_index(drop=True)
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def read_column_names(file_path: str) -> List[str]:
+    try:
+        return get_artifact_format(file_path).read_column_names(file_path)
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def read_row_count(file_path: str) -> int:
+    """Number of rows in an artifact, from its metadata where the format has it."""
+    try:
+        return get_artifact_format(file_path).read_row_count(file_path)
+    except Exception as e:
+        raise USvisaException(e, sys) from e
@@ -0,0 +1,139 @@
+import sys
+from dataclasses import dataclass, asdict
+from statistics import NormalDist
+from typing import Optional
+
+import numpy as np
+import sklearn
+from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score, silhouette_samples
+
+from src.exception import USvisaException
+
+# metric name -> True when a larger value means better clusters
+SCORING_METRICS = {
+    "silhouette": True,
+    "calinski_harabasz": True,
+    "davies_bouldin": False
+}
+
+DEFAULT_SCORING_CONFIG = {
+    "metric": "silhouette",
+    "method": "sampled",
+    "sample_size_per_cluster": 2000,
+    "n_repeats": 5,
+    "confidence": 0.95,
+    "working_memory_mb": 256,
+    "random_state": 42
+}
+
+
+@dataclass
+class ClusterScore:
+    metric: str
+    method: str
+    value: float
+    ci_low: Optional[float]
+    ci_high: Optional[float]
+    n_samples: int
+    greater_is_better: bool = True
+
+    @property
+    def ranking_value(self) -> float:
+        """Value oriented so that larger always means better."""
+        return self.value if self.greater_is_better else -self.value
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def get_scoring_config(model_config: Optional[dict]) -> dict:
+    """Merge the ``scoring`` section of model.yaml over the defaults."""
+    scoring_config = dict(DEFAULT_SCORING_CONFIG)
+    scoring_config.update((model_config or {}).get("scoring") or {})
+    if scoring_config["metric"] not in SCORING_METRICS:
+        raise ValueError(f"Unknown scoring metric: {scoring_config['metric']}")
+    if scoring_config["method"] not in ("sampled", "exact"):
+        raise ValueError(f"Unknown scoring method: {scoring_config['method']}")
+    return scoring_config
+
+
+def stratified_sample_indices(labels: np.ndarray, per_cluster: int, random_state) -> np.ndarray:
+    """Pick at most ``per_cluster`` rows from every cluster, without replacement."""
+    rng = np.random.default_rng(random_state)
+    indices = []
+    for cluster in np.unique(labels):
+        members = np.flatnonzero(labels == cluster)
+        if len(members) > per_cluster:
+            members = rng.choice(members, size=per_cluster, replace=False)
+        indices.append(members)
+    return np.sort(np.concatenate(indices))
+
+
+def _silhouette_values(data, labels: np.ndarray, working_memory_mb: int) -> np.ndarray:
+    # silhouette_samples walks the distance matrix in row blocks sized by
+    # working_memory, so memory stays O(block) rather than O(n^2)
+    with sklearn.config_context(working_memory=working_memory_mb):
+        return silhouette_samples(data, labels)
+
+
+def _metric_value(metric: str, data, labels: np.ndarray, working_memory_mb: int,
+                  weights: Optional[np.ndarray] = None) -> float:
+    if metric == "silhouette":
+        return float(np.average(_silhouette_values(data, labels, working_memory_mb), weights=weights))
+    if metric == "calinski_harabasz":
+        return float(calinski_harabasz_score(data, labels))
+    return float(davies_bouldin_score(data, labels))
+
+
+def score_clustering(data, labels, scoring_config: Optional[dict] = None) -> ClusterScore:
+    """
+    Score a clustering with the metric and method from ``scoring_config``
+    (see DEFAULT_SCORING_CONFIG).
+
+    exact   -- every row; silhouette is computed in row blocks so the full
+               distance matrix is never held. The interval is zero-width.
+    sampled -- n_repeats stratified samples capped at sample_size_per_cluster
+               rows per cluster. Silhouette values are reweighted by each
+               cluster's sampling fraction so small clusters are not
+               over-represented. The interval is a normal approximation over
+               the repeats. Falls back to exact when no cluster exceeds the cap.
+
+    Calinski-Harabasz and Davies-Bouldin are linear in n, so they are always
+    computed exactly on every row.
+    """
+    try:
+        config = dict(DEFAULT_SCORING_CONFIG)
+        config.update(scoring_config or {})
+        metric = config["metric"]
+        greater_is_better = SCORING_METRICS[metric]
+        labels = np.asarray(labels)
+        working_memory_mb = config["working_memory_mb"]
+        per_cluster = config["sample_size_per_cluster"]
+
+        clusters, counts = np.unique(labels, return_counts=True)
+        if config["method"] == "exact" or metric != "silhouette" or counts.max() <= per_cluster:
+            value = _metric_value(metric, data, labels, working_memory_mb)
+            return ClusterScore(metric, "exact", value, value, value, len(labels), greater_is_better)
+
+        # Inverse sampling fraction per cluster, for the weighted silhouette mean
+        cluster_weights = counts / np.minimum(counts, per_cluster)
+        seed_sequence = np.random.SeedSequence(config["random_state"])
+        repeat_values = []
+        for child_seed in seed_sequence.spawn(max(1, config["n_repeats"])):
+            sample_index = stratified_sample_indices(labels, per_cluster, child_seed)
+            sample_labels = labels[sample_index]
+            weights = cluster_weights[np.searchsorted(clusters, sample_labels)]
+            repeat_values.append(
+                _metric_value(metric, data[sample_index], sample_labels, working_memory_mb, weights)
+            )
+
+        value = float(np.mean(repeat_values))
+        ci_low = ci_high = None
+        if len(repeat_values) > 1:
+            z = NormalDist().inv_cdf(0.5 + config["confidence"] / 2)
+            half_width = z * float(np.std(repeat_values, ddof=1)) / np.sqrt(len(repeat_values))
+            ci_low, ci_high = float(value - half_width), float(value + half_width)
+
+        return ClusterScore(metric, "sampled", value, ci_low, ci_high, len(sample_index), greater_is_better)
+    except Exception as e:
+        raise USvisaException(e, sys) from e
@@ -0,0 +1,170 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLUMN_TYPES = ("int", "float")
+
+
+def _to_builtin(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ColumnStatistics:
+    """
+    Per-column summary accumulated one chunk at a time, for a column typed
+    ``int``, ``float`` or ``category`` in schema.yaml.
+
+    Each ``update`` is a handful of vectorized operations on the chunk; two
+    summaries over disjoint rows combine with ``merge``, so chunks (or
+    files) can be profiled independently. Values of the wrong type (text in
+    a numeric column, fractions in an int column, numbers in a category
+    column) are counted in ``type_errors`` and otherwise ignored.
+
+    Numeric columns also keep the mean and the sum of squared deviations
+    (``m2``), combined across chunks with Chan et al.'s parallel form of
+    Welford's update, which stays accurate where sum/sum-of-squares would
+    cancel. Together with the category counts these are the sufficient
+    statistics of StandardScaler and OneHotEncoder.
+    """
+
+    def __init__(self, name: str, column_type: str,
+                 min_value: Optional[float] = None, max_value: Optional[float] = None):
+        self.name = name
+        self.column_type = column_type
+        self.min_value = min_value
+        self.max_value = max_value
+        self.count = 0
+        self.null_count = 0
+        self.type_errors = 0
+        self.out_of_range = 0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.category_counts: Dict[Any, int] = {}
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.column_type in NUMERIC_COLUMN_TYPES
+
+    @property
+    def rows(self) -> int:
+        return self.count + self.null_count + self.type_errors
+
+    @property
+    def null_rate(self) -> float:
+        return self.null_count / self.rows if self.rows else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Population variance (ddof=0), as StandardScaler uses."""
+        return self.m2 / self.count if self.count else 0.0
+
+    def _merge_moments(self, count: int, mean: float, m2: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def update(self, values: pd.Series) -> None:
+        nulls = values.isna()
+        self.null_count += int(nulls.sum())
+        if self.is_numeric:
+            self._update_numeric(values, nulls)
+        else:
+            self._update_categorical(values[~nulls])
+
+    def _update_numeric(self, values: pd.Series, nulls: pd.Series) -> None:
+        numeric = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors="coerce")
+        parsed = numeric.notna()
+        type_errors = int((~parsed & ~nulls).sum())
+        present = numeric[parsed].to_numpy(dtype=np.float64)
+        if self.column_type == "int":
+            integral = present == np.floor(present)
+            type_errors += int((~integral).sum())
+            present = present[integral]
+        self.type_errors += type_errors
+        if not present.size:
+            return
+
+        chunk_mean = float(present.mean())
+        self._merge_moments(present.size, chunk_mean, float(np.square(present - chunk_mean).sum()))
+        chunk_min, chunk_max = float(present.min()), float(present.max())
+        self.minimum = chunk_min if self.minimum is None else min(self.minimum, chunk_min)
+        self.maximum = chunk_max if self.maximum is None else max(self.maximum, chunk_max)
+        if self.min_value is not None or self.max_value is not None:
+            outside = np.zeros(present.size, dtype=bool)
+            if self.min_value is not None:
+                outside |= present < self.min_value
+            if self.max_value is not None:
+                outside |= present > self.max_value
+            self.out_of_range += int(outside.sum())
+
+    def _update_categorical(self, present: pd.Series) -> None:
+        if pd.api.types.infer_dtype(present, skipna=True) not in ("string", "empty"):
+            is_text = present.map(lambda value: isinstance(value, str)).astype(bool)
+            self.type_errors += int((~is_text).sum())
+            present = present[is_text]
+        self.count += len(present)
+        for value, count in present.value_counts(sort=False).items():
+            self.category_counts[value] = self.category_counts.get(value, 0) + int(count)
+
+    def merge(self, other: "ColumnStatistics") -> "ColumnStatistics":
+        """Fold the statistics of ``other`` (disjoint rows of the same column) into this one."""
+        if self.is_numeric and other.count:
+            self._merge_moments(other.count, other.mean, other.m2)
+        elif not self.is_numeric:
+            self.count += other.count
+        self.null_count += other.null_count
+        self.type_errors += other.type_errors
+        self.out_of_range += other.out_of_range
+        for bound, pick in (("minimum", min), ("maximum", max)):
+            mine, theirs = getattr(self, bound), getattr(other, bound)
+            setattr(self, bound, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        for value, count in other.category_counts.items():
+            self.category_counts[value] = self.category_counts.get(value, 0) + count
+        return self
+
+    def to_dict(self, max_categories: int = 100) -> dict:
+        """Report entry; category counts are left out above ``max_categories`` distinct values."""
+        report = {
+            "type": self.column_type,
+            "rows": self.rows,
+            "count": self.count,
+            "null_count": self.null_count,
+            "null_rate": round(self.null_rate, 6),
+            "type_errors": self.type_errors
+        }
+        if self.is_numeric:
+            report.update({
+                "min": self.minimum,
+                "max": self.maximum,
+                "mean": self.mean if self.count else None,
+                "variance": self.variance if self.count else None,
+                "out_of_range": self.out_of_range
+            })
+        else:
+            report["n_distinct"] = len(self.category_counts)
+            if len(self.category_counts) <= max_categories:
+                report["categories"] = {
+                    _to_builtin(value): count for value, count in sorted(self.category_counts.items())
+                }
+        return report
+
+    @classmethod
+    def from_dict(cls, name: str, report: dict) -> "ColumnStatistics":
+        """Rebuild from a ``to_dict`` entry (e.g. the validation report) so it can be reused or merged."""
+        statistics = cls(name, report["type"])
+        statistics.count = report["count"]
+        statistics.null_count = report["null_count"]
+        statistics.type_errors = report["type_errors"]
+        statistics.out_of_range = report.get("out_of_range", 0)
+        statistics.minimum = report.get("min")
+        statistics.maximum = report.get("max")
+        if statistics.is_numeric and statistics.count:
+            statistics.mean = report["mean"]
+            statistics.m2 = report["variance"] * statistics.count
+        statistics.category_counts = dict(report.get("categories") or {})
+        return statistics
@@ -0,0 +1,86 @@
+"""
+Single-file inference artifact: the fitted scaler statistics, one-hot
+category tables and cluster centroids of a run, laid out so a NumPy-only
+reader can memory-map it.
+
+Layout (little-endian):
+
+    8 bytes   magic  b"\\x93USEGINF"
+    8 bytes   uint64 length of the JSON header
+    N bytes   UTF-8 JSON header, zero-padded to a 64-byte boundary
+    ...       arrays, each starting on a 64-byte boundary
+
+The header carries ``format_version``, the feature layout and, per array,
+its dtype, shape and byte offset from the start of the file. Only numpy and
+the standard library are imported here.
+"""
+import json
+import os
+import struct
+from typing import Dict, Tuple
+
+import numpy as np
+
+INFERENCE_ARTIFACT_MAGIC = b"\x93USEGINF"
+INFERENCE_ARTIFACT_FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_inference_artifact(file_path: str, header: dict, arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Write ``arrays`` and ``header`` in the layout above. Array offsets are
+    filled in here; the file is written next to its target and moved into
+    place so readers never map a partial file.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    header = dict(header, format_version=INFERENCE_ARTIFACT_FORMAT_VERSION)
+
+    # Offsets depend on the header size, which depends on the offsets: iterate until stable
+    header_size = 0
+    while True:
+        offset = _align(len(INFERENCE_ARTIFACT_MAGIC) + 8 + header_size)
+        layout = {}
+        for name, array in arrays.items():
+            layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset = _align(offset + array.nbytes)
+        header_bytes = json.dumps(dict(header, arrays=layout), sort_keys=True).encode("utf-8")
+        if len(header_bytes) == header_size:
+            break
+        header_size = len(header_bytes)
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as file_obj:
+        file_obj.write(INFERENCE_ARTIFACT_MAGIC)
+        file_obj.write(struct.pack("<Q", len(header_bytes)))
+        file_obj.write(header_bytes)
+        for name, array in arrays.items():
+            file_obj.write(b"\0" * (layout[name]["offset"] - file_obj.tell()))
+            file_obj.write(array.tobytes())
+    os.replace(tmp_path, file_path)
+
+
+def read_inference_artifact(file_path: str) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """
+    Map the file read-only and return (header, arrays). The arrays are views
+    into the mapping, so processes serving the same file share its pages.
+    """
+    buffer = np.memmap(file_path, dtype=np.uint8, mode="r")
+    if bytes(buffer[:len(INFERENCE_ARTIFACT_MAGIC)]) != INFERENCE_ARTIFACT_MAGIC:
+        raise ValueError(f"{file_path} is not an inference artifact")
+    start = len(INFERENCE_ARTIFACT_MAGIC)
+    (header_size,) = struct.unpack("<Q", bytes(buffer[start:start + 8]))
+    header = json.loads(bytes(buffer[start + 8:start + 8 + header_size]).decode("utf-8"))
+    if header.get("format_version") != INFERENCE_ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported inference artifact version: {header.get('format_version')}")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=spec["offset"]).reshape(spec["shape"])
+    return header, arrays
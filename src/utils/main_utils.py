@@ -1,15 +1,23 @@
 import os
 import sys
+from typing import TYPE_CHECKING
 
 import numpy as np
-import dill
 import yaml
-from pandas import DataFrame
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
 from src.exception import USvisaException
 from src.logger import logging
 
 
+def _is_sparse(array) -> bool:
+    # scipy is only imported by whoever created the matrix; dense arrays never need it
+    scipy_sparse = sys.modules.get("scipy.sparse")
+    return scipy_sparse is not None and scipy_sparse.issparse(array)
+
+
 def read_yaml_file(file_path: str) -> dict:
     try:
         with open(file_path, "rb") as yaml_file:
@@ -20,6 +28,20 @@ def read_yaml_file(file_path: str) -> dict:
     
 
 
+def get_schema_column_types(schema_config: dict) -> dict:
+    """
+    Flatten the ``columns`` list of schema.yaml into {column_name: type}.
+    """
+    try:
+        column_types = {}
+        for column in schema_config["columns"]:
+            column_types.update(column)
+        return column_types
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+
 def write_yaml_file(file_path: str, content: object, replace: bool = False) -> None:
     try:
         if replace:
@@ -38,6 +60,7 @@ def load_object(file_path: str) -> object:
     logging.info("Entered the load_object method of utils")
 
     try:
+        import dill
 
         with open(file_path, "rb") as file_obj:
             obj = dill.load(file_obj)
@@ -54,12 +77,17 @@ def load_object(file_path: str) -> object:
 def save_numpy_array_data(file_path: str, array: np.array):
     """
     Save numpy array data to file
-    file_path: str location of file to save
-    array: np.array data to save
+    file_path: str location of file to save (.npy for dense, .npz for scipy.sparse)
+    array: np.array or scipy.sparse matrix data to save
     """
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path, exist_ok=True)
+        if _is_sparse(array):
+            import scipy.sparse
+            # Uncompressed so loading is a plain read of the CSR buffers
+            scipy.sparse.save_npz(file_path, array.tocsr(), compressed=False)
+            return
         with open(file_path, 'wb') as file_obj:
             np.save(file_obj, array)
     except Exception as e:
@@ -68,13 +96,50 @@ def save_numpy_array_data(file_path: str, array: np.array):
 
 
 
-def load_numpy_array_data(file_path: str) -> np.array:
+def save_numpy_array_chunks(file_path: str, chunks, shape: tuple, dtype=np.float64) -> tuple:
+    """
+    Write a .npy file one block of rows at a time, so the full array never
+    has to be in memory
+    file_path: str location of the .npy file
+    chunks: iterable of 2-D arrays (or scipy.sparse matrices) with shape[1] columns
+    shape: final (rows, columns); the header is written first, so it must be known up front
+    return: shape of the written array
+    """
+    try:
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+        dtype = np.dtype(dtype)
+        rows_written = 0
+        with open(file_path, 'wb') as file_obj:
+            np.lib.format.write_array_header_1_0(
+                file_obj, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": tuple(shape)}
+            )
+            for chunk in chunks:
+                chunk = np.ascontiguousarray(chunk.toarray() if _is_sparse(chunk) else chunk, dtype=dtype)
+                if chunk.ndim != 2 or chunk.shape[1] != shape[1]:
+                    raise ValueError(f"Chunk of shape {chunk.shape} does not fit an array of shape {tuple(shape)}")
+                file_obj.write(chunk.tobytes())
+                rows_written += chunk.shape[0]
+        if rows_written != shape[0]:
+            raise ValueError(f"Wrote {rows_written} rows to {file_path}, expected {shape[0]}")
+        return tuple(shape)
+    except Exception as e:
+        raise USvisaException(e, sys) from e
+
+
+def load_numpy_array_data(file_path: str, mmap_mode: str = None) -> np.array:
     """
     load numpy array data from file
-    file_path: str location of file to load
+    file_path: str location of file to load (.npz files load as scipy.sparse CSR)
+    mmap_mode: passed to np.load for .npy files, e.g. "r" to memory-map instead of reading
     return: np.array data loaded
     """
     try:
+        if file_path.endswith(".npz"):
+            import scipy.sparse
+            return scipy.sparse.load_npz(file_path).tocsr()
+        if mmap_mode is not None:
+            return np.load(file_path, mmap_mode=mmap_mode)
         with open(file_path, 'rb') as file_obj:
             return np.load(file_obj)
     except Exception as e:
@@ -87,6 +152,8 @@ def save_object(file_path: str, obj: object) -> None:
     logging.info("Entered the save_object method of utils")
 
     try:
+        import dill
+
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
         with open(file_path, "wb") as file_obj:
             dill.dump(obj, file_obj)
@@ -98,7 +165,7 @@ def save_object(file_path: str, obj: object) -> None:
 
 
 
-def drop_columns(df: DataFrame, cols: list)-> DataFrame:
+def drop_columns(df: "DataFrame", cols: list)-> "DataFrame":
 
     """
     drop the columns form a pandas DataFrame
@@ -0,0 +1,226 @@
+import math
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+_METRICS: Dict[str, "Metric"] = {}
+
+
+class NullMetricsBackend:
+    """
+    Drops every update. It is the default, so tests, the CLI and offline
+    training runs pay one attribute check per instrumented call and keep
+    no state.
+    """
+    enabled = False
+
+    def inc(self, metric: "Metric", key: tuple, amount: float) -> None:
+        pass
+
+    def set(self, metric: "Metric", key: tuple, value: float) -> None:
+        pass
+
+    def observe(self, metric: "Metric", key: tuple, value: float) -> None:
+        pass
+
+    def samples(self, metric: "Metric") -> dict:
+        return {}
+
+
+class InMemoryMetricsBackend(NullMetricsBackend):
+    """
+    Keeps every series in process memory behind one lock, ready to be
+    rendered in the Prometheus text format. Histogram series are
+    ``[per-bucket counts, sum, count]``, the last bucket being +Inf.
+    """
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, dict] = {}
+
+    def inc(self, metric: "Metric", key: tuple, amount: float) -> None:
+        with self._lock:
+            series = self._values.setdefault(metric.name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, metric: "Metric", key: tuple, value: float) -> None:
+        with self._lock:
+            self._values.setdefault(metric.name, {})[key] = float(value)
+
+    def observe(self, metric: "Histogram", key: tuple, value: float) -> None:
+        index = bisect_left(metric.buckets, value)
+        with self._lock:
+            series = self._values.setdefault(metric.name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [[0] * (len(metric.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self, metric: "Metric") -> dict:
+        with self._lock:
+            series = self._values.get(metric.name, {})
+            if isinstance(metric, Histogram):
+                return {key: [list(state[0]), state[1], state[2]] for key, state in series.items()}
+            return dict(series)
+
+
+_backend: NullMetricsBackend = NullMetricsBackend()
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Re-declaring a name (e.g. on module reload) replaces the old definition
+        _METRICS[name] = self
+
+    def _key(self, labels: dict) -> tuple:
+        # Values are stringified only when rendered; this runs on every update
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        try:
+            return tuple([labels[name] for name in self.labelnames])
+        except KeyError:
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}") from None
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if _backend.enabled:
+            _backend.inc(self, self._key(labels), amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        if _backend.enabled:
+            _backend.set(self, self._key(labels), value)
+
+
+class _Timer:
+    __slots__ = ("histogram", "key", "started")
+
+    def __init__(self, histogram: "Histogram", key: tuple):
+        self.histogram = histogram
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _backend.observe(self.histogram, self.key, time.perf_counter() - self.started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if not math.isinf(bound)))
+
+    def observe(self, value: float, **labels) -> None:
+        if _backend.enabled:
+            _backend.observe(self, self._key(labels), value)
+
+    def time(self, **labels):
+        """Context manager observing the seconds spent in its block; free when metrics are off."""
+        return _Timer(self, self._key(labels)) if _backend.enabled else _NULL_TIMER
+
+
+def enable_metrics(backend: Optional[NullMetricsBackend] = None) -> NullMetricsBackend:
+    """Start recording into ``backend`` (a fresh in-memory one by default) and return it."""
+    global _backend
+    _backend = backend if backend is not None else InMemoryMetricsBackend()
+    return _backend
+
+
+def disable_metrics() -> None:
+    global _backend
+    _backend = NullMetricsBackend()
+
+
+def metrics_enabled() -> bool:
+    return _backend.enabled
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MiB; None where the platform has no getrusage."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str, quotes: bool = True) -> str:
+    # Label values escape quotes as well; HELP text only backslashes and newlines
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def render_metrics() -> str:
+    """Every declared metric with its recorded series, in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for name, metric in sorted(_METRICS.items()):
+        lines.append(f"# HELP {name} {_escape(metric.documentation, quotes=False)}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for key, value in sorted(_backend.samples(metric).items(), key=lambda item: tuple(map(str, item[0]))):
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+                continue
+            bucket_counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(metric.buckets + (math.inf,), bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(metric.labelnames + ("le",), tuple(key) + (_format_value(bound),))
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _format_labels(metric.labelnames, key)
+            lines.append(f"{name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{name}_count{labels} {count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse
+from sklearn.cluster import KMeans
+from sklearn.compose import ColumnTransformer
+from sklearn.mixture import GaussianMixture
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.components.model_exporter import ModelExporter, UnsupportedModelError
+from src.constants import (
+    DATA_TRANSFORMATION_DIR_NAME,
+    MODEL_OBJECT_FILE_NAME,
+    MODEL_TRAINER_DIR_NAME,
+    SCHEMA_FILE_PATH,
+    TRANSFORM_OBJECT_FILE_NAME
+)
+from src.pipline.compact_predictor import CompactPredictor
+from src.pipline.prediction_pipeline import PredictionPipeline
+from src.utils.main_utils import read_yaml_file, save_object
+
+SCHEMA = read_yaml_file(SCHEMA_FILE_PATH)
+NUM_FEATURES = SCHEMA["num_features"]
+OH_COLUMNS = SCHEMA["oh_columns"]
+INPUT_FEATURES = SCHEMA["transform_columns"] + OH_COLUMNS
+
+
+def _dense(data) -> np.ndarray:
+    return data.toarray() if scipy.sparse.issparse(data) else np.asarray(data)
+
+
+@pytest.fixture(scope="module")
+def frame() -> pd.DataFrame:
+    return pd.read_csv("data/data_with_clusters.csv", nrows=400)[INPUT_FEATURES]
+
+
+@pytest.fixture(scope="module")
+def transformer(frame):
+    # The transformer DataTransformation.get_data_transformer_object builds
+    return ColumnTransformer([
+        ("num", StandardScaler(), NUM_FEATURES),
+        ("cat", OneHotEncoder(handle_unknown="ignore"), OH_COLUMNS)
+    ]).fit(frame)
+
+
+@pytest.fixture(scope="module")
+def model(frame, transformer):
+    return KMeans(n_clusters=5, n_init=10, random_state=42).fit(_dense(transformer.transform(frame)))
+
+
+@pytest.fixture(scope="module")
+def predictor(transformer, model) -> CompactPredictor:
+    header, arrays = ModelExporter.compile(transformer, model)
+    return CompactPredictor(header=header, arrays=arrays)
+
+
+def _expected(transformer, model, frame):
+    transformed = _dense(transformer.transform(frame))
+    return transformed, np.asarray(model.predict(transformed))
+
+
+def _write_run(run_dir, transformer, model) -> str:
+    save_object(os.path.join(run_dir, MODEL_TRAINER_DIR_NAME, MODEL_OBJECT_FILE_NAME), model)
+    save_object(os.path.join(run_dir, DATA_TRANSFORMATION_DIR_NAME, TRANSFORM_OBJECT_FILE_NAME), transformer)
+    return str(run_dir)
+
+
+def test_transform_and_predict_match_sklearn(frame, transformer, model, predictor):
+    expected_data, expected_labels = _expected(transformer, model, frame)
+
+    assert np.array_equal(predictor.transform(frame), expected_data)
+    assert np.array_equal(predictor.predict(frame), expected_labels)
+
+
+def test_predict_one_matches_sklearn(frame, transformer, model, predictor):
+    _, expected_labels = _expected(transformer, model, frame)
+
+    for index in range(50):
+        assert predictor.predict_one(frame.iloc[index].to_dict()) == expected_labels[index]
+
+
+def test_unseen_categories_are_ignored(frame, transformer, model, predictor):
+    sample = frame.head(60).copy()
+    sample.loc[sample.index[::2], "Gender"] = "Unknown"
+    sample.loc[sample.index[::3], "Age"] = "90+"
+    expected_data, expected_labels = _expected(transformer, model, sample)
+
+    assert np.array_equal(predictor.transform(sample), expected_data)
+    assert np.array_equal(predictor.predict(sample), expected_labels)
+    assert predictor.predict_one(sample.iloc[0].to_dict()) == expected_labels[0]
+
+
+def test_pandas_categorical_input(frame, transformer, model, predictor):
+    sample = frame.head(80).copy()
+    sample.loc[sample.index[:5], "Income Level"] = "1M+"
+    expected_data, expected_labels = _expected(transformer, model, sample)
+
+    categorical = sample.copy()
+    for column in OH_COLUMNS:
+        # An extra, unused category must not shift the lookup by code
+        categorical[column] = pd.Categorical(categorical[column],
+                                             categories=["__unused__"] + sorted(categorical[column].unique()))
+
+    assert np.array_equal(predictor.transform(categorical), expected_data)
+    assert np.array_equal(predictor.predict(categorical), expected_labels)
+
+
+def test_list_of_records(frame, transformer, model, predictor):
+    sample = frame.head(40)
+    expected_data, expected_labels = _expected(transformer, model, sample)
+    records = sample.to_dict("records")
+
+    assert np.array_equal(predictor.transform(records), expected_data)
+    assert np.array_equal(predictor.predict(records), expected_labels)
+
+
+def test_prediction_pipeline_uses_compact_path_for_centroid_model(tmp_path, frame, transformer, model):
+    pipeline = PredictionPipeline(artifact_run_dir=_write_run(tmp_path / "run", transformer, model),
+                                  use_compact_predictor=True)
+    _, expected_labels = _expected(transformer, model, frame)
+
+    assert pipeline.serving_path == "compact"
+    assert np.array_equal(pipeline.predict_batch(frame), expected_labels)
+
+
+def test_non_centroid_model_falls_back_to_sklearn(tmp_path, frame, transformer):
+    mixture = GaussianMixture(n_components=3, random_state=42).fit(_dense(transformer.transform(frame)))
+    with pytest.raises(UnsupportedModelError):
+        ModelExporter.compile(transformer, mixture)
+
+    pipeline = PredictionPipeline(artifact_run_dir=_write_run(tmp_path / "run", transformer, mixture),
+                                  use_compact_predictor=True)
+    _, expected_labels = _expected(transformer, mixture, frame)
+
+    assert pipeline.compact_predictor is None
+    assert pipeline.serving_path == "sklearn"
+    assert pipeline.predict(frame.iloc[0].to_dict()) == expected_labels[0]
+    assert np.array_equal(pipeline.predict_batch(frame), expected_labels)
@@ -0,0 +1,92 @@
+import json
+
+import pandas as pd
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from src.configuration.mongo_db_connection import MongoDBClient
+from src.constants import SCHEMA_FILE_PATH
+from src.data_access.data_exe import USvisaData
+from src.utils.artifact_format import load_dataframe, save_dataframe
+from src.utils.main_utils import get_schema_column_types, read_yaml_file
+
+COLUMN_TYPES = get_schema_column_types(read_yaml_file(SCHEMA_FILE_PATH))
+COLUMNS = list(COLUMN_TYPES.keys())
+COLLECTION_NAME = "user_profiles"
+# Not a multiple of any row count used below, so the last chunk is partial
+BATCH_SIZE = 37
+
+
+def _documents(start: int, stop: int) -> list:
+    df = pd.read_csv("data/data_with_clusters.csv", skiprows=range(1, start + 1), nrows=stop - start)
+    documents = json.loads(df.drop(columns=["cluster"]).to_json(orient="records"))
+    # Missing values arrive from Mongo as the string "na", in every column type
+    for index, document in enumerate(documents):
+        if index % 7 == 0:
+            document["Time Spent Online (hrs/weekday)"] = "na"
+        if index % 11 == 0:
+            document["Likes and Reactions"] = "na"
+        if index % 13 == 0:
+            document["Gender"] = "na"
+    return documents
+
+
+@pytest.fixture
+def usvisa_data() -> USvisaData:
+    client = mongomock.MongoClient()
+    mongo_client = MongoDBClient(client=client)
+    mongo_client.database[COLLECTION_NAME].insert_many(_documents(0, 300))
+    return USvisaData(mongo_client=mongo_client)
+
+
+def _in_memory_export(usvisa_data: USvisaData, file_path: str) -> pd.DataFrame:
+    # The path DataIngestion takes when streaming is off
+    df = usvisa_data.coerce_chunk(usvisa_data.export_collection_as_dataframe(COLLECTION_NAME), COLUMN_TYPES)
+    save_dataframe(file_path, df[COLUMNS], COLUMN_TYPES)
+    return load_dataframe(file_path)
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".csv"])
+def test_streamed_export_matches_in_memory_export(tmp_path, usvisa_data, extension):
+    streamed_path = str(tmp_path / "streamed" / f"data{extension}")
+
+    rows_written = usvisa_data.export_collection_to_file(
+        COLLECTION_NAME, streamed_path, columns=COLUMNS, column_types=COLUMN_TYPES, batch_size=BATCH_SIZE
+    )
+
+    expected = _in_memory_export(usvisa_data, str(tmp_path / f"in_memory{extension}"))
+    streamed = load_dataframe(streamed_path)
+    assert rows_written == len(expected) == 300
+    assert expected["Gender"].isna().sum() == 300 // 13 + 1
+    pd.testing.assert_frame_equal(streamed, expected)
+
+
+def test_increment_advances_watermark(tmp_path, usvisa_data):
+    file_path = str(tmp_path / "increment.parquet")
+    collection = usvisa_data.mongo_client.database[COLLECTION_NAME]
+
+    rows_written, watermark = usvisa_data.export_collection_increment(
+        COLLECTION_NAME, file_path, columns=COLUMNS, watermark_field="_id",
+        column_types=COLUMN_TYPES, batch_size=BATCH_SIZE
+    )
+    assert rows_written == 300
+    assert watermark == usvisa_data.get_max_watermark(COLLECTION_NAME, "_id")
+
+    new_ids = collection.insert_many(_documents(300, 400)).inserted_ids
+    rows_written, new_watermark = usvisa_data.export_collection_increment(
+        COLLECTION_NAME, file_path, columns=COLUMNS, watermark_field="_id", watermark_value=watermark,
+        column_types=COLUMN_TYPES, batch_size=BATCH_SIZE
+    )
+    assert rows_written == 100
+    assert new_watermark > watermark
+    assert new_watermark == max(new_ids)
+    assert load_dataframe(file_path)["User ID"].tolist() == list(range(301, 401))
+    assert USvisaData.decode_watermark(USvisaData.encode_watermark(new_watermark)) == new_watermark
+
+    rows_written, unchanged = usvisa_data.export_collection_increment(
+        COLLECTION_NAME, file_path, columns=COLUMNS, watermark_field="_id", watermark_value=new_watermark,
+        column_types=COLUMN_TYPES, batch_size=BATCH_SIZE
+    )
+    assert rows_written == 0
+    assert unchanged == new_watermark
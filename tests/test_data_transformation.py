@@ -0,0 +1,134 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.data_transformation import DataTransformation
+from src.components.data_validation import DataValidation
+from src.constants import FILE_NAME, SCHEMA_FILE_PATH
+from src.entity.artifact_entity import DataIngestionArtifact
+from src.entity.config_entity import DataTransformationConfig, DataValidationConfig, TrainingPipelineConfig
+from src.exception import USvisaException
+from src.utils.artifact_format import load_dataframe, save_dataframe
+from src.utils.main_utils import (
+    get_schema_column_types,
+    load_numpy_array_data,
+    read_yaml_file,
+    save_numpy_array_chunks
+)
+
+SCHEMA = read_yaml_file(SCHEMA_FILE_PATH)
+
+
+@pytest.fixture(scope="module")
+def feature_store(tmp_path_factory) -> str:
+    # 500 rows: chunks of 77 leave a partial last chunk
+    df = pd.read_csv("data/data_with_clusters.csv", nrows=500).drop(columns=["cluster"])
+    file_path = str(tmp_path_factory.mktemp("feature_store") / FILE_NAME)
+    save_dataframe(file_path, df, get_schema_column_types(SCHEMA))
+    return file_path
+
+
+@pytest.fixture(scope="module")
+def constant_feature_store(tmp_path_factory) -> str:
+    df = pd.read_csv("data/data_with_clusters.csv", nrows=300).drop(columns=["cluster"])
+    # 0.1 has no exact binary form, so its variance is only zero up to rounding
+    df["Click-Through Rates (CTR)"] = 0.1
+    file_path = str(tmp_path_factory.mktemp("constant_feature_store") / FILE_NAME)
+    save_dataframe(file_path, df, get_schema_column_types(SCHEMA))
+    return file_path
+
+
+def _data_transformation(run_dir: str, feature_store: str, chunk_size: int) -> DataTransformation:
+    training_pipeline_config = TrainingPipelineConfig(artifact_dir=run_dir, timestamp=os.path.basename(run_dir))
+    ingestion_artifact = DataIngestionArtifact(feature_store_file_path=feature_store)
+    validation_artifact = DataValidation(
+        ingestion_artifact, DataValidationConfig(training_pipeline_config)
+    ).initiate_data_validation()
+    transformation_config = DataTransformationConfig(training_pipeline_config, chunk_size=chunk_size)
+    return DataTransformation(ingestion_artifact, transformation_config, validation_artifact)
+
+
+def _transform(run_dir: str, feature_store: str, chunk_size: int) -> str:
+    transformation = _data_transformation(run_dir, feature_store, chunk_size)
+    return transformation.initiate_data_transformation().transformed_data_path
+
+
+@pytest.mark.parametrize("store", ["feature_store", "constant_feature_store"])
+def test_transformer_from_statistics_matches_fit(tmp_path, store, request):
+    feature_store_path = request.getfixturevalue(store)
+    transformation = _data_transformation(str(tmp_path / "run"), feature_store_path, chunk_size=0)
+    statistics = transformation.load_column_statistics()
+    assert statistics is not None
+
+    from_statistics = transformation.build_transformer_from_statistics(statistics)
+    input_df = load_dataframe(
+        feature_store_path,
+        columns=SCHEMA["transform_columns"] + SCHEMA["oh_columns"],
+        categorical_columns=SCHEMA["oh_columns"]
+    )
+    fitted = transformation.get_data_transformer_object().fit(input_df)
+
+    scaler, fitted_scaler = from_statistics.named_transformers_["num"], fitted.named_transformers_["num"]
+    assert np.array_equal(scaler.n_samples_seen_, fitted_scaler.n_samples_seen_)
+    np.testing.assert_allclose(scaler.mean_, fitted_scaler.mean_, rtol=1e-12, atol=0)
+    np.testing.assert_allclose(scaler.var_, fitted_scaler.var_, rtol=1e-12, atol=1e-30)
+    np.testing.assert_array_equal(scaler.scale_ == 1.0, fitted_scaler.scale_ == 1.0)
+    np.testing.assert_allclose(scaler.scale_, fitted_scaler.scale_, rtol=1e-12, atol=0)
+
+    encoder, fitted_encoder = from_statistics.named_transformers_["cat"], fitted.named_transformers_["cat"]
+    assert len(encoder.categories_) == len(fitted_encoder.categories_)
+    for categories, fitted_categories in zip(encoder.categories_, fitted_encoder.categories_):
+        assert list(categories) == list(fitted_categories)
+    assert list(from_statistics.get_feature_names_out()) == list(fitted.get_feature_names_out())
+
+    transformed, expected = from_statistics.transform(input_df), fitted.transform(input_df)
+    transformed = transformed.toarray() if hasattr(transformed, "toarray") else transformed
+    expected = expected.toarray() if hasattr(expected, "toarray") else expected
+    np.testing.assert_allclose(transformed, expected, rtol=1e-12, atol=1e-12)
+    if store == "constant_feature_store":
+        constant = SCHEMA["num_features"].index("Click-Through Rates (CTR)")
+        assert scaler.scale_[constant] == 1.0
+
+
+def test_chunked_transform_matches_in_memory(tmp_path, feature_store, monkeypatch):
+    in_memory_path = _transform(str(tmp_path / "in_memory"), feature_store, chunk_size=0)
+
+    chunked_calls = []
+    transform_in_chunks = DataTransformation.transform_in_chunks
+
+    def spy(self, transformer, n_rows):
+        chunked_calls.append(n_rows)
+        return transform_in_chunks(self, transformer, n_rows)
+
+    monkeypatch.setattr(DataTransformation, "transform_in_chunks", spy)
+    chunked_path = _transform(str(tmp_path / "chunked"), feature_store, chunk_size=77)
+
+    assert chunked_calls == [500]
+    assert in_memory_path.endswith(".npy") and chunked_path.endswith(".npy")
+    in_memory, chunked = load_numpy_array_data(in_memory_path), load_numpy_array_data(chunked_path)
+    assert chunked.shape[0] == 500
+    assert np.array_equal(in_memory, chunked)
+
+
+def test_save_numpy_array_chunks_round_trip(tmp_path):
+    data = np.arange(35, dtype=np.float64).reshape(7, 5)
+    file_path = str(tmp_path / "chunks.npy")
+
+    shape = save_numpy_array_chunks(file_path, (data[start:start + 3] for start in range(0, 7, 3)), data.shape)
+
+    assert shape == (7, 5)
+    assert np.array_equal(load_numpy_array_data(file_path), data)
+
+
+def test_save_numpy_array_chunks_rejects_row_count_mismatch(tmp_path):
+    data = np.ones((4, 3))
+
+    with pytest.raises(USvisaException) as error:
+        save_numpy_array_chunks(str(tmp_path / "short.npy"), [data], (5, 3))
+    assert isinstance(error.value.__cause__, ValueError)
+
+    with pytest.raises(USvisaException) as error:
+        save_numpy_array_chunks(str(tmp_path / "wide.npy"), [data], (4, 2))
+    assert isinstance(error.value.__cause__, ValueError)
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import numpy as np
+
+from src.pipline.micro_batcher import MicroBatcher, MicroBatcherStoppedError
+
+
+class _Pipeline:
+    def __init__(self):
+        self.batches = []
+
+    def get_cached(self, input_data: dict):
+        return None
+
+    def predict_batch(self, records):
+        self.batches.append(len(records))
+        return np.array([record["value"] for record in records])
+
+
+class _Registry:
+    def __init__(self):
+        self.current = _Pipeline()
+
+    def get(self):
+        return self.current
+
+
+def test_stop_answers_requests_collected_mid_window():
+    async def scenario():
+        registry = _Registry()
+        batcher = MicroBatcher(registry, max_batch_size=8, max_wait_ms=200)
+        await batcher.start()
+        request = asyncio.create_task(batcher.submit({"value": 3}))
+        # Taken off the queue, still waiting for the 200 ms window to close
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        return await asyncio.wait_for(request, timeout=1), registry.current.batches
+
+    result, batches = asyncio.run(scenario())
+
+    assert result == 3
+    assert batches == [1]
+
+
+def test_stop_fails_requests_still_queued():
+    async def scenario():
+        batcher = MicroBatcher(_Registry(), max_batch_size=8, max_wait_ms=200)
+        await batcher.start()
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in range(3)]
+        for value, future in enumerate(futures):
+            batcher._queue.put_nowait(({"value": value}, future, time.perf_counter()))
+        # Stopped before the worker gets to run: nothing is collected
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(*futures, return_exceptions=True), timeout=1)
+
+    results = asyncio.run(scenario())
+
+    assert len(results) == 3
+    assert all(isinstance(result, MicroBatcherStoppedError) for result in results)
+
+
+def test_requests_within_a_window_share_one_batch():
+    async def scenario():
+        registry = _Registry()
+        batcher = MicroBatcher(registry, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit({"value": value}) for value in range(5))), timeout=1
+        )
+        await batcher.stop()
+        return results, registry.current.batches
+
+    results, batches = asyncio.run(scenario())
+
+    assert results == [0, 1, 2, 3, 4]
+    assert batches == [5]